@@ -0,0 +1,75 @@
+"""
+Сравнение двух файлов результатов benchmarks.run (например, между коммитами).
+
+Пример:
+    python -m benchmarks.compare benchmarks/results/abc1234.json benchmarks/results/def5678.json --threshold 0.1
+
+Код возврата 1, если пропускная способность упала или p95/p99 выросли больше порога.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Метрика -> True, если больше значит лучше
+METRICS = {
+    "throughput_rps": True,
+    "latency_ms.p50": False,
+    "latency_ms.p95": False,
+    "latency_ms.p99": False,
+    "cache_hit_ratio": True,
+    "upstream_calls": False,
+}
+GATED_METRICS = ("throughput_rps", "latency_ms.p95", "latency_ms.p99")
+
+
+def _value(result: dict, metric: str) -> float:
+    for part in metric.split("."):
+        result = result[part]
+    return result
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> tuple[list[str], list[str]]:
+    """
+    :return: Строки отчета и список регрессий больше порога
+    """
+    lines = [f"{baseline['commit']} -> {candidate['commit']}"]
+    regressions = []
+    baseline_results = {result["name"]: result for result in baseline["scenarios"]}
+
+    for result in candidate["scenarios"]:
+        base = baseline_results.get(result["name"])
+        if base is None:
+            lines.append(f"{result['name']}: нет в базовом прогоне")
+            continue
+        lines.append(result["name"])
+        for metric, higher_is_better in METRICS.items():
+            old, new = _value(base, metric), _value(result, metric)
+            change = (new - old) / old if old else 0.0
+            worse = change < -threshold if higher_is_better else change > threshold
+            mark = " !" if worse and metric in GATED_METRICS else ""
+            lines.append(f"  {metric:<18} {old:>12} -> {new:>12} ({change:+.1%}){mark}")
+            if mark:
+                regressions.append(f"{result['name']}: {metric} {change:+.1%}")
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение результатов нагрузочных тестов")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.1, help="Допустимое ухудшение, доля (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    lines, regressions = compare(
+        json.loads(args.baseline.read_text()), json.loads(args.candidate.read_text()), args.threshold
+    )
+    print("\n".join(lines))
+    if regressions:
+        print("\nРегрессии:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
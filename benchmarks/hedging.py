@@ -0,0 +1,122 @@
+"""
+Дублирование медленных запросов к поставщикам погоды (hedged requests) на локальных поставщиках FakeProvider.
+
+Основной и резервный поставщики отвечают за latency ± jitter секунд, а доля slow_rate запросов —
+за slow_latency секунд (хвост задержек). Один и тот же поток запросов прогоняется через ProviderRouter
+без резервного поставщика и с ним; сравниваются перцентили задержки, доля продублированных запросов
+(дополнительная нагрузка на поставщиков) и доли побед и ошибок поставщиков.
+
+Пример:
+    python -m benchmarks.hedging
+    python -m benchmarks.hedging --requests 5000 --slow-rate 0.01 --slow-latency 2.0 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.load import summarize_latencies
+from benchmarks.run import RESULTS_DIR, git_revision
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+
+async def measure(router, requests: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for index in range(requests):
+        queue.put_nowait({"city": f"city-{index}"})
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            location = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                await router.afetch_current_weather(location)
+            except ValueError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    # Проигравшие запросы не отменяются — дожидаемся их, чтобы учесть в статистике поставщиков
+    while router._background:
+        await asyncio.sleep(0.01)
+    return {"requests": requests, "errors": errors, "latency_ms": summarize_latencies(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Дублирование медленных запросов к поставщикам погоды")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="Обычная задержка поставщиков в секундах")
+    parser.add_argument("--jitter", type=float, default=0.005)
+    parser.add_argument("--slow-rate", type=float, default=0.02, help="Доля медленных ответов")
+    parser.add_argument("--slow-latency", type=float, default=0.5, help="Задержка медленных ответов в секундах")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--percentile", type=float, default=95, help="Перцентиль hedge-задержки")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="Файл результатов (по умолчанию results/hedging-...)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(SRC_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
+    import django
+
+    django.setup()
+    from api.weather_provider.fake import FakeProvider
+    from api.weather_provider.registry import ProviderRouter
+
+    def provider(name: str, seed: int):
+        return FakeProvider(
+            name,
+            latency=args.latency,
+            jitter=args.jitter,
+            slow_rate=args.slow_rate,
+            slow_latency=args.slow_latency,
+            error_rate=args.error_rate,
+            seed=seed,
+        )
+
+    results = {}
+    routers = {
+        "direct": ProviderRouter(provider("primary", args.seed)),
+        "hedged": ProviderRouter(
+            provider("primary", args.seed), provider("secondary", args.seed + 1), percentile=args.percentile
+        ),
+    }
+    for mode, router in routers.items():
+        results[mode] = asyncio.run(measure(router, args.requests, args.concurrency))
+        providers = router.stats()
+        calls = sum(stats["current"]["requests"] for stats in providers.values())
+        results[mode]["upstream_calls"] = calls
+        results[mode]["extra_calls"] = round(calls / args.requests - 1, 4)
+        results[mode]["providers"] = {name: stats["current"] for name, stats in providers.items()}
+        print(
+            f"[hedging] {mode:<7} {results[mode]['latency_ms']} ошибок: {results[mode]['errors']} "
+            f"дополнительных запросов: {results[mode]['extra_calls']:.1%}",
+            flush=True,
+        )
+        for name, stats in results[mode]["providers"].items():
+            print(
+                f"[hedging]   {name:<10} побед: {stats['win_rate']:.1%} ошибок: {stats['error_rate']:.1%} "
+                f"p50={stats['p50'] * 1000:.0f}ms p95={stats['p95'] * 1000:.0f}ms"
+            )
+
+    started_at = datetime.now(timezone.utc)
+    output = args.output or RESULTS_DIR / f"hedging-{git_revision()}-{started_at:%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    report = {"commit": git_revision(), "started_at": started_at.isoformat(), "config": vars(args) | {"output": None}}
+    report["modes"] = results
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"[hedging] Результаты записаны в {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Нагрузочный драйвер: асинхронные воркеры с общим клиентом httpx и замер задержек по эндпоинтам.
+"""
+
+import asyncio
+import math
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+from benchmarks.workload import Workload
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """
+    Перцентиль методом ближайшего ранга по отсортированному списку.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_latencies(latencies: list[float]) -> dict:
+    values = sorted(latencies)
+    return {
+        "p50": round(percentile(values, 50) * 1000, 2),
+        "p95": round(percentile(values, 95) * 1000, 2),
+        "p99": round(percentile(values, 99) * 1000, 2),
+        "mean": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        "max": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+async def run_load(
+    base_url: str,
+    workload: Workload,
+    concurrency: int,
+    duration: float,
+    max_requests: int | None = None,
+    timeout: float = 30.0,
+) -> dict:
+    """
+    Нагружает сервис в течение duration секунд (или до max_requests запросов) concurrency воркерами.
+
+    :return: Число запросов, длительность, пропускная способность и задержки (мс) в целом и по эндпоинтам
+    """
+    latencies = defaultdict(list)
+    statuses = defaultdict(Counter)
+    transport_errors = Counter()
+    issued = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal issued
+        while time.perf_counter() < deadline and (max_requests is None or issued < max_requests):
+            issued += 1
+            endpoint, path, params = workload.next_request()
+            started = time.perf_counter()
+            try:
+                response = await client.get(path, params=params)
+            except httpx.HTTPError as e:
+                transport_errors[type(e).__name__] += 1
+                statuses[endpoint]["error"] += 1
+                continue
+            latencies[endpoint].append(time.perf_counter() - started)
+            statuses[endpoint][str(response.status_code)] += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    total = sum(sum(counter.values()) for counter in statuses.values())
+    succeeded = sum(counter["200"] for counter in statuses.values())
+    return {
+        "requests": total,
+        "succeeded": succeeded,
+        "elapsed": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": summarize_latencies(all_latencies),
+        "transport_errors": dict(transport_errors),
+        "endpoints": {
+            endpoint: {
+                "requests": sum(statuses[endpoint].values()),
+                "status_codes": dict(statuses[endpoint]),
+                "latency_ms": summarize_latencies(latencies[endpoint]),
+            }
+            for endpoint in statuses
+        },
+    }
@@ -0,0 +1,213 @@
+"""
+Локальная замена Weatherbit для нагрузочных тестов.
+
+Отдает /current и /forecast/daily в формате Weatherbit с настраиваемой задержкой и долей ошибок,
+считает обращения по эндпоинтам (запросы по координатам lat/lon — отдельно, с суффиксом ":coordinates").
+Служебные эндпоинты:
+    GET  /_stats   — счетчики обращений
+    POST /_reset   — обнуление счетчиков
+    POST /_config  — изменение задержки и доли ошибок (JSON с полями latency, jitter, error_rate)
+
+Запуск: python -m benchmarks.mock_weatherbit --port 8081 --latency 0.2 --error-rate 0.01
+Сервис при этом запускается с WEATHERBIT_URL=http://127.0.0.1:8081
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FORECAST_DAYS = 16
+ENDPOINTS = ("/current", "/forecast/daily")
+
+
+class MockState:
+    """
+    Настройки и счетчики заглушки, общие для всех потоков сервера.
+    """
+
+    def __init__(self, latency: float = 0.1, jitter: float = 0.0, error_rate: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._errors = {}
+
+    def configure(self, **options) -> None:
+        with self._lock:
+            for name in ("latency", "jitter", "error_rate"):
+                if options.get(name) is not None:
+                    setattr(self, name, float(options[name]))
+
+    def record(self, endpoint: str, failed: bool) -> None:
+        with self._lock:
+            self._calls[endpoint] = self._calls.get(endpoint, 0) + 1
+            if failed:
+                self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self._errors.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": dict(self._calls),
+                "errors": dict(self._errors),
+                "total_calls": sum(self._calls.values()),
+                "config": {"latency": self.latency, "jitter": self.jitter, "error_rate": self.error_rate},
+            }
+
+    def delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+
+def _base_temperature(city: str) -> float:
+    # Детерминированная температура по названию города, чтобы ответы были стабильны между запусками
+    return (zlib.crc32(city.lower().encode()) % 400) / 10 - 10
+
+
+def current_payload(city: str) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "count": 1,
+        "data": [
+            {
+                "city_name": city,
+                "temp": round(_base_temperature(city), 1),
+                "ob_time": now.strftime("%Y-%m-%d %H:%M"),
+            }
+        ],
+    }
+
+
+def forecast_payload(city: str) -> dict:
+    base = _base_temperature(city)
+    today = date.today()
+    return {
+        "city_name": city,
+        "data": [
+            {
+                "datetime": (today + timedelta(days=offset)).isoformat(),
+                "min_temp": round(base - 5 + offset % 3, 1),
+                "max_temp": round(base + 5 + offset % 4, 1),
+            }
+            for offset in range(FORECAST_DAYS)
+        ],
+    }
+
+
+class MockWeatherbitHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: MockState
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/_stats":
+            return self._send_json(200, self.state.stats())
+        if url.path not in ENDPOINTS:
+            return self._send_json(404, {"error": "Unknown endpoint"})
+
+        query = parse_qs(url.query)
+        if "lat" in query and "lon" in query:
+            endpoint = f"{url.path}:coordinates"
+            city = f"{query['lat'][0]},{query['lon'][0]}"
+        else:
+            endpoint = url.path
+            city = query.get("city", [""])[0]
+        time.sleep(self.state.delay())
+
+        if not city:
+            self.state.record(endpoint, failed=True)
+            return self._send_json(400, {"error": "Invalid Parameters supplied."})
+        if random.random() < self.state.error_rate:
+            self.state.record(endpoint, failed=True)
+            return self._send_json(503, {"error": "Service temporarily unavailable."})
+
+        self.state.record(endpoint, failed=False)
+        payload = current_payload(city) if url.path == "/current" else forecast_payload(city)
+        return self._send_json(200, payload)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        if url.path == "/_reset":
+            self.state.reset()
+            return self._send_json(200, self.state.stats())
+        if url.path == "/_config":
+            try:
+                self.state.configure(**json.loads(body or b"{}"))
+            except (TypeError, ValueError) as e:
+                return self._send_json(400, {"error": str(e)})
+            return self._send_json(200, self.state.stats())
+        return self._send_json(404, {"error": "Unknown endpoint"})
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockWeatherbit:
+    """
+    Заглушка Weatherbit в фоновом потоке текущего процесса.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **options):
+        self.state = MockState(**options)
+        handler = type("Handler", (MockWeatherbitHandler,), {"state": self.state})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockWeatherbit":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="mock-weatherbit", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальная заглушка Weatherbit для нагрузочных тестов")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.1, help="Задержка ответа, секунды")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Разброс задержки, секунды")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов 503")
+    args = parser.parse_args()
+
+    mock = MockWeatherbit(args.host, args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    print(f"Mock Weatherbit: {mock.url} (latency={args.latency}s, error_rate={args.error_rate})")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
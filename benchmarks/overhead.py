@@ -0,0 +1,108 @@
+"""
+Накладные расходы Django на запрос в разных профилях настроек (по умолчанию project.settings и project.settings_api).
+
+Каждый профиль запускается в отдельном процессе (настройки Django загружаются один раз на процесс):
+заглушка Weatherbit поднимается в том же процессе, кеш прогревается, после чего запросы
+выполняются через django.test.Client — весь путь middleware, DRF и рендеринга, но без сети
+и без обращения к API. Разница между профилями — это стоимость сокращенной цепочки middleware и DRF.
+
+Пример:
+    python -m benchmarks.overhead
+    python -m benchmarks.overhead --requests 5000 --path "/api/weather/forecast?city=Moscow&date=2025-07-01"
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.load import summarize_latencies
+from benchmarks.mock_weatherbit import MockWeatherbit
+from benchmarks.run import RESULTS_DIR, git_revision
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCHMARKS_DIR.parent / "src"
+DEFAULT_PROFILES = ("project.settings", "project.settings_api")
+
+
+def measure(path: str, requests: int, warmup: int) -> dict:
+    """
+    Замеряет задержку запросов к path в текущем процессе (настройки — из DJANGO_SETTINGS_MODULE).
+    """
+    sys.path.insert(0, str(SRC_DIR))
+    mock = MockWeatherbit(latency=0).start()
+    os.environ["WEATHERBIT_URL"] = mock.url
+
+    import django
+
+    django.setup()
+    from django.test import Client
+
+    # Построчный INFO-лог каждого ответа одинаково дорог в обоих профилях и только добавляет шум
+    logging.disable(logging.INFO)
+
+    client = Client(HTTP_ACCEPT="application/json")
+    for _ in range(warmup):
+        status = client.get(path).status_code
+    if status != 200:
+        raise SystemExit(f"{path} вернул {status}")
+
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        client.get(path)
+        latencies.append(time.perf_counter() - started)
+    mock.stop()
+    return {"requests": requests, "latency_ms": summarize_latencies(latencies)}
+
+
+def run_profile(profile: str, args) -> dict:
+    command = [sys.executable, "-m", "benchmarks.overhead", "--worker", "--path", args.path]
+    command += ["--requests", str(args.requests), "--warmup", str(args.warmup)]
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": profile}
+    completed = subprocess.run(command, env=env, cwd=BENCHMARKS_DIR.parent, capture_output=True, text=True, check=False)
+    if completed.returncode != 0:
+        raise SystemExit(f"Профиль {profile} завершился с ошибкой:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Накладные расходы на запрос в профилях настроек Django")
+    parser.add_argument("--profiles", nargs="+", default=DEFAULT_PROFILES, help="Модули настроек Django")
+    parser.add_argument("--path", default="/api/weather/current?city=Moscow", help="Запрос для замера")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output", type=Path, help="Файл результатов (по умолчанию results/overhead-...)")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.path, args.requests, args.warmup)))
+        return
+
+    results = {}
+    for profile in args.profiles:
+        results[profile] = run_profile(profile, args)
+        print(f"[overhead] {profile:<28} {results[profile]['latency_ms']}", flush=True)
+
+    baseline = results[args.profiles[0]]["latency_ms"]["mean"]
+    for profile in args.profiles[1:]:
+        mean = results[profile]["latency_ms"]["mean"]
+        saved = round((baseline - mean) * 1000, 1)
+        print(f"[overhead] {profile}: {saved} мкс на запрос меньше, чем {args.profiles[0]} ({mean / baseline:.0%})")
+
+    started_at = datetime.now(timezone.utc)
+    output = args.output or RESULTS_DIR / f"overhead-{git_revision()}-{started_at:%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    report = {"commit": git_revision(), "started_at": started_at.isoformat(), "path": args.path, "profiles": results}
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"[overhead] Результаты записаны в {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Прогон сценариев нагрузки против запущенного сервиса с записью результатов в JSON.
+
+Сервис должен обращаться к заглушке Weatherbit (WEATHERBIT_URL), иначе число обращений к API не посчитать.
+
+Пример:
+    python -m benchmarks.run --base-url http://127.0.0.1:8000 --start-mock --mock-port 8081
+    python -m benchmarks.run --mock-url http://127.0.0.1:8081 --only mixed --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from benchmarks.load import run_load
+from benchmarks.mock_weatherbit import MockWeatherbit
+from benchmarks.workload import Workload
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+DEFAULT_SCENARIOS = BENCHMARKS_DIR / "scenarios.json"
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+UPSTREAM_ENDPOINTS = {
+    "current": "/current",
+    "forecast": "/forecast/daily",
+    "current-coordinates": "/current:coordinates",
+    "forecast-coordinates": "/forecast/daily:coordinates",
+}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARKS_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def cache_hit_ratio(requests: int, upstream_calls: int) -> float:
+    """
+    Доля запросов, обслуженных без обращения к API.
+
+    Считается по обращениям к заглушке, поэтому включает повторы запросов к API
+    и эффект single-flight и прогрева прогноза сразу на все даты.
+    """
+    if not requests:
+        return 0.0
+    return round(max(0.0, 1 - upstream_calls / requests), 4)
+
+
+def run_scenario(scenario: dict, base_url: str, mock_url: str, seed: int | None) -> dict:
+    with httpx.Client(base_url=mock_url, timeout=5) as mock:
+        mock.post(
+            "/_config",
+            json={
+                "latency": scenario.get("upstream_latency", 0.1),
+                "jitter": scenario.get("upstream_jitter", 0.0),
+                "error_rate": scenario.get("upstream_error_rate", 0.0),
+            },
+        ).raise_for_status()
+        mock.post("/_reset").raise_for_status()
+
+        workload = Workload(
+            cities=scenario.get("cities", 200),
+            zipf_s=scenario.get("zipf_s", 1.1),
+            current_share=scenario.get("current_share", 0.7),
+            date_decay=scenario.get("date_decay", 0.7),
+            coordinates_share=scenario.get("coordinates_share", 0.0),
+            coordinate_spread=scenario.get("coordinate_spread", 0.01),
+            namespace=uuid.uuid4().hex[:6] if scenario.get("cold", True) else "",
+            seed=seed,
+        )
+        result = asyncio.run(
+            run_load(
+                base_url,
+                workload,
+                concurrency=scenario.get("concurrency", 32),
+                duration=scenario.get("duration", 20),
+                max_requests=scenario.get("max_requests"),
+            )
+        )
+        upstream = mock.get("/_stats").json()
+
+    upstream_calls = upstream["calls"]
+    for endpoint, stats in result["endpoints"].items():
+        calls = upstream_calls.get(UPSTREAM_ENDPOINTS[endpoint], 0)
+        stats["upstream_calls"] = calls
+        stats["cache_hit_ratio"] = cache_hit_ratio(stats["requests"], calls)
+
+    return {
+        "name": scenario["name"],
+        "config": scenario,
+        **result,
+        "upstream_calls": upstream["total_calls"],
+        "upstream_errors": sum(upstream["errors"].values()),
+        "cache_hit_ratio": cache_hit_ratio(result["requests"], upstream["total_calls"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочные сценарии для Weather API")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Адрес тестируемого сервиса")
+    parser.add_argument("--mock-url", default="http://127.0.0.1:8081", help="Адрес заглушки Weatherbit")
+    parser.add_argument("--start-mock", action="store_true", help="Запустить заглушку в этом процессе")
+    parser.add_argument("--mock-port", type=int, default=8081)
+    parser.add_argument("--scenarios", type=Path, default=DEFAULT_SCENARIOS, help="JSON-файл со сценариями")
+    parser.add_argument("--only", nargs="+", help="Запустить только указанные сценарии")
+    parser.add_argument("--duration", type=float, help="Переопределить длительность каждого сценария, секунды")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Файл результатов (по умолчанию results/<commit>-<время>.json)")
+    args = parser.parse_args()
+
+    scenarios = json.loads(args.scenarios.read_text())
+    if args.only:
+        scenarios = [scenario for scenario in scenarios if scenario["name"] in args.only]
+    if args.duration:
+        scenarios = [{**scenario, "duration": args.duration} for scenario in scenarios]
+
+    mock = None
+    mock_url = args.mock_url
+    if args.start_mock:
+        mock = MockWeatherbit(port=args.mock_port).start()
+        mock_url = mock.url
+
+    revision = git_revision()
+    started_at = datetime.now(timezone.utc)
+    results = []
+    try:
+        for scenario in scenarios:
+            print(f"[benchmarks] {scenario['name']}: {scenario.get('duration', 20)}s ...", flush=True)
+            result = run_scenario(scenario, args.base_url, mock_url, args.seed)
+            latency = result["latency_ms"]
+            print(
+                f"[benchmarks] {result['name']}: {result['throughput_rps']} rps, "
+                f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms, "
+                f"hit ratio={result['cache_hit_ratio']}, upstream calls={result['upstream_calls']}",
+                flush=True,
+            )
+            results.append(result)
+    finally:
+        if mock is not None:
+            mock.stop()
+
+    output = args.output or RESULTS_DIR / f"{revision}-{started_at:%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "commit": revision,
+        "started_at": started_at.isoformat(),
+        "base_url": args.base_url,
+        "seed": args.seed,
+        "scenarios": results,
+    }
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"[benchmarks] Результаты записаны в {output}")
+
+
+if __name__ == "__main__":
+    main()
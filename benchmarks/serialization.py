@@ -0,0 +1,131 @@
+"""
+Сравнение сериализаторов значений кеша: pickle (по умолчанию в django_redis) и VersionedSerializer (msgpack).
+
+Для типичных значений кеша считаются размер в байтах и скорость dumps/loads. С --redis-url
+дополнительно измеряются память на ключ в Redis (MEMORY USAGE) и пропускная способность set/get.
+
+Пример:
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --redis-url redis://127.0.0.1:6379/15 --keys 10000
+"""
+
+import argparse
+import json
+import sys
+import time
+import timeit
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARKS_DIR.parent / "src"))
+
+from django_redis.serializers.pickle import PickleSerializer  # noqa: E402
+
+from api.caching.entries import make_entry, make_missing_entry  # noqa: E402
+from api.caching.serializers import VersionedSerializer  # noqa: E402
+from benchmarks.run import RESULTS_DIR, git_revision  # noqa: E402
+
+
+def sample_values() -> dict:
+    """
+    Значения в том виде, в котором их записывает WeatherService.
+    """
+    today = date.today()
+    window = {
+        (today + timedelta(days=offset)).isoformat(): make_entry(
+            {"min_temperature": 11.3 + offset, "max_temperature": 19.8 + offset}, 900
+        )
+        for offset in range(16)
+    }
+    return {
+        "current": make_entry({"temperature": 17.4, "local_time": "14:30"}, 300),
+        "forecast_day": make_entry({"min_temperature": 11.3, "max_temperature": 19.8}, 900),
+        "missing": make_missing_entry("Город не найден.", 300),
+        "forecast_window": window,
+    }
+
+
+def serializers() -> dict:
+    return {
+        "pickle": PickleSerializer({}),
+        "msgpack": VersionedSerializer({"COMPRESS_MIN_LENGTH": 0}),
+        "msgpack+zlib": VersionedSerializer({"COMPRESS_MIN_LENGTH": 1}),
+    }
+
+
+def measure_codec(serializer, value, number: int) -> dict:
+    payload = serializer.dumps(value)
+    dumps = timeit.timeit(lambda: serializer.dumps(value), number=number)
+    loads = timeit.timeit(lambda: serializer.loads(payload), number=number)
+    return {
+        "bytes": len(payload),
+        "dumps_per_sec": round(number / dumps),
+        "loads_per_sec": round(number / loads),
+    }
+
+
+def measure_redis(connection, serializer, name: str, value, keys: int) -> dict:
+    """
+    Записывает keys ключей через pipeline и читает их обратно с десериализацией.
+    """
+    prefix = f"bench:serialization:{name}:"
+    key_names = [f"{prefix}{index}" for index in range(keys)]
+
+    started = time.perf_counter()
+    pipeline = connection.pipeline(transaction=False)
+    for key in key_names:
+        pipeline.set(key, serializer.dumps(value))
+    pipeline.execute()
+    set_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for chunk_start in range(0, keys, 500):
+        for raw in connection.mget(key_names[chunk_start : chunk_start + 500]):
+            serializer.loads(raw)
+    get_elapsed = time.perf_counter() - started
+
+    sample = key_names[: min(keys, 200)]
+    memory = sum(connection.memory_usage(key) or 0 for key in sample) / len(sample)
+    connection.delete(*key_names)
+    return {
+        "memory_per_key": round(memory, 1),
+        "set_per_sec": round(keys / set_elapsed),
+        "get_per_sec": round(keys / get_elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение сериализаторов значений кеша")
+    parser.add_argument("--number", type=int, default=20000, help="Повторов dumps/loads на значение")
+    parser.add_argument("--redis-url", help="Redis для замера памяти и set/get (используйте отдельную БД)")
+    parser.add_argument("--keys", type=int, default=5000, help="Ключей на значение при замере в Redis")
+    parser.add_argument("--output", type=Path, help="Файл результатов (по умолчанию results/serialization-...)")
+    args = parser.parse_args()
+
+    connection = None
+    if args.redis_url:
+        import redis
+
+        connection = redis.Redis.from_url(args.redis_url)
+
+    results = {}
+    for value_name, value in sample_values().items():
+        results[value_name] = {}
+        for serializer_name, serializer in serializers().items():
+            result = measure_codec(serializer, value, args.number)
+            if connection is not None:
+                result.update(measure_redis(connection, serializer, serializer_name, value, args.keys))
+            results[value_name][serializer_name] = result
+            print(f"[serialization] {value_name:<16} {serializer_name:<13} {result}", flush=True)
+
+    started_at = datetime.now(timezone.utc)
+    output = args.output or RESULTS_DIR / f"serialization-{git_revision()}-{started_at:%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    report = {"commit": git_revision(), "started_at": started_at.isoformat(), "values": results}
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"[serialization] Результаты записаны в {output}")
+
+
+if __name__ == "__main__":
+    main()
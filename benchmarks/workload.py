@@ -0,0 +1,97 @@
+"""
+Распределения запросов для нагрузочных тестов: города с перекосом по популярности (Zipf) и даты прогноза.
+"""
+
+import bisect
+import itertools
+import random
+from datetime import date, timedelta
+
+CITIES = (
+    "Moscow", "London", "Paris", "Berlin", "Madrid", "Rome", "Amsterdam", "Vienna", "Prague", "Warsaw",
+    "Istanbul", "Dubai", "Tokyo", "Seoul", "Beijing", "Shanghai", "Singapore", "Bangkok", "Delhi", "Mumbai",
+    "Sydney", "Melbourne", "Toronto", "Vancouver", "Chicago", "Boston", "Seattle", "Miami", "Denver", "Austin",
+    "Mexico City", "Lima", "Bogota", "Santiago", "Buenos Aires", "Sao Paulo", "Cairo", "Nairobi", "Lagos", "Cape Town",
+    "Oslo", "Stockholm", "Helsinki", "Copenhagen", "Dublin", "Lisbon", "Athens", "Budapest", "Kazan", "Novosibirsk",
+)  # fmt: skip
+
+FORECAST_HORIZON_DAYS = 10
+
+
+class Workload:
+    """
+    Генератор запросов к /api/weather/current и /api/weather/forecast.
+
+    :param cities: Размер множества городов (реальные названия дополняются синтетическими)
+    :param zipf_s: Показатель распределения Zipf; 0 — равномерное, ~1 — типичный перекос горячих ключей
+    :param current_share: Доля запросов текущей погоды, остальное — прогноз
+    :param date_decay: Во сколько раз падает популярность каждой следующей даты прогноза
+    :param coordinates_share: Доля запросов по координатам lat/lon вместо названия города
+    :param coordinate_spread: Разброс координат вокруг точки города в градусах (0.01 — около 1 км)
+    :param namespace: Суффикс названий городов, чтобы сценарий начинался с холодного кеша
+    :param seed: Зерно генератора для воспроизводимости
+    """
+
+    def __init__(
+        self,
+        cities: int = 200,
+        zipf_s: float = 1.1,
+        current_share: float = 0.7,
+        date_decay: float = 0.7,
+        coordinates_share: float = 0.0,
+        coordinate_spread: float = 0.01,
+        namespace: str = "",
+        seed: int | None = None,
+    ):
+        self.random = random.Random(seed)
+        names = itertools.chain(CITIES, (f"City{index}" for index in itertools.count(1)))
+        suffix = f"-{namespace}" if namespace else ""
+        self.cities = [f"{name}{suffix}" for name in itertools.islice(names, cities)]
+        self.current_share = current_share
+        self.coordinates_share = coordinates_share
+        self.coordinate_spread = coordinate_spread
+        # Точка каждого города зависит от namespace, чтобы холодный сценарий не попадал в прогретые ячейки
+        points = random.Random(f"points-{namespace}")
+        self.points = [(points.uniform(-60, 60), points.uniform(-180, 180)) for _ in self.cities]
+        self._city_weights = list(itertools.accumulate(1 / rank**zipf_s for rank in range(1, cities + 1)))
+        self._date_weights = list(
+            itertools.accumulate(date_decay**offset for offset in range(FORECAST_HORIZON_DAYS + 1))
+        )
+
+    def city(self) -> str:
+        return self.cities[self._pick(self._city_weights)]
+
+    def coordinates(self) -> dict:
+        """
+        Координаты пользователя рядом с точкой одного из городов (с тем же перекосом популярности).
+        """
+        lat, lon = self.points[self._pick(self._city_weights)]
+        spread = self.coordinate_spread
+        return {
+            "lat": round(lat + self.random.uniform(-spread, spread), 6),
+            "lon": round(lon + self.random.uniform(-spread, spread), 6),
+        }
+
+    def forecast_date(self) -> date:
+        return date.today() + timedelta(days=self._pick(self._date_weights))
+
+    def next_request(self) -> tuple[str, str, dict]:
+        """
+        Возвращает следующий запрос: (метка эндпоинта, путь, query-параметры).
+
+        Запросы по координатам помечаются суффиксом "-coordinates" (current-coordinates, forecast-coordinates).
+        """
+        if self.random.random() < self.coordinates_share:
+            label, location = "-coordinates", self.coordinates()
+        else:
+            label, location = "", {"city": self.city()}
+        if self.random.random() < self.current_share:
+            return f"current{label}", "/api/weather/current", location
+        return (
+            f"forecast{label}",
+            "/api/weather/forecast",
+            {**location, "date": self.forecast_date().strftime("%d.%m.%Y")},
+        )
+
+    def _pick(self, cumulative: list[float]) -> int:
+        return bisect.bisect(cumulative, self.random.random() * cumulative[-1])
@@ -1,8 +1,25 @@
 from django.contrib import admin
 
-from .models import ForecastOverride
+from .models import City, CityAlias, ForecastOverride
+from .services import index_overrides
 
 
 @admin.register(ForecastOverride)
 class ForecastOverrideAdmin(admin.ModelAdmin):
-    pass
+    def save_model(self, request, obj, form, change):
+        # Форма админки сохраняется в транзакции: пара попадает в индекс переопределений до записи в БД
+        obj.resolve_city()
+        index_overrides([(obj.city, obj.date.isoformat())])
+        super().save_model(request, obj, form, change)
+
+
+class CityAliasInline(admin.TabularInline):
+    model = CityAlias
+    extra = 1
+
+
+@admin.register(City)
+class CityAdmin(admin.ModelAdmin):
+    list_display = ("key", "name", "country")
+    search_fields = ("key", "name", "aliases__alias")
+    inlines = [CityAliasInline]
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        from django.core.signals import request_finished
+        from django.db.backends.signals import connection_created
+
+        from utils.metrics import instrument_connection, record_db_pool_stats
+
+        connection_created.connect(instrument_connection, dispatch_uid="api.metrics.instrument_connection")
+        request_finished.connect(record_db_pool_stats, dispatch_uid="api.metrics.record_db_pool_stats")
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import time
+
+from api.weather_provider.exceptions import NotFoundError
+
+
+def make_entry(value, soft_timeout: int) -> dict:
+    """
+    Упаковывает значение в запись кеша с мягким сроком жизни.
+
+    Жесткий срок жизни записи задается временем жизни ключа в кеше,
+    мягкий — меткой fresh_until внутри записи. ETag значения считается
+    один раз при записи, чтобы не хешировать данные на каждом чтении.
+
+    Args:
+        value: Сохраняемое значение
+        soft_timeout (int): Мягкий срок жизни в секундах
+
+    Returns:
+        dict: {"value": value, "fresh_until": float, "etag": str}
+    """
+    return {"value": value, "fresh_until": time.time() + soft_timeout, "etag": make_etag(value)}
+
+
+def make_missing_entry(message: str, timeout: int) -> dict:
+    """
+    Создает негативную запись кеша: город или прогноз на дату не найден.
+
+    Негативная запись не обновляется в фоне и просто истекает через timeout секунд
+    (время жизни ключа в кеше задается тем же значением).
+
+    Args:
+        message (str): Текст ошибки для ответа
+        timeout (int): Время жизни записи в секундах
+
+    Returns:
+        dict: {"missing": message, "fresh_until": float}
+    """
+    return {"missing": message, "fresh_until": time.time() + timeout}
+
+
+def read_entry(raw) -> dict | None:
+    """
+    Возвращает запись кеша или None, если ключ пуст или хранит значение в старом формате.
+    """
+    if isinstance(raw, dict) and "fresh_until" in raw:
+        return raw
+    return None
+
+
+def is_stale(entry: dict) -> bool:
+    """
+    Проверяет, истек ли мягкий срок жизни записи (негативные записи не устаревают).
+    """
+    return "missing" not in entry and time.time() >= entry["fresh_until"]
+
+
+def entry_value(entry: dict):
+    """
+    Возвращает значение записи кеша.
+
+    Raises:
+        NotFoundError: Если запись негативная
+    """
+    if "missing" in entry:
+        raise NotFoundError(entry["missing"])
+    return entry["value"]
+
+
+def make_etag(value) -> str:
+    """
+    Вычисляет сильный ETag значения по его каноническому JSON-представлению.
+    """
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+    return f'"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"'
+
+
+def entry_etag(entry: dict) -> str:
+    """
+    Возвращает ETag записи кеша (для записей, сохраненных до появления ETag, вычисляет его).
+    """
+    return entry.get("etag") or make_etag(entry["value"])
+
+
+def entry_max_age(entry: dict) -> int:
+    """
+    Возвращает остаток мягкого срока жизни записи в целых секундах (0 для устаревшей записи).
+    """
+    return max(0, int(entry["fresh_until"] - time.time()))
@@ -0,0 +1,91 @@
+import logging
+
+from django_redis import get_redis_connection
+
+from utils.metrics import observe_phase
+
+logger = logging.getLogger(__name__)
+
+# Служебный элемент множества: индекс построен (его нет после сброса или вытеснения ключа)
+READY_MEMBER = "__ready__"
+
+
+class OverrideIndex:
+    """
+    Индекс наличия переопределений прогноза: множество Redis с элементами "<город>|<дата>".
+
+    Переопределения редки, поэтому при промахе кеша прогноза сначала проверяется
+    индекс, и запрос в БД выполняется только для дат, которые в нем есть. Индекс —
+    надмножество таблицы ForecastOverride: лишний элемент стоит одного запроса в БД,
+    отсутствующий означает ответ API вместо переопределения. Поэтому при записи
+    переопределения пара добавляется в индекс до записи в БД (и повторно после
+    фиксации транзакции), а удаление из индекса выполняет только rebuild().
+
+    Индекс и признак готовности хранятся в одном ключе и исчезают вместе: если
+    индекс не построен или Redis недоступен, проверка возвращает None и сервис
+    обращается к БД, как без индекса. Построение — команда rebuild_override_index.
+    """
+
+    def __init__(self, alias: str, key: str):
+        """
+        Args:
+            alias (str): Алиас кеша в CACHES для подключения к Redis
+            key (str): Ключ множества в Redis
+        """
+        self.alias = alias
+        self.key = key
+
+    def overridden(self, city: str, days) -> set[str] | None:
+        """
+        Возвращает даты города, для которых в индексе есть переопределения.
+
+        Args:
+            city (str): Канонический ключ города
+            days: Даты в формате YYYY-MM-DD
+
+        Returns:
+            set[str] | None: Подмножество days или None, если индекс не построен или недоступен
+        """
+        days = list(days)
+        try:
+            with observe_phase("cache"):
+                flags = get_redis_connection(self.alias).smismember(
+                    self.key, [READY_MEMBER, *(self._member(city, day) for day in days)]
+                )
+        except Exception as e:
+            logger.warning(f"[OverrideIndex] Индекс переопределений недоступен: {e}")
+            return None
+        if not flags[0]:
+            return None
+        return {day for day, flag in zip(days, flags[1:]) if flag}
+
+    def add(self, pairs) -> None:
+        """
+        Добавляет в индекс пары (город, дата в формате YYYY-MM-DD).
+
+        Ошибка Redis не подавляется: запись переопределения, которого нет в индексе,
+        приведет к ответам API вместо него.
+        """
+        members = [self._member(city, day) for city, day in pairs]
+        if members:
+            with observe_phase("cache"):
+                get_redis_connection(self.alias).sadd(self.key, *members)
+
+    def rebuild(self, pairs) -> int:
+        """
+        Заменяет индекс парами (город, дата) из БД одной транзакцией Redis и помечает его построенным.
+
+        Returns:
+            int: Количество пар в индексе
+        """
+        members = {self._member(city, day) for city, day in pairs}
+        pipeline = get_redis_connection(self.alias).pipeline(transaction=True)
+        pipeline.delete(self.key)
+        pipeline.sadd(self.key, READY_MEMBER, *members)
+        pipeline.execute()
+        logger.info(f"[OverrideIndex] Индекс переопределений построен: {len(members)} пар")
+        return len(members)
+
+    @staticmethod
+    def _member(city: str, day: str) -> str:
+        return f"{city}|{day}"
@@ -0,0 +1,89 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+
+class CityPopularity:
+    """
+    Частота запросов по городам в отсортированном множестве Redis.
+
+    Запросы считаются в памяти процесса и сбрасываются в Redis одним pipeline
+    фоновым потоком раз в flush_interval секунд, поэтому учет не добавляет
+    обращений к Redis в путь запроса. Старые счетчики затухают через decay(),
+    чтобы список популярных городов следовал за текущей нагрузкой.
+    """
+
+    def __init__(self, alias: str, key: str, flush_interval: float):
+        """
+        Args:
+            alias (str): Алиас кеша в CACHES для подключения к Redis
+            key (str): Ключ отсортированного множества в Redis
+            flush_interval (float): Интервал сброса счетчиков в Redis в секундах
+        """
+        self.alias = alias
+        self.key = key
+        self.flush_interval = flush_interval
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def record(self, city: str) -> None:
+        """
+        Учитывает запрос по городу.
+        """
+        with self._lock:
+            self._counts[city] += 1
+        self._ensure_flusher()
+
+    def flush(self) -> None:
+        """
+        Сбрасывает накопленные счетчики в Redis.
+        """
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        if not counts:
+            return
+        try:
+            pipeline = get_redis_connection(self.alias).pipeline(transaction=False)
+            for city, count in counts.items():
+                pipeline.zincrby(self.key, count, city)
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(f"[CityPopularity] Не удалось сохранить счетчики запросов: {e}")
+
+    def top(self, limit: int) -> list[str]:
+        """
+        Возвращает самые запрашиваемые города по убыванию частоты.
+        """
+        if limit <= 0:
+            return []
+        return [city.decode() for city in get_redis_connection(self.alias).zrevrange(self.key, 0, limit - 1)]
+
+    def decay(self, factor: float, min_score: float = 0.5) -> None:
+        """
+        Умножает все счетчики на factor и удаляет города со счетчиком ниже min_score.
+        """
+        connection = get_redis_connection(self.alias)
+        connection.zunionstore(self.key, {self.key: factor})
+        connection.zremrangebyscore(self.key, "-inf", f"({min_score}")
+
+    def _ensure_flusher(self) -> None:
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+            threading.Thread(target=self._flush_forever, name="city-popularity", daemon=True).start()
+
+    def _flush_forever(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
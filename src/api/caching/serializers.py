@@ -0,0 +1,72 @@
+import pickle
+import threading
+import zlib
+
+import msgpack
+from django.core.exceptions import ImproperlyConfigured
+from django_redis.serializers.base import BaseSerializer
+
+# Первый байт значения — версия формата. Pickle (протокол 2+) начинается с 0x80,
+# поэтому значения, записанные стандартным сериализатором django_redis, читаются без миграции.
+FORMAT_MSGPACK = 0x01
+FORMAT_MSGPACK_ZLIB = 0x02
+FORMAT_PICKLE = 0x80
+
+VALUE_FORMATS = ("msgpack", "pickle")
+
+
+class VersionedSerializer(BaseSerializer):
+    """
+    Сериализатор значений кеша для django_redis с байтом версии формата.
+
+    Записывает значения в msgpack (или в pickle при VALUE_FORMAT="pickle"), а читает
+    любой известный формат: msgpack, msgpack со сжатием zlib и pickle. Поэтому
+    переход между форматами не требует очистки кеша: сначала выкатывается код,
+    который читает оба формата, затем меняется формат записи.
+
+    Значения, которые msgpack не поддерживает (даты, произвольные объекты),
+    записываются в pickle. msgpack длиннее COMPRESS_MIN_LENGTH байт сжимается zlib.
+
+    Параметры читаются из OPTIONS кеша:
+        VALUE_FORMAT: "msgpack" (по умолчанию) или "pickle"
+        COMPRESS_MIN_LENGTH: Порог сжатия в байтах (0 — не сжимать)
+        COMPRESS_LEVEL: Уровень сжатия zlib
+    """
+
+    def __init__(self, options: dict) -> None:
+        super().__init__(options)
+        self.value_format = options.get("VALUE_FORMAT", "msgpack")
+        if self.value_format not in VALUE_FORMATS:
+            raise ImproperlyConfigured(f"VALUE_FORMAT должен быть одним из {VALUE_FORMATS}")
+        self.compress_min_length = int(options.get("COMPRESS_MIN_LENGTH", 1024))
+        self.compress_level = int(options.get("COMPRESS_LEVEL", 6))
+        # Packer быстрее msgpack.packb на маленьких значениях, но не потокобезопасен
+        self._local = threading.local()
+
+    def dumps(self, value) -> bytes:
+        if self.value_format == "msgpack":
+            try:
+                packed = self._packer().pack(value)
+            except (TypeError, ValueError, OverflowError):
+                pass
+            else:
+                if self.compress_min_length and len(packed) >= self.compress_min_length:
+                    return bytes((FORMAT_MSGPACK_ZLIB,)) + zlib.compress(packed, self.compress_level)
+                return bytes((FORMAT_MSGPACK,)) + packed
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, value: bytes):
+        version = value[0]
+        if version == FORMAT_MSGPACK:
+            return msgpack.unpackb(value[1:], raw=False, strict_map_key=False)
+        if version == FORMAT_MSGPACK_ZLIB:
+            return msgpack.unpackb(zlib.decompress(value[1:]), raw=False, strict_map_key=False)
+        if version == FORMAT_PICKLE:
+            return pickle.loads(value)
+        raise ValueError(f"Неизвестная версия формата значения кеша: {version:#04x}")
+
+    def _packer(self) -> msgpack.Packer:
+        packer = getattr(self._local, "packer", None)
+        if packer is None:
+            packer = self._local.packer = msgpack.Packer(use_bin_type=True)
+        return packer
@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from redis.exceptions import LockError
+
+from api.caching.entries import read_entry
+from utils.metrics import SINGLE_FLIGHT_EVENTS
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Объединение одновременных промахов кеша (single-flight).
+
+    На каждый ключ кеша через блокировку в Redis выбирается ровно один лидер
+    среди всех процессов. Лидер запрашивает данные у внешнего API и сохраняет
+    их в кеш, остальные запросы ждут его результата.
+
+    Та же блокировка используется для фонового обновления устаревших записей:
+    обновление запускает только тот процесс, который первым захватил блокировку.
+
+    Для асинхронного кода есть методы afetch() и arefresh() с той же логикой.
+
+    Значения кеша читаются через read_entry(): значение в старом формате (до записей
+    с мягким сроком жизни) считается промахом, и лидер загружает его заново.
+
+    Счетчики лидеров, объединенных запросов и фоновых обновлений доступны через метод stats()
+    и метрику weather_single_flight_total.
+    """
+
+    def __init__(
+        self,
+        cache,
+        lock_timeout: int,
+        wait_timeout: float,
+        poll_interval: float,
+        refresh_workers: int,
+    ):
+        """
+        Args:
+            cache: Кеш Django с поддержкой блокировок (django_redis)
+            lock_timeout (int): Время жизни блокировки лидера в секундах
+            wait_timeout (float): Максимальное время ожидания результата лидера в секундах
+            poll_interval (float): Интервал опроса кеша при ожидании в секундах
+            refresh_workers (int): Количество потоков для фонового обновления
+        """
+        self.cache = cache
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="single-flight")
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._tasks = set()
+        self._counters = {"leader": 0, "coalesced": 0, "refresh": 0}
+        self._counters_lock = threading.Lock()
+
+    def fetch(self, cache_key: str, loader, lock_key: str | None = None):
+        """
+        Возвращает значение по ключу, обращаясь к loader только в процессе-лидере.
+
+        Args:
+            cache_key (str): Ключ кеша, в который loader сохраняет результат
+            loader (callable): Функция без аргументов, которая получает данные,
+                сохраняет их в кеш и возвращает значение для cache_key
+            lock_key (str | None): Ключ блокировки, если один запрос к API
+                заполняет сразу несколько ключей кеша (по умолчанию cache_key)
+
+        Returns:
+            dict: Запись кеша (см. api.caching.entries.make_entry) из кеша или от loader
+
+        Raises:
+            ValueError: Если результат лидера не появился в кеше
+        """
+        lock = self._lock(lock_key or cache_key)
+        if lock.acquire(blocking=False):
+            self._increment("leader")
+            try:
+                cached = read_entry(self.cache.get(cache_key))
+                if cached is not None:
+                    return cached
+                return loader()
+            finally:
+                self._release(lock, cache_key)
+
+        self._increment("coalesced")
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            cached = read_entry(self.cache.get(cache_key))
+            if cached is not None:
+                return cached
+            if not lock.locked():
+                break
+        raise ValueError("Не удалось дождаться ответа внешнего API.")
+
+    def refresh(self, cache_key: str, loader, lock_key: str | None = None) -> None:
+        """
+        Планирует фоновое обновление ключа, не блокируя текущий запрос.
+
+        Обновление пропускается, если оно уже запланировано в этом процессе
+        или блокировку удерживает другой процесс.
+
+        Args:
+            cache_key (str): Ключ кеша, который обновляет loader
+            loader (callable): Функция без аргументов, которая получает данные и сохраняет их в кеш
+            lock_key (str | None): Ключ блокировки (по умолчанию cache_key)
+        """
+        lock_key = lock_key or cache_key
+        with self._pending_lock:
+            if lock_key in self._pending:
+                return
+            self._pending.add(lock_key)
+        self._executor.submit(self._run_refresh, cache_key, loader, lock_key)
+
+    def refresh_now(self, cache_key: str, loader, lock_key: str | None = None) -> bool:
+        """
+        Обновляет ключ в текущем потоке, если блокировку не удерживает другой запрос.
+
+        Args:
+            cache_key (str): Ключ кеша, который обновляет loader
+            loader (callable): Функция без аргументов, которая получает данные и сохраняет их в кеш
+            lock_key (str | None): Ключ блокировки (по умолчанию cache_key)
+
+        Returns:
+            bool: True, если loader был выполнен
+
+        Raises:
+            Исключения loader передаются вызывающему коду
+        """
+        lock = self._lock(lock_key or cache_key)
+        if not lock.acquire(blocking=False):
+            return False
+        self._increment("refresh")
+        try:
+            loader()
+        finally:
+            self._release(lock, cache_key)
+        return True
+
+    def _run_refresh(self, cache_key: str, loader, lock_key: str) -> None:
+        try:
+            self.refresh_now(cache_key, loader, lock_key)
+        except Exception as e:
+            logger.warning(f"[SingleFlight] Фоновое обновление {cache_key} не удалось: {e}")
+        finally:
+            with self._pending_lock:
+                self._pending.discard(lock_key)
+
+    async def afetch(self, cache_key: str, loader, lock_key: str | None = None):
+        """
+        Асинхронная версия fetch(): loader — функция без аргументов, возвращающая корутину.
+        """
+        lock = self._lock(lock_key or cache_key)
+        if await sync_to_async(lock.acquire, thread_sensitive=False)(blocking=False):
+            self._increment("leader")
+            try:
+                cached = read_entry(await self.cache.aget(cache_key))
+                if cached is not None:
+                    return cached
+                return await loader()
+            finally:
+                await sync_to_async(self._release, thread_sensitive=False)(lock, cache_key)
+
+        self._increment("coalesced")
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            cached = read_entry(await self.cache.aget(cache_key))
+            if cached is not None:
+                return cached
+            if not await sync_to_async(lock.locked, thread_sensitive=False)():
+                break
+        raise ValueError("Не удалось дождаться ответа внешнего API.")
+
+    def arefresh(self, cache_key: str, loader, lock_key: str | None = None) -> None:
+        """
+        Асинхронная версия refresh(): обновление выполняется задачей в текущем event loop.
+        """
+        lock_key = lock_key or cache_key
+        with self._pending_lock:
+            if lock_key in self._pending:
+                return
+            self._pending.add(lock_key)
+        task = asyncio.create_task(self._arun_refresh(cache_key, loader, lock_key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _arun_refresh(self, cache_key: str, loader, lock_key: str) -> None:
+        try:
+            lock = self._lock(lock_key)
+            if not await sync_to_async(lock.acquire, thread_sensitive=False)(blocking=False):
+                return
+            self._increment("refresh")
+            try:
+                await loader()
+            finally:
+                await sync_to_async(self._release, thread_sensitive=False)(lock, cache_key)
+        except Exception as e:
+            logger.warning(f"[SingleFlight] Фоновое обновление {cache_key} не удалось: {e}")
+        finally:
+            with self._pending_lock:
+                self._pending.discard(lock_key)
+
+    def stats(self) -> dict:
+        """
+        Возвращает счетчики текущего процесса.
+
+        Returns:
+            dict: {
+                "leader": int,     # Запросы, выполненные лидером
+                "coalesced": int,  # Запросы, дождавшиеся результата лидера
+                "refresh": int     # Выполненные фоновые обновления
+            }
+        """
+        with self._counters_lock:
+            return dict(self._counters)
+
+    def _increment(self, counter: str) -> None:
+        with self._counters_lock:
+            self._counters[counter] += 1
+        SINGLE_FLIGHT_EVENTS.labels(counter).inc()
+
+    def _lock(self, lock_key: str):
+        # Блокировка может освобождаться не в том потоке, где была захвачена (sync_to_async)
+        return self.cache.lock(f"lock:{lock_key}", timeout=self.lock_timeout, thread_local=False)
+
+    @staticmethod
+    def _release(lock, cache_key: str) -> None:
+        try:
+            lock.release()
+        except LockError:
+            logger.warning(f"[SingleFlight] Блокировка {cache_key} истекла до завершения запроса")
@@ -0,0 +1,259 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django_redis import get_redis_connection
+
+from utils.metrics import CACHE_TIER_LOOKUPS, observe_phase
+
+logger = logging.getLogger(__name__)
+
+
+class LocalLRUCache:
+    """
+    Ограниченный по размеру LRU-кеш в памяти процесса с коротким временем жизни записей.
+    """
+
+    def __init__(self, max_size: int, timeout: float):
+        """
+        Args:
+            max_size (int): Максимальное количество записей
+            timeout (float): Время жизни записи в секундах
+        """
+        self.max_size = max_size
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """
+        Возвращает значение или None, если записи нет или она истекла.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value) -> None:
+        """
+        Сохраняет значение, вытесняя самые давно использованные записи при переполнении.
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete_many(self, keys) -> None:
+        """
+        Удаляет записи по ключам.
+        """
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Удаляет все записи.
+        """
+        with self._lock:
+            self._data.clear()
+
+
+class TieredCache:
+    """
+    Двухуровневый кеш: LRU в памяти процесса перед общим кешем Django (Redis).
+
+    Чтение сначала проверяет локальный уровень, затем Redis; найденное в Redis
+    значение копируется в локальный уровень на короткое время. Удаление ключа
+    публикуется в канал Redis pub/sub, и каждый рабочий процесс удаляет его из
+    своего локального уровня.
+
+    Реализует подмножество API кеша Django, которое использует WeatherService,
+    включая асинхронные методы и lock(). У django-redis нет асинхронного клиента,
+    а методы a* кеша Django по умолчанию выполняют запросы по одному в общем
+    синхронном потоке (thread_sensitive=True). Поэтому асинхронные методы выполняют
+    запросы к Redis в пуле потоков (thread_sensitive=False), как single_flight — блокировки.
+
+    Статистика попаданий и промахов по
+    уровням доступна через метод stats() и метрику weather_cache_tier_lookups_total;
+    время обращений к Redis учитывается в фазе cache.
+    """
+
+    def __init__(self, remote, alias: str, max_size: int, timeout: float, channel: str):
+        """
+        Args:
+            remote: Кеш Django второго уровня (django_redis)
+            alias (str): Алиас кеша в CACHES для подключения к pub/sub
+            max_size (int): Максимальное количество записей в локальном уровне (0 — отключен)
+            timeout (float): Время жизни записи в локальном уровне в секундах
+            channel (str): Канал Redis pub/sub для инвалидации ключей
+        """
+        self.remote = remote
+        self.alias = alias
+        self.channel = channel
+        self.local = LocalLRUCache(max_size, timeout)
+        self._counters = {"local": {"hits": 0, "misses": 0}, "redis": {"hits": 0, "misses": 0}}
+        self._counters_lock = threading.Lock()
+        self._subscriber_pid = None
+        self._subscriber_lock = threading.Lock()
+
+    def get(self, key: str, default=None):
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        with observe_phase("cache"):
+            value = self.remote.get(key)
+        return self._remember(key, value, default)
+
+    async def aget(self, key: str, default=None):
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        with observe_phase("cache"):
+            value = await sync_to_async(self.remote.get, thread_sensitive=False)(key)
+        return self._remember(key, value, default)
+
+    def get_many(self, keys) -> dict:
+        found, missing = self._get_many_local(keys)
+        if missing:
+            with observe_phase("cache"):
+                values = self.remote.get_many(missing)
+            found.update(self._remember_many(missing, values))
+        return found
+
+    async def aget_many(self, keys) -> dict:
+        found, missing = self._get_many_local(keys)
+        if missing:
+            with observe_phase("cache"):
+                values = await sync_to_async(self.remote.get_many, thread_sensitive=False)(missing)
+            found.update(self._remember_many(missing, values))
+        return found
+
+    def set(self, key: str, value, timeout=None) -> None:
+        with observe_phase("cache"):
+            self.remote.set(key, value, timeout=timeout)
+        self.local.set(key, value)
+
+    async def aset(self, key: str, value, timeout=None) -> None:
+        with observe_phase("cache"):
+            await sync_to_async(self.remote.set, thread_sensitive=False)(key, value, timeout=timeout)
+        self.local.set(key, value)
+
+    def set_many(self, data: dict, timeout=None) -> None:
+        with observe_phase("cache"):
+            self.remote.set_many(data, timeout=timeout)
+        for key, value in data.items():
+            self.local.set(key, value)
+
+    async def aset_many(self, data: dict, timeout=None) -> None:
+        with observe_phase("cache"):
+            await sync_to_async(self.remote.set_many, thread_sensitive=False)(data, timeout=timeout)
+        for key, value in data.items():
+            self.local.set(key, value)
+
+    def delete(self, key: str) -> None:
+        self.delete_many([key])
+
+    def delete_many(self, keys) -> None:
+        """
+        Удаляет ключи из Redis и из локального уровня всех рабочих процессов.
+        """
+        keys = list(keys)
+        if not keys:
+            return
+        with observe_phase("cache"):
+            self.remote.delete_many(keys)
+        self.local.delete_many(keys)
+        try:
+            get_redis_connection(self.alias).publish(self.channel, json.dumps(keys))
+        except Exception as e:
+            logger.warning(f"[TieredCache] Не удалось опубликовать инвалидацию {keys}: {e}")
+
+    def lock(self, key: str, **kwargs):
+        return self.remote.lock(key, **kwargs)
+
+    def stats(self) -> dict:
+        """
+        Возвращает статистику попаданий и промахов текущего процесса по уровням.
+
+        Returns:
+            dict: {
+                "local": {"hits": int, "misses": int},  # LRU в памяти процесса
+                "redis": {"hits": int, "misses": int}   # Общий кеш Redis
+            }
+        """
+        with self._counters_lock:
+            return {tier: dict(counters) for tier, counters in self._counters.items()}
+
+    def _get_local(self, key: str):
+        self._ensure_subscriber()
+        value = self.local.get(key)
+        self._count("local", value is not None)
+        return value
+
+    def _get_many_local(self, keys):
+        found, missing = {}, []
+        for key in keys:
+            value = self._get_local(key)
+            if value is not None:
+                found[key] = value
+            else:
+                missing.append(key)
+        return found, missing
+
+    def _remember(self, key: str, value, default):
+        self._count("redis", value is not None)
+        if value is None:
+            return default
+        self.local.set(key, value)
+        return value
+
+    def _remember_many(self, keys, values: dict) -> dict:
+        for key in keys:
+            self._remember(key, values.get(key), None)
+        return values
+
+    def _count(self, tier: str, hit: bool) -> None:
+        result = "hits" if hit else "misses"
+        with self._counters_lock:
+            self._counters[tier][result] += 1
+        CACHE_TIER_LOOKUPS.labels(tier, result).inc()
+
+    def _ensure_subscriber(self) -> None:
+        """
+        Запускает в текущем процессе поток, удаляющий ключи локального уровня по сообщениям pub/sub.
+        """
+        pid = os.getpid()
+        if self._subscriber_pid == pid or self.local.max_size <= 0:
+            return
+        with self._subscriber_lock:
+            if self._subscriber_pid == pid:
+                return
+            self._subscriber_pid = pid
+            threading.Thread(target=self._listen, name="tiered-cache-invalidation", daemon=True).start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = get_redis_connection(self.alias).pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    self.local.delete_many(json.loads(message["data"]))
+            except Exception as e:
+                logger.warning(f"[TieredCache] Подписка на инвалидацию прервана: {e}")
+                # Пока подписки нет, сообщения теряются: очищаем локальный уровень целиком
+                self.local.clear()
+                time.sleep(1)
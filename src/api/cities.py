@@ -0,0 +1,150 @@
+import bisect
+import logging
+import threading
+import time
+from typing import NamedTuple
+
+from django.db import DatabaseError, connections
+
+from api.models import City, CityAlias
+from api.normalization import normalize_city_name
+from project import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CanonicalCity(NamedTuple):
+    """
+    Город после нормализации и разрешения псевдонимов.
+
+    key — канонический идентификатор (ключи кеша, переопределения, популярность),
+    name и country — параметры запроса к Weatherbit.
+    """
+
+    key: str
+    name: str
+    country: str = ""
+
+    # Метка типа запроса в метриках
+    target = "city"
+
+    @property
+    def query(self) -> dict:
+        """
+        Параметры места для запроса к поставщику погоды.
+        """
+        return {"city": self.name, "country": self.country} if self.country else {"city": self.name}
+
+
+class CityIndex:
+    """
+    Справочник городов в памяти процесса: названия и псевдонимы -> канонический город.
+
+    Загружается из таблиц City и CityAlias при запуске приложения (load) или при первом
+    обращении и перечитывается в фоне раз в refresh_interval секунд; до окончания перечитывания используется
+    прежняя версия. Отсортированный список названий дает поиск по префиксу
+    за O(log n). Город, которого нет в справочнике, получает ключ, равный
+    нормализованному названию.
+    """
+
+    def __init__(self, refresh_interval: float):
+        """
+        Args:
+            refresh_interval (float): Интервал перечитывания справочника в секундах (0 — не перечитывать)
+        """
+        self.refresh_interval = refresh_interval
+        self._snapshot = ({}, [])
+        self._loaded_at = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def resolve(self, name: str) -> CanonicalCity:
+        """
+        Возвращает канонический город по названию в произвольной записи.
+        """
+        normalized = normalize_city_name(name)
+        self._ensure_loaded()
+        cities, _ = self._snapshot
+        return cities.get(normalized) or CanonicalCity(normalized, normalized)
+
+    def search(self, prefix: str, limit: int) -> list[CanonicalCity]:
+        """
+        Ищет города, название или псевдоним которых начинается с prefix.
+
+        Returns:
+            list[CanonicalCity]: Не более limit городов без повторов, в алфавитном порядке совпавших названий
+        """
+        normalized = normalize_city_name(prefix)
+        if not normalized or limit <= 0:
+            return []
+        self._ensure_loaded()
+        cities, names = self._snapshot
+        found = {}
+        position = bisect.bisect_left(names, normalized)
+        while position < len(names) and len(found) < limit and names[position].startswith(normalized):
+            city = cities[names[position]]
+            found.setdefault(city.key, city)
+            position += 1
+        return list(found.values())
+
+    def reload(self) -> int:
+        """
+        Перечитывает справочник из БД.
+
+        Returns:
+            int: Количество названий и псевдонимов в справочнике
+        """
+        cities = {
+            key: CanonicalCity(key, name, country)
+            for key, name, country in City.objects.values_list("key", "name", "country")
+        }
+        for alias, key in CityAlias.objects.values_list("alias", "city__key"):
+            # Ключ одного города не может быть переназначен псевдонимом другого
+            cities.setdefault(alias, cities[key])
+        self._snapshot = (cities, sorted(cities))
+        self._loaded_at = time.monotonic()
+        logger.info(f"[CityIndex] Справочник городов загружен: {len(cities)} названий")
+        return len(cities)
+
+    def load(self) -> None:
+        """
+        Загружает справочник, если он еще не загружен.
+
+        Вызывается при запуске приложения (project.asgi, project.wsgi), до цикла событий:
+        иначе первый запрос асинхронного представления ждал бы загрузку из БД, блокируя цикл.
+        """
+        self._ensure_loaded()
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded_at is None:
+            with self._lock:
+                if self._loaded_at is None:
+                    # Без load() при запуске (команды управления, тесты). Отдельный поток: справочник
+                    # может впервые понадобиться в асинхронном коде, где Django не разрешает синхронные
+                    # запросы к БД
+                    thread = threading.Thread(target=self._load, name="city-index")
+                    thread.start()
+                    thread.join()
+            return
+
+        if self.refresh_interval <= 0 or time.monotonic() - self._loaded_at < self.refresh_interval:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._load, name="city-index", daemon=True).start()
+
+    def _load(self) -> None:
+        try:
+            self.reload()
+        except DatabaseError as e:
+            # Например, миграции еще не применены: работаем только с нормализацией названий
+            logger.warning(f"[CityIndex] Не удалось загрузить справочник городов: {e}")
+            self._loaded_at = time.monotonic()
+        finally:
+            self._refreshing = False
+            connections.close_all()
+
+
+city_index = CityIndex(refresh_interval=settings.CITY_INDEX_REFRESH_INTERVAL)
@@ -0,0 +1,109 @@
+from typing import NamedTuple
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Префикс ключа ячейки: отличает координаты от названий городов в ключах кеша и счетчиках популярности
+GEO_KEY_PREFIX = "geo:"
+
+
+class GeoCell(NamedTuple):
+    """
+    Ячейка сетки geohash, к которой привязаны координаты запроса.
+
+    key — ключ ячейки (ключи кеша, популярность), lat и lon — центр ячейки,
+    который передается в Weatherbit: все точки ячейки делят один ответ.
+    """
+
+    key: str
+    lat: float
+    lon: float
+
+    # Метка типа запроса в метриках
+    target = "coordinates"
+
+    @property
+    def query(self) -> dict:
+        """
+        Параметры места для запроса к поставщику погоды.
+        """
+        return {"lat": self.lat, "lon": self.lon}
+
+
+def encode_geohash(lat: float, lon: float, precision: int) -> str:
+    """
+    Кодирует координаты в geohash заданной длины.
+
+    Каждый символ добавляет 5 бит, поочередно уточняющих долготу и широту:
+    длина 5 дает ячейку около 4.9 x 4.9 км, 6 — около 1.2 x 0.6 км.
+    """
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, lon) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def decode_geohash(geohash: str) -> tuple[float, float]:
+    """
+    Возвращает центр ячейки geohash (широта, долгота).
+
+    Raises:
+        ValueError: Если строка не является geohash
+    """
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        index = GEOHASH_ALPHABET.find(char)
+        if index < 0:
+            raise ValueError(f"Некорректный geohash: {geohash}")
+        for shift in range(4, -1, -1):
+            interval = lon_range if even else lat_range
+            middle = (interval[0] + interval[1]) / 2
+            if index >> shift & 1:
+                interval[0] = middle
+            else:
+                interval[1] = middle
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+def snap_to_cell(lat: float, lon: float, precision: int) -> GeoCell:
+    """
+    Привязывает координаты к ячейке geohash заданной длины.
+    """
+    return cell_from_geohash(encode_geohash(lat, lon, precision))
+
+
+def cell_from_geohash(geohash: str) -> GeoCell:
+    """
+    Возвращает ячейку по geohash; центр округляется до 5 знаков (около 1 м).
+    """
+    lat, lon = decode_geohash(geohash)
+    return GeoCell(f"{GEO_KEY_PREFIX}{geohash}", round(lat, 5), round(lon, 5))
+
+
+def cell_from_key(key: str) -> GeoCell | None:
+    """
+    Восстанавливает ячейку по ее ключу (например, из списка популярных городов).
+
+    Returns:
+        GeoCell | None: Ячейка или None, если ключ не является ключом ячейки
+    """
+    geohash = key[len(GEO_KEY_PREFIX) :]
+    if not key.startswith(GEO_KEY_PREFIX) or not geohash:
+        return None
+    try:
+        return cell_from_geohash(geohash)
+    except ValueError:
+        return None
@@ -0,0 +1,128 @@
+import csv
+import json
+import logging
+
+from api.cities import city_index
+from api.serializers import ForecastOverrideImportSerializer
+from api.services import WeatherService
+from project import settings
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+CONTENT_TYPE_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+def read_csv_rows(lines):
+    """
+    Построчно читает переопределения прогноза в формате CSV.
+
+    Первая строка — заголовок с полями city, date, min_temperature, max_temperature.
+
+    Args:
+        lines: Итератор строк (str или bytes в UTF-8)
+
+    Yields:
+        tuple[int, dict]: (номер строки, данные строки)
+    """
+    reader = csv.DictReader(_decode(lines))
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_ndjson_rows(lines):
+    """
+    Построчно читает переопределения прогноза в формате NDJSON (один JSON-объект на строку).
+
+    Args:
+        lines: Итератор строк (str или bytes в UTF-8)
+
+    Yields:
+        tuple[int, dict | None]: (номер строки, данные строки или None, если строка не является JSON-объектом)
+    """
+    for line_number, line in enumerate(_decode(lines), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def read_rows(lines, import_format: str):
+    """
+    Возвращает итератор строк для указанного формата (csv или ndjson).
+    """
+    if import_format == "csv":
+        return read_csv_rows(lines)
+    return read_ndjson_rows(lines)
+
+
+def import_forecast_overrides(rows, batch_size: int | None = None) -> dict:
+    """
+    Потоково загружает переопределения прогноза пачками.
+
+    Каждая строка проверяется правилами ForecastOverrideSerializer, валидные строки
+    записываются через WeatherService.bulk_update_forecast_overrides пачками по batch_size.
+    Если пара (city, date) повторяется в пачке, используется последняя строка.
+
+    Args:
+        rows: Итератор (номер строки, данные строки) из read_csv_rows/read_ndjson_rows
+        batch_size (int | None): Размер пачки (по умолчанию OVERRIDE_IMPORT_BATCH_SIZE)
+
+    Returns:
+        dict: {
+            "imported": int,      # Записано переопределений
+            "batches": int,       # Выполнено пачек
+            "error_count": int,   # Строк с ошибками
+            "errors": list[dict]  # Первые OVERRIDE_IMPORT_MAX_ERRORS ошибок: {"line": int, "errors": ...}
+        }
+    """
+    batch_size = batch_size or settings.OVERRIDE_IMPORT_BATCH_SIZE
+    result = {"imported": 0, "batches": 0, "error_count": 0, "errors": []}
+    batch = {}
+
+    def flush():
+        if batch:
+            result["imported"] += WeatherService.bulk_update_forecast_overrides(list(batch.values()))
+            result["batches"] += 1
+            batch.clear()
+
+    for line_number, row in rows:
+        if row is None:
+            _add_error(result, line_number, {"non_field_errors": ["Строка не является JSON-объектом."]})
+            continue
+
+        serializer = ForecastOverrideImportSerializer(data=row)
+        if not serializer.is_valid():
+            _add_error(result, line_number, serializer.errors)
+            continue
+
+        data = serializer.validated_data
+        batch[(city_index.resolve(data["city"]).key, data["date"])] = data
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    logger.info(
+        f"Загрузка переопределений: записано {result['imported']} в {result['batches']} пачках, "
+        f"ошибок {result['error_count']}"
+    )
+    return result
+
+
+def _add_error(result: dict, line_number: int, errors) -> None:
+    result["error_count"] += 1
+    if len(result["errors"]) < settings.OVERRIDE_IMPORT_MAX_ERRORS:
+        result["errors"].append({"line": line_number, "errors": errors})
+
+
+def _decode(lines):
+    for line in lines:
+        yield line.decode("utf-8-sig") if isinstance(line, bytes) else line
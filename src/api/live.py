@@ -0,0 +1,296 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django_redis import get_redis_connection
+
+from utils.metrics import LIVE_CONNECTIONS, LIVE_EVENTS
+
+logger = logging.getLogger(__name__)
+
+# Сигнал подписке: часть событий могла быть пропущена, нужно дочитать их из потока Redis
+RESYNC = object()
+
+# Максимальное время ожидания сообщения pub/sub: с таким запозданием применяются новые подписки
+POLL_INTERVAL = 0.5
+
+EVENT_ID_PATTERN = re.compile(r"^\d+-\d+$")
+
+
+def parse_event_id(value: str | None) -> tuple[int, int] | None:
+    """
+    Разбирает ID события (ID записи потока Redis "<мс>-<номер>") в кортеж для сравнения.
+
+    Returns:
+        tuple[int, int] | None: (мс, номер) или None, если значение некорректно
+    """
+    if not value or not EVENT_ID_PATTERN.match(value):
+        return None
+    ms, seq = value.split("-")
+    return int(ms), int(seq)
+
+
+class Subscription:
+    """
+    Подписка одного клиента на обновления текущей погоды в городах.
+
+    События (словари {"id", "city", "data"}) и сигнал RESYNC доставляются в очередь
+    asyncio из потока-слушателя pub/sub. Если клиент не успевает их читать и очередь
+    переполнена, очередь заменяется одним RESYNC: пропущенное дочитывается из потока Redis.
+    """
+
+    def __init__(self, cities, queue_size: int):
+        self.cities = frozenset(cities)
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.loop = asyncio.get_running_loop()
+
+    def offer(self, item) -> None:
+        """
+        Передает событие в очередь подписки из любого потока.
+        """
+        try:
+            self.loop.call_soon_threadsafe(self._put, item)
+        except RuntimeError:
+            # Цикл событий уже закрыт — подписка будет снята в finally генератора
+            pass
+
+    def _put(self, item) -> None:
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class LiveUpdates:
+    """
+    Рассылка обновлений текущей погоды подписчикам потока SSE через Redis.
+
+    Каждое обновление кеша текущей погоды публикуется один раз: запись добавляется
+    в поток Redis stream_key (не длиннее stream_maxlen) и ее ID рассылается в канал
+    pub/sub города. В каждом рабочем процессе один поток-слушатель подписан на каналы
+    городов, которые нужны его клиентам, и раздает события их очередям. Поэтому
+    одно обновление доходит до всех подписчиков, сколько бы их ни было.
+
+    ID события — ID записи в потоке Redis. Клиент, переподключившийся с Last-Event-ID,
+    дочитывает пропущенное из потока (replay). Так же дочитываются события, пропущенные
+    при переподключении слушателя к Redis и при переполнении очереди клиента.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        alias: str,
+        channel_prefix: str,
+        stream_key: str,
+        stream_maxlen: int,
+        queue_size: int,
+    ):
+        """
+        Args:
+            enabled (bool): Публиковать обновления (False — поток обновлений отключен)
+            alias (str): Алиас кеша в CACHES для подключения к Redis
+            channel_prefix (str): Префикс каналов pub/sub городов
+            stream_key (str): Ключ потока Redis с последними событиями для возобновления
+            stream_maxlen (int): Приблизительная максимальная длина потока
+            queue_size (int): Максимальное количество событий в очереди одного клиента
+        """
+        self.enabled = enabled
+        self.alias = alias
+        self.channel_prefix = channel_prefix
+        self.stream_key = stream_key
+        self.stream_maxlen = stream_maxlen
+        self.queue_size = queue_size
+        # Подписки клиентов текущего процесса по каналам pub/sub
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._listener_pid = None
+        self._refreshed_at = {}
+
+    def publish(self, city: str, data: dict) -> str | None:
+        """
+        Публикует текущую погоду в городе подписчикам.
+
+        Ошибка Redis не поднимается: обновление кеша важнее рассылки, а клиенты
+        получат данные со следующим обновлением.
+
+        Args:
+            city (str): Канонический ключ города
+            data (dict): Текущая погода
+
+        Returns:
+            str | None: ID события или None, если оно не опубликовано
+        """
+        if not self.enabled:
+            return None
+        try:
+            redis = get_redis_connection(self.alias)
+            event_id = redis.xadd(
+                self.stream_key,
+                {"city": city, "data": json.dumps(data)},
+                maxlen=self.stream_maxlen,
+                approximate=True,
+            ).decode()
+            redis.publish(self._channel(city), json.dumps({"id": event_id, "city": city, "data": data}))
+        except Exception as e:
+            LIVE_EVENTS.labels("failed").inc()
+            logger.warning(f"[LiveUpdates] Не удалось опубликовать обновление по {city}: {e}")
+            return None
+        LIVE_EVENTS.labels("published").inc()
+        return event_id
+
+    async def apublish(self, city: str, data: dict) -> str | None:
+        """
+        Асинхронная версия publish.
+        """
+        return await sync_to_async(self.publish, thread_sensitive=False)(city, data)
+
+    def subscribe(self, cities) -> Subscription:
+        """
+        Подписывает клиента на города. Вызывается из цикла событий asyncio.
+
+        Поток-слушатель подписывается на новые каналы в течение POLL_INTERVAL секунд
+        и после подтверждения подписки отправляет RESYNC: события, опубликованные
+        в этом промежутке, дочитываются из потока Redis.
+        """
+        subscription = Subscription(cities, self.queue_size)
+        with self._lock:
+            for city in subscription.cities:
+                self._subscriptions.setdefault(self._channel(city), set()).add(subscription)
+        self._changed.set()
+        LIVE_CONNECTIONS.inc()
+        self._ensure_listener()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for city in subscription.cities:
+                subscriptions = self._subscriptions.get(self._channel(city), set())
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    self._subscriptions.pop(self._channel(city), None)
+        self._changed.set()
+        LIVE_CONNECTIONS.dec()
+
+    def claim_refresh(self, cities, interval: float) -> list[str]:
+        """
+        Отбирает города, свежесть кеша которых этот процесс не проверял последние interval секунд,
+        и отмечает их проверенными: клиенты с одними городами не проверяют их повторно.
+        """
+        now = time.monotonic()
+        claimed = []
+        with self._lock:
+            for city in cities:
+                if now - self._refreshed_at.get(city, float("-inf")) >= interval:
+                    self._refreshed_at[city] = now
+                    claimed.append(city)
+            # Города без подписчиков больше не проверяются
+            for city in [city for city, at in self._refreshed_at.items() if now - at >= 2 * interval]:
+                del self._refreshed_at[city]
+        return claimed
+
+    def last_event_id(self) -> str:
+        """
+        Возвращает ID последнего события в потоке Redis ("0-0", если поток пуст).
+        """
+        entries = get_redis_connection(self.alias).xrevrange(self.stream_key, count=1)
+        return entries[0][0].decode() if entries else "0-0"
+
+    def replay(self, cities, after: str) -> tuple[list[dict], bool]:
+        """
+        Читает из потока Redis события по городам после события after.
+
+        Каждое событие содержит текущую погоду целиком, поэтому по каждому городу
+        возвращается только последнее.
+
+        Returns:
+            tuple[list[dict], bool]: (
+                события {"id", "city", "data"} в порядке публикации,
+                True, если часть событий после after уже удалена из потока
+            )
+        """
+        cities = set(cities)
+        ms, seq = parse_event_id(after)
+        start = f"{ms}-{seq + 1}"
+        redis = get_redis_connection(self.alias)
+        first = redis.xrange(self.stream_key, count=1)
+        gap = bool(first) and (ms, seq) != (0, 0) and parse_event_id(first[0][0].decode()) > (ms, seq + 1)
+
+        latest = {}
+        while True:
+            entries = redis.xrange(self.stream_key, min=start, count=1000)
+            for entry_id, fields in entries:
+                city = fields[b"city"].decode()
+                if city in cities:
+                    latest[city] = {"id": entry_id.decode(), "city": city, "data": json.loads(fields[b"data"])}
+            if len(entries) < 1000:
+                break
+            ms, seq = parse_event_id(entries[-1][0].decode())
+            start = f"{ms}-{seq + 1}"
+        events = sorted(latest.values(), key=lambda event: parse_event_id(event["id"]))
+        LIVE_EVENTS.labels("replayed").inc(len(events))
+        return events, gap
+
+    def _channel(self, city: str) -> str:
+        return f"{self.channel_prefix}{city}"
+
+    def _channels(self) -> set[str]:
+        with self._lock:
+            return set(self._subscriptions)
+
+    def _subscribers(self, channel: str) -> list[Subscription]:
+        with self._lock:
+            return list(self._subscriptions.get(channel, ()))
+
+    def _ensure_listener(self) -> None:
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._lock:
+            if self._listener_pid == pid:
+                return
+            self._listener_pid = pid
+            threading.Thread(target=self._listen, name="live-updates", daemon=True).start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = get_redis_connection(self.alias).pubsub()
+                subscribed = set()
+                while True:
+                    self._changed.clear()
+                    channels = self._channels()
+                    added, removed = channels - subscribed, subscribed - channels
+                    if added:
+                        pubsub.subscribe(*added)
+                    if removed:
+                        pubsub.unsubscribe(*removed)
+                    subscribed = channels
+                    if not subscribed:
+                        self._changed.wait(POLL_INTERVAL)
+                        continue
+                    message = pubsub.get_message(timeout=POLL_INTERVAL)
+                    if message:
+                        self._dispatch(message)
+            except Exception as e:
+                # Новое подключение подпишется заново, а подтверждения подписки вызовут RESYNC
+                logger.warning(f"[LiveUpdates] Подписка на обновления прервана: {e}")
+                time.sleep(1)
+
+    def _dispatch(self, message: dict) -> None:
+        channel = message["channel"].decode()
+        if message["type"] == "subscribe":
+            item = RESYNC
+        elif message["type"] == "message":
+            item = json.loads(message["data"])
+        else:
+            return
+        for subscription in self._subscribers(channel):
+            subscription.offer(item)
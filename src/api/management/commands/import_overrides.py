@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importers import IMPORT_FORMATS, import_forecast_overrides, read_rows
+
+
+class Command(BaseCommand):
+    help = "Загружает переопределения прогноза из CSV или NDJSON пачками (upsert по городу и дате)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу или '-' для чтения из stdin")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="Формат входных данных (по умолчанию определяется по расширению файла)",
+        )
+        parser.add_argument("--batch-size", type=int, help="Размер пачки (по умолчанию OVERRIDE_IMPORT_BATCH_SIZE)")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        import_format = options["format"] or Path(path).suffix.lstrip(".").lower()
+        if import_format == "jsonl":
+            import_format = "ndjson"
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError("Не удалось определить формат, укажите --format csv или --format ndjson.")
+
+        if path == "-":
+            result = import_forecast_overrides(read_rows(sys.stdin, import_format), options["batch_size"])
+        else:
+            try:
+                with open(path, encoding="utf-8-sig", newline="") as stream:
+                    result = import_forecast_overrides(read_rows(stream, import_format), options["batch_size"])
+            except OSError as e:
+                raise CommandError(f"Не удалось открыть файл {path}: {e}")
+
+        for error in result["errors"]:
+            self.stderr.write(f"Строка {error['line']}: {error['errors']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Записано переопределений: {result['imported']} (пачек: {result['batches']}), "
+                f"строк с ошибками: {result['error_count']}"
+            )
+        )
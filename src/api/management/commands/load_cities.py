@@ -0,0 +1,87 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import City, CityAlias
+from api.normalization import normalize_city_name
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Загружает справочник городов из CSV с колонками name, country, aliases и необязательной key "
+        "(псевдонимы разделяются '|'). Существующие города и псевдонимы обновляются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к CSV-файлу или '-' для чтения из stdin")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if path == "-":
+            cities, aliases, errors = self.read_cities(sys.stdin)
+        else:
+            try:
+                with open(path, encoding="utf-8-sig", newline="") as stream:
+                    cities, aliases, errors = self.read_cities(stream)
+            except OSError as e:
+                raise CommandError(f"Не удалось открыть файл {path}: {e}")
+
+        for line_number, message in errors:
+            self.stderr.write(f"Строка {line_number}: {message}")
+
+        with transaction.atomic():
+            City.objects.bulk_create(
+                cities.values(),
+                update_conflicts=True,
+                unique_fields=["key"],
+                update_fields=["name", "country"],
+                batch_size=BATCH_SIZE,
+            )
+            city_ids = dict(City.objects.values_list("key", "id"))
+            CityAlias.objects.bulk_create(
+                [CityAlias(alias=alias, city_id=city_ids[key]) for alias, key in aliases.items()],
+                update_conflicts=True,
+                unique_fields=["alias"],
+                update_fields=["city"],
+                batch_size=BATCH_SIZE,
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Загружено городов: {len(cities)}, псевдонимов: {len(aliases)}, строк с ошибками: {len(errors)}"
+            )
+        )
+
+    @staticmethod
+    def read_cities(stream):
+        """
+        Читает города из CSV.
+
+        bulk_create не вызывает save(), поэтому ключи и псевдонимы нормализуются здесь.
+
+        Returns:
+            tuple[dict, dict, list]: (города по ключу, ключ города по псевдониму, ошибки (номер строки, текст))
+        """
+        cities, aliases, errors = {}, {}, []
+        reader = csv.DictReader(stream)
+        for row in reader:
+            name = (row.get("name") or "").strip()
+            country = (row.get("country") or "").strip().upper()
+            if not name:
+                errors.append((reader.line_num, "Не указано название города."))
+                continue
+            if len(country) > 2:
+                errors.append((reader.line_num, f"Некорректный код страны: {country}"))
+                continue
+
+            key = normalize_city_name(row.get("key") or name)
+            cities[key] = City(key=key, name=name, country=country)
+            for alias in (row.get("aliases") or "").split("|"):
+                alias = normalize_city_name(alias)
+                if alias and alias != key:
+                    aliases[alias] = key
+        return cities, aliases, errors
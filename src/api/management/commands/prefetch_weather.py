@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from api.prefetch import Prefetcher
+from project import settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Заранее обновляет кеш текущей погоды и прогноза для городов из PREFETCH_CITIES "
+        "и самых запрашиваемых городов, пока не истек их срок жизни."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Выполнить один проход и завершиться")
+        parser.add_argument("--interval", type=float, default=settings.PREFETCH_INTERVAL, help="Интервал проходов, с")
+        parser.add_argument(
+            "--concurrency", type=int, default=settings.PREFETCH_CONCURRENCY, help="Одновременных обновлений"
+        )
+        parser.add_argument(
+            "--rate-limit", type=int, default=settings.PREFETCH_RATE_LIMIT, help="Запросов к API в минуту"
+        )
+
+    def handle(self, *args, **options):
+        prefetcher = Prefetcher(
+            concurrency=options["concurrency"],
+            rate_limit=options["rate_limit"],
+            lead_time=settings.PREFETCH_LEAD_TIME,
+            jitter=settings.PREFETCH_JITTER,
+        )
+        self.stdout.write(
+            f"Предзагрузка: интервал {options['interval']} с, потоков {options['concurrency']}, "
+            f"до {options['rate_limit']} запросов в минуту"
+        )
+        try:
+            prefetcher.run_forever(options["interval"], settings.PREFETCH_POPULARITY_DECAY, once=options["once"])
+        except KeyboardInterrupt:
+            self.stdout.write("Предзагрузка остановлена.")
@@ -0,0 +1,28 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from api.observations import drop_partitions, list_partitions
+from project import settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет секции таблицы наблюдений WeatherObservation старше OBSERVATION_RETENTION_DAYS дней "
+        "(секция удаляется целиком, без построчного DELETE)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.OBSERVATION_RETENTION_DAYS, help="Сколько последних дней хранить"
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Только показать секции, которые будут удалены")
+
+    def handle(self, *args, **options):
+        before = date.today() - timedelta(days=options["days"])
+        if options["dry_run"]:
+            names = [name for day, name in sorted(list_partitions().items()) if day < before]
+            self.stdout.write(f"Будут удалены секции раньше {before}: {', '.join(names) or 'нет'}")
+            return
+        dropped = drop_partitions(before)
+        self.stdout.write(self.style.SUCCESS(f"Удалено секций раньше {before}: {len(dropped)}"))
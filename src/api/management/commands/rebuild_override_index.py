@@ -0,0 +1,18 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from api.models import ForecastOverride
+from api.services import override_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Перестраивает индекс наличия переопределений прогноза в Redis по таблице ForecastOverride "
+        "(переопределения на прошедшие даты в индекс не попадают)."
+    )
+
+    def handle(self, *args, **options):
+        pairs = ForecastOverride.objects.filter(date__gte=date.today()).values_list("city", "date")
+        count = override_index.rebuild((city, day.isoformat()) for city, day in pairs.iterator())
+        self.stdout.write(self.style.SUCCESS(f"Индекс переопределений построен: {count} пар"))
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from api.normalization import normalize_city_name
+
+
+def normalize_override_cities(apps, schema_editor):
+    """
+    Приводит города переопределений к нормализованному виду.
+
+    Если после нормализации совпадают несколько записей на одну дату
+    ("New York" и "new  york"), остается последняя добавленная.
+    """
+    ForecastOverride = apps.get_model("api", "ForecastOverride")
+    seen = set()
+    for override in ForecastOverride.objects.order_by("-id"):
+        city = normalize_city_name(override.city)
+        if (city, override.date) in seen:
+            override.delete()
+            continue
+        seen.add((city, override.date))
+        if city != override.city:
+            ForecastOverride.objects.filter(pk=override.pk).update(city=city)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0002_forecastoverride_api_forecas_city_e9ca35_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="City",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.CharField(max_length=100, unique=True)),
+                ("name", models.CharField(max_length=100)),
+                ("country", models.CharField(blank=True, help_text="Код страны ISO 3166-1 alpha-2", max_length=2)),
+            ],
+            options={
+                "verbose_name_plural": "cities",
+            },
+        ),
+        migrations.CreateModel(
+            name="CityAlias",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("alias", models.CharField(max_length=100, unique=True)),
+                (
+                    "city",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="aliases", to="api.city"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "city aliases",
+            },
+        ),
+        migrations.RunPython(normalize_override_cities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+CREATE_TABLE = """
+CREATE TABLE api_weatherobservation (
+    id bigserial NOT NULL,
+    location varchar(100) NOT NULL,
+    kind varchar(16) NOT NULL,
+    date date NOT NULL,
+    data jsonb NOT NULL,
+    fetched_at timestamp with time zone NOT NULL,
+    PRIMARY KEY (id, date)
+) PARTITION BY RANGE (date);
+CREATE INDEX api_weatherobservation_latest_idx
+    ON api_weatherobservation (location, kind, date, fetched_at DESC);
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0003_city_cityalias"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WeatherObservation",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "location",
+                    models.CharField(help_text="Канонический ключ города или ячейки geohash", max_length=100),
+                ),
+                (
+                    "kind",
+                    models.CharField(choices=[("current", "Текущая погода"), ("forecast", "Прогноз")], max_length=16),
+                ),
+                ("date", models.DateField()),
+                ("data", models.JSONField()),
+                ("fetched_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "api_weatherobservation",
+                "managed": False,
+            },
+        ),
+        migrations.RunSQL(CREATE_TABLE, reverse_sql="DROP TABLE api_weatherobservation;"),
+    ]
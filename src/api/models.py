@@ -1,5 +1,7 @@
 from django.db import models
 
+from api.normalization import normalize_city_name
+
 
 class ForecastOverride(models.Model):
     """
@@ -9,7 +11,8 @@ class ForecastOverride(models.Model):
     имеют приоритет над данными из внешнего API.
 
     Ограничения:
-    - Город хранится в нижнем регистре
+    - Город хранится под каноническим ключом City (см. resolve_city): название
+      и псевдоним одного города дают одну запись
     - Минимальная температура не может быть больше максимальной
     - Комбинация города и даты должна быть уникальной
     """
@@ -29,5 +32,97 @@ class ForecastOverride(models.Model):
         return f"{self.city} - {self.date}"
 
     def save(self, *args, **kwargs):
-        self.city = self.city.lower()
+        self.resolve_city()
         super().save(*args, **kwargs)
+
+    def resolve_city(self) -> None:
+        """
+        Заменяет город каноническим ключом из справочника городов.
+
+        Вызывается из save(); bulk_create и код, которому ключ нужен до сохранения
+        (например, для индекса переопределений), вызывают его явно.
+        """
+        # api.cities импортирует модели, поэтому справочник импортируется при вызове
+        from api.cities import city_index
+
+        self.city = city_index.resolve(self.city).key
+
+
+class City(models.Model):
+    """
+    Город из локального справочника.
+
+    Ключ (key) — канонический идентификатор города: под ним хранятся ключи кеша,
+    переопределения прогнозов и счетчики популярности. В запросах к Weatherbit
+    используются название (name) и код страны (country).
+
+    Ограничения:
+    - Ключ уникален и хранится в нормализованном виде (по умолчанию — нормализованное название)
+    """
+
+    key = models.CharField(max_length=100, unique=True)
+    name = models.CharField(max_length=100)
+    country = models.CharField(max_length=2, blank=True, help_text="Код страны ISO 3166-1 alpha-2")
+
+    class Meta:
+        verbose_name_plural = "cities"
+
+    def __str__(self):
+        return f"{self.name}, {self.country}" if self.country else self.name
+
+    def save(self, *args, **kwargs):
+        self.key = normalize_city_name(self.key or self.name)
+        self.country = self.country.upper()
+        super().save(*args, **kwargs)
+
+
+class CityAlias(models.Model):
+    """
+    Альтернативное название города (другой язык, сокращение, старое название).
+
+    Ограничения:
+    - Псевдоним хранится в нормализованном виде и уникален: он указывает ровно на один город
+    """
+
+    alias = models.CharField(max_length=100, unique=True)
+    city = models.ForeignKey(City, on_delete=models.CASCADE, related_name="aliases")
+
+    class Meta:
+        verbose_name_plural = "city aliases"
+
+    def __str__(self):
+        return f"{self.alias} -> {self.city.key}"
+
+    def save(self, *args, **kwargs):
+        self.alias = normalize_city_name(self.alias)
+        super().save(*args, **kwargs)
+
+
+class WeatherObservation(models.Model):
+    """
+    Ответ Weatherbit, сохраненный в БД: история ответов и запасной источник данных,
+    если записи нет в кеше, а внешний API недоступен.
+
+    Текущая погода хранится под датой получения, прогноз — под датой прогноза.
+    Таблица секционирована по дате (PARTITION BY RANGE, секция на день) и создается
+    миграцией вручную (managed = False): первичный ключ секционированной таблицы
+    включает дату. Секции создаются при записи (api.observations), старые удаляет
+    команда prune_observations.
+    """
+
+    KIND_CURRENT = "current"
+    KIND_FORECAST = "forecast"
+    KIND_CHOICES = [(KIND_CURRENT, "Текущая погода"), (KIND_FORECAST, "Прогноз")]
+
+    location = models.CharField(max_length=100, help_text="Канонический ключ города или ячейки geohash")
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    date = models.DateField()
+    data = models.JSONField()
+    fetched_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = "api_weatherobservation"
+
+    def __str__(self):
+        return f"{self.location} - {self.kind} - {self.date}"
@@ -0,0 +1,23 @@
+import unicodedata
+
+# Символы-разделители, которые в названиях городов равнозначны пробелу ("New-York", "new_york")
+_SEPARATORS = str.maketrans({"-": " ", "_": " ", "‐": " ", "–": " ", "—": " "})
+
+
+def normalize_city_name(name: str) -> str:
+    """
+    Приводит название города к нормальной форме для ключей кеша, хранения и поиска.
+
+    Убирает диакритику ("São Paulo" -> "sao paulo"), приводит регистр (casefold),
+    заменяет дефисы и подчеркивания пробелами, схлопывает повторяющиеся пробелы
+    и обрезает их по краям: "New York", "new  york" и "New-York " дают "new york".
+
+    Args:
+        name (str): Название города в произвольной записи
+
+    Returns:
+        str: Нормализованное название
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    folded = "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+    return " ".join(folded.translate(_SEPARATORS).split())
@@ -0,0 +1,280 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import date, timedelta
+
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from api.models import WeatherObservation
+from utils.metrics import OBSERVATION_WRITES
+
+logger = logging.getLogger(__name__)
+
+TABLE = WeatherObservation._meta.db_table
+PARTITION_PREFIX = f"{TABLE}_p"
+
+
+def partition_name(day: date) -> str:
+    """
+    Имя секции таблицы наблюдений за день: api_weatherobservation_pYYYYMMDD.
+    """
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def ensure_partitions(days) -> None:
+    """
+    Создает недостающие секции таблицы наблюдений (по одной на день).
+
+    Рабочие процессы создают секции одновременно, поэтому создание выполняется
+    под транзакционной advisory-блокировкой PostgreSQL.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [TABLE])
+        for day in sorted(set(days)):
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(day)} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+            )
+
+
+def list_partitions() -> dict:
+    """
+    Возвращает секции таблицы наблюдений: {дата: имя секции}.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = %s",
+            [TABLE],
+        )
+        names = [name for (name,) in cursor.fetchall()]
+    partitions = {}
+    for name in names:
+        try:
+            partitions[date(int(name[-8:-4]), int(name[-4:-2]), int(name[-2:]))] = name
+        except ValueError:
+            logger.warning(f"[ObservationStore] Секция {name} не соответствует шаблону {PARTITION_PREFIX}YYYYMMDD")
+    return partitions
+
+
+def drop_partitions(before: date) -> list[str]:
+    """
+    Удаляет секции таблицы наблюдений за дни раньше before.
+
+    Returns:
+        list[str]: Имена удаленных секций
+    """
+    dropped = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [TABLE])
+        for day, name in sorted(list_partitions().items()):
+            if day < before:
+                cursor.execute(f"DROP TABLE {name}")
+                dropped.append(name)
+    return dropped
+
+
+class ObservationStore:
+    """
+    Хранилище ответов Weatherbit в секционированной таблице WeatherObservation.
+
+    Запись не задерживает запрос: ответы складываются в очередь в памяти процесса,
+    а фоновый поток раз в flush_interval секунд записывает их пачками по batch_size
+    через bulk_create, создавая недостающие секции. При переполнении очереди
+    (queue_size) или ошибке БД ответы отбрасываются: хранилище — история и запасной
+    источник, а не основное хранилище данных.
+
+    Чтение (current, forecast) возвращает последний сохраненный ответ не старше
+    current_max_age или forecast_max_age секунд: так сервис отвечает, когда в кеше
+    нет записи, а внешний API недоступен.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        batch_size: int,
+        flush_interval: float,
+        queue_size: int,
+        current_max_age: float,
+        forecast_max_age: float,
+    ):
+        """
+        Args:
+            enabled (bool): Записывать и читать ответы (False — хранилище отключено)
+            batch_size (int): Количество строк в одном bulk_create
+            flush_interval (float): Интервал записи очереди в БД в секундах
+            queue_size (int): Максимальное количество ответов в очереди процесса
+            current_max_age (float): Допустимый возраст сохраненной текущей погоды в секундах
+            forecast_max_age (float): Допустимый возраст сохраненного прогноза в секундах
+        """
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.current_max_age = current_max_age
+        self.forecast_max_age = forecast_max_age
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._partitions = set()
+        self._lock = threading.Lock()
+        self._writer_pid = None
+
+    def record_current(self, location: str, data: dict) -> None:
+        """
+        Ставит в очередь записи ответ с текущей погодой (под сегодняшней датой).
+        """
+        self._record(location, WeatherObservation.KIND_CURRENT, {date.today().isoformat(): data})
+
+    def record_forecast(self, location: str, forecast_window: dict) -> None:
+        """
+        Ставит в очередь записи прогноз из API: {дата в формате YYYY-MM-DD: прогноз}.
+        """
+        self._record(location, WeatherObservation.KIND_FORECAST, forecast_window)
+
+    def current(self, location: str) -> dict | None:
+        """
+        Возвращает последнюю сохраненную текущую погоду не старше current_max_age или None.
+        """
+        if not self.enabled:
+            return None
+        return self._current_query(location).values_list("data", flat=True).first()
+
+    async def acurrent(self, location: str) -> dict | None:
+        """
+        Асинхронная версия current.
+        """
+        if not self.enabled:
+            return None
+        return await self._current_query(location).values_list("data", flat=True).afirst()
+
+    def forecast(self, location: str, days: list[str]) -> dict:
+        """
+        Возвращает последние сохраненные прогнозы не старше forecast_max_age.
+
+        Args:
+            location (str): Канонический ключ места
+            days (list[str]): Даты в формате YYYY-MM-DD
+
+        Returns:
+            dict: {дата в формате YYYY-MM-DD: прогноз} для найденных дат
+        """
+        if not self.enabled or not days:
+            return {}
+        return {day.isoformat(): data for day, data in self._forecast_query(location, days)}
+
+    async def aforecast(self, location: str, days: list[str]) -> dict:
+        """
+        Асинхронная версия forecast.
+        """
+        if not self.enabled or not days:
+            return {}
+        return {day.isoformat(): data async for day, data in self._forecast_query(location, days)}
+
+    def flush(self) -> int:
+        """
+        Записывает накопленные ответы в БД.
+
+        Returns:
+            int: Количество записанных строк
+        """
+        written = 0
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return written
+            written += self._write(batch)
+
+    def _record(self, location: str, kind: str, days: dict) -> None:
+        if not self.enabled:
+            return
+        fetched_at = timezone.now()
+        observations = [
+            WeatherObservation(
+                location=location, kind=kind, date=date.fromisoformat(day), data=data, fetched_at=fetched_at
+            )
+            for day, data in days.items()
+        ]
+        for index, observation in enumerate(observations):
+            try:
+                self._queue.put_nowait(observation)
+            except queue.Full:
+                dropped = len(observations) - index
+                OBSERVATION_WRITES.labels("dropped").inc(dropped)
+                logger.warning(
+                    f"[ObservationStore] Очередь записи переполнена, по {location} отброшено строк: {dropped}"
+                )
+                break
+        self._ensure_writer()
+
+    def _write(self, batch: list) -> int:
+        try:
+            days = {observation.date for observation in batch} - self._partitions
+            if days:
+                ensure_partitions(days)
+                self._partitions |= days
+            WeatherObservation.objects.bulk_create(batch)
+        except DatabaseError as e:
+            # Секция могла быть удалена командой prune_observations — при следующей записи проверяем заново
+            self._partitions.clear()
+            OBSERVATION_WRITES.labels("failed").inc(len(batch))
+            logger.warning(f"[ObservationStore] Не удалось записать {len(batch)} ответов: {e}")
+            return 0
+        OBSERVATION_WRITES.labels("written").inc(len(batch))
+        return len(batch)
+
+    def _current_query(self, location: str):
+        since = timezone.now() - timedelta(seconds=self.current_max_age)
+        # Условие по дате отсекает лишние секции; запас в день — на разницу часовых поясов
+        return WeatherObservation.objects.filter(
+            location=location,
+            kind=WeatherObservation.KIND_CURRENT,
+            date__gte=timezone.localdate(since) - timedelta(days=1),
+            fetched_at__gte=since,
+        ).order_by("-fetched_at")
+
+    def _forecast_query(self, location: str, days: list[str]):
+        since = timezone.now() - timedelta(seconds=self.forecast_max_age)
+        return (
+            WeatherObservation.objects.filter(
+                location=location,
+                kind=WeatherObservation.KIND_FORECAST,
+                date__in=days,
+                fetched_at__gte=since,
+            )
+            .order_by("date", "-fetched_at")
+            .distinct("date")
+            .values_list("date", "data")
+        )
+
+    def _ensure_writer(self) -> None:
+        pid = os.getpid()
+        if self._writer_pid == pid:
+            return
+        with self._lock:
+            if self._writer_pid == pid:
+                return
+            self._writer_pid = pid
+            threading.Thread(target=self._write_forever, name="observation-store", daemon=True).start()
+            # Остаток очереди записывается при штатном завершении процесса
+            atexit.register(self.flush)
+
+    def _write_forever(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            # Поток не должен завершаться из-за ошибки записи: иначе очередь переполнится
+            # и ответы будут отбрасываться до перезапуска процесса
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("[ObservationStore] Ошибка фоновой записи ответов")
+            finally:
+                close_old_connections()
@@ -0,0 +1,161 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
+
+from api.cities import city_index
+from api.services import WeatherService, city_popularity
+from project import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateBudget:
+    """
+    Равномерное ограничение числа запросов к внешнему API в минуту в пределах процесса.
+    """
+
+    def __init__(self, per_minute: int):
+        """
+        Args:
+            per_minute (int): Максимум запросов в минуту (0 — без ограничения)
+        """
+        self.interval = 60 / per_minute if per_minute > 0 else 0.0
+        self._next_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Ждет, пока очередной запрос уложится в бюджет.
+        """
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._next_at - now)
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait:
+            time.sleep(wait)
+
+
+def hot_cities(configured=None, top: int | None = None) -> list[str]:
+    """
+    Возвращает города для предзагрузки: заданные в настройках и самые запрашиваемые.
+
+    Args:
+        configured (list[str] | None): Города из настроек (по умолчанию PREFETCH_CITIES)
+        top (int | None): Сколько самых запрашиваемых городов добавить (по умолчанию PREFETCH_TOP_CITIES)
+
+    Returns:
+        list[str]: Канонические ключи городов без повторов
+    """
+    configured = settings.PREFETCH_CITIES if configured is None else configured
+    top = settings.PREFETCH_TOP_CITIES if top is None else top
+    cities = [city_index.resolve(city).key for city in configured if city.strip()]
+    try:
+        cities += city_popularity.top(top)
+    except Exception as e:
+        logger.warning(f"[Prefetch] Не удалось получить популярные города: {e}")
+    return list(dict.fromkeys(cities))
+
+
+class Prefetcher:
+    """
+    Заблаговременное обновление кеша текущей погоды и прогноза для популярных городов.
+
+    Обновляются только записи, которых нет в кеше или у которых до истечения
+    мягкого срока жизни осталось меньше lead_time секунд. Запуски обновлений
+    разнесены случайной задержкой до jitter секунд, выполняются не более чем
+    в concurrency потоках и укладываются в бюджет запросов к API. Запись
+    выполняется под той же блокировкой single-flight, что и в запросах
+    пользователей, поэтому ключ не обновляется дважды.
+    """
+
+    def __init__(self, concurrency: int, rate_limit: int, lead_time: float, jitter: float):
+        """
+        Args:
+            concurrency (int): Максимум одновременных обновлений
+            rate_limit (int): Максимум запросов к API в минуту
+            lead_time (float): За сколько секунд до истечения мягкого срока обновлять запись
+            jitter (float): Максимальная случайная задержка запуска обновления в секундах
+        """
+        self.concurrency = concurrency
+        self.budget = RateBudget(rate_limit)
+        self.lead_time = lead_time
+        self.jitter = jitter
+
+    def run_cycle(self, cities: list[str]) -> dict:
+        """
+        Выполняет один проход по списку городов.
+
+        Returns:
+            dict: {
+                "cities": int,     # Проверено городов
+                "due": int,        # Записей, требующих обновления
+                "refreshed": int,  # Выполнено запросов к API
+                "skipped": int,    # Пропущено: запись уже обновляет другой запрос
+                "errors": int      # Ошибок API
+            }
+        """
+        tasks = []
+        for city in cities:
+            service = WeatherService.from_key(city)
+            for kind, due in service.prefetch_due(self.lead_time).items():
+                if due:
+                    tasks.append((random.uniform(0, self.jitter), service, kind))
+        tasks.sort(key=lambda task: task[0])
+
+        stats = {"cities": len(cities), "due": len(tasks), "refreshed": 0, "skipped": 0, "errors": 0}
+        stats_lock = threading.Lock()
+
+        def refresh(service: WeatherService, kind: str):
+            try:
+                self.budget.acquire()
+                if kind == "current":
+                    refreshed = service.prefetch_current_weather()
+                else:
+                    refreshed = service.prefetch_forecast()
+                result = "refreshed" if refreshed else "skipped"
+            except Exception as e:
+                logger.warning(f"[Prefetch] Не удалось обновить {kind} по {service.city}: {e}")
+                result = "errors"
+            finally:
+                close_old_connections()
+            with stats_lock:
+                stats[result] += 1
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency), thread_name_prefix="prefetch") as executor:
+            for delay, service, kind in tasks:
+                time.sleep(max(0.0, started + delay - time.monotonic()))
+                executor.submit(refresh, service, kind)
+        return stats
+
+    def run_forever(self, interval: float, decay: float, once: bool = False) -> None:
+        """
+        Повторяет проходы каждые interval секунд, после каждого прохода затухают счетчики популярности.
+
+        Args:
+            interval (float): Интервал между началами проходов в секундах
+            decay (float): Множитель счетчиков популярности после прохода
+            once (bool): Выполнить один проход и завершиться
+        """
+        while True:
+            started = time.monotonic()
+            cities = hot_cities()
+            stats = self.run_cycle(cities)
+            logger.info(
+                f"[Prefetch] Проход за {time.monotonic() - started:.1f} с: городов {stats['cities']}, "
+                f"к обновлению {stats['due']}, обновлено {stats['refreshed']}, "
+                f"пропущено {stats['skipped']}, ошибок {stats['errors']}"
+            )
+            try:
+                city_popularity.decay(decay)
+            except Exception as e:
+                logger.warning(f"[Prefetch] Не удалось обновить счетчики популярности: {e}")
+            if once:
+                return
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
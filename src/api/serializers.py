@@ -1,7 +1,15 @@
 from rest_framework import serializers
 
+from project import settings
+
 from .models import ForecastOverride
-from .validators import validate_forecast_date, validate_temperatures
+from .validators import (
+    validate_city_name,
+    validate_forecast_date,
+    validate_forecast_range,
+    validate_location,
+    validate_temperatures,
+)
 
 
 class ForecastOverrideSerializer(serializers.ModelSerializer):
@@ -26,6 +34,12 @@ class ForecastOverrideSerializer(serializers.ModelSerializer):
         model = ForecastOverride
         fields = "__all__"
 
+    def validate_city(self, value):
+        """
+        Валидирует название города: ключи ячеек geohash зарезервированы за координатами.
+        """
+        return validate_city_name(value)
+
     def validate_date(self, value):
         """
         Валидирует дату.
@@ -41,11 +55,51 @@ class ForecastOverrideSerializer(serializers.ModelSerializer):
         return data
 
 
-class ForecastGetSerializer(serializers.Serializer):
+class ForecastOverrideImportSerializer(ForecastOverrideSerializer):
+    """
+    Строка массовой загрузки переопределений: те же правила, что у ForecastOverrideSerializer,
+    но существующая пара (city, date) не считается ошибкой — она будет перезаписана.
+    """
+
+    class Meta(ForecastOverrideSerializer.Meta):
+        validators = []
+
+
+class LocationQuerySerializer(serializers.Serializer):
+    """
+    Место запроса: название города или координаты.
+
+    Координаты привязываются к ячейке geohash (GEOHASH_PRECISION), поэтому
+    соседние точки делят одну запись кеша и один запрос к API.
+    """
+
     city = serializers.CharField(
-        required=True,
-        help_text="Название города на английском языке (например: Moscow, Amsterdam)",
+        required=False,
+        validators=[validate_city_name],
+        help_text="Название города на английском языке (например: Moscow, Amsterdam). Вместо lat и lon.",
     )
+    lat = serializers.FloatField(
+        required=False,
+        min_value=-90,
+        max_value=90,
+        help_text="Широта в градусах (вместе с lon, вместо city)",
+    )
+    lon = serializers.FloatField(
+        required=False,
+        min_value=-180,
+        max_value=180,
+        help_text="Долгота в градусах (вместе с lat, вместо city)",
+    )
+
+    def validate(self, data):
+        """
+        Проверяет, что указан город или обе координаты.
+        """
+        validate_location(data.get("city"), data.get("lat"), data.get("lon"))
+        return data
+
+
+class ForecastGetSerializer(LocationQuerySerializer):
     date = serializers.DateField(
         required=True,
         input_formats=["%d.%m.%Y", "%Y-%m-%d"],
@@ -63,8 +117,81 @@ class ForecastGetSerializer(serializers.Serializer):
         return validate_forecast_date(value)
 
 
-class CurrentWeatherGetSerializer(serializers.Serializer):
-    city = serializers.CharField(
+class ForecastRangeGetSerializer(LocationQuerySerializer):
+    def get_fields(self):
+        """
+        Добавляет поля from и to: их имена совпадают с ключевым словом Python.
+        """
+        fields = super().get_fields()
+        for name, label in (("from", "Первая"), ("to", "Последняя")):
+            fields[name] = serializers.DateField(
+                required=True,
+                input_formats=["%d.%m.%Y", "%Y-%m-%d"],
+                help_text=(
+                    f"{label} дата диапазона в формате ДД.ММ.ГГГГ или ISO YYYY-MM-DD. "
+                    "Не может быть в прошлом и не может быть больше, чем через 10 дней от текущей даты."
+                ),
+            )
+        return fields
+
+    def validate_from(self, value):
+        """
+        Валидирует первую дату диапазона по тем же правилам, что и дату прогноза.
+        """
+        return validate_forecast_date(value)
+
+    def validate_to(self, value):
+        """
+        Валидирует последнюю дату диапазона по тем же правилам, что и дату прогноза.
+        """
+        return validate_forecast_date(value)
+
+    def validate(self, data):
+        """
+        Проверяет место запроса и то, что первая дата диапазона не позже последней.
+        """
+        data = super().validate(data)
+        validate_forecast_range(data["from"], data["to"])
+        return data
+
+
+class CurrentWeatherGetSerializer(LocationQuerySerializer):
+    pass
+
+
+class CurrentWeatherBatchSerializer(serializers.Serializer):
+    cities = serializers.ListField(
+        child=serializers.CharField(validators=[validate_city_name]),
+        allow_empty=False,
+        max_length=settings.WEATHER_BATCH_MAX_CITIES,
+        help_text=(
+            'Список названий городов на английском языке (например: ["Moscow", "Amsterdam"]), '
+            f"не более {settings.WEATHER_BATCH_MAX_CITIES}."
+        ),
+    )
+
+
+class CurrentWeatherStreamSerializer(serializers.Serializer):
+    city = serializers.ListField(
+        child=serializers.CharField(validators=[validate_city_name]),
+        allow_empty=False,
+        max_length=settings.LIVE_MAX_CITIES,
+        help_text=(
+            "Названия городов на английском языке, параметр повторяется "
+            f"(например: ?city=Moscow&city=Amsterdam), не более {settings.LIVE_MAX_CITIES}."
+        ),
+    )
+
+
+class CitySearchSerializer(serializers.Serializer):
+    q = serializers.CharField(
         required=True,
-        help_text="Название города на английском языке (например: Moscow, Amsterdam)",
+        help_text="Начало названия города (например: New, san fr)",
+    )
+    limit = serializers.IntegerField(
+        required=False,
+        default=10,
+        min_value=1,
+        max_value=settings.CITY_SEARCH_MAX_RESULTS,
+        help_text=f"Максимум городов в ответе, не более {settings.CITY_SEARCH_MAX_RESULTS}.",
     )
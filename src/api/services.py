@@ -1,15 +1,116 @@
+import asyncio
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as date_type
+from datetime import timedelta
+from functools import partial
 
+from asgiref.sync import sync_to_async
 from django.core.cache import cache
+from django.db import close_old_connections, transaction
 
+from api.caching.entries import entry_value, is_stale, make_entry, make_missing_entry, read_entry
+from api.caching.overrides import OverrideIndex
+from api.caching.popularity import CityPopularity
+from api.caching.single_flight import SingleFlight
+from api.caching.tiered import TieredCache
+from api.cities import city_index
+from api.geo import cell_from_key, snap_to_cell
+from api.live import RESYNC, LiveUpdates, parse_event_id
 from api.models import ForecastOverride
-from api.weather_provider.weatherbit import fetch_current_weather, fetch_forecast
+from api.observations import ObservationStore
+from api.weather_provider.exceptions import NotFoundError
+from api.weather_provider.registry import weather_providers
 from project import settings
+from utils.metrics import record_lookup
 
 logger = logging.getLogger(__name__)
 
 CURRENT_WEATHER_CACHE_TIMEOUT = settings.CURRENT_WEATHER_CACHE_TIMEOUT
 FORECAST_WEATHER_CACHE_TIMEOUT = settings.FORECAST_WEATHER_CACHE_TIMEOUT
+CURRENT_WEATHER_CACHE_HARD_TIMEOUT = max(settings.CURRENT_WEATHER_CACHE_HARD_TIMEOUT, CURRENT_WEATHER_CACHE_TIMEOUT)
+FORECAST_WEATHER_CACHE_HARD_TIMEOUT = max(settings.FORECAST_WEATHER_CACHE_HARD_TIMEOUT, FORECAST_WEATHER_CACHE_TIMEOUT)
+NEGATIVE_CACHE_TIMEOUT = settings.NEGATIVE_CACHE_TIMEOUT
+WEATHER_BATCH_CONCURRENCY = settings.WEATHER_BATCH_CONCURRENCY
+# Сколько дней отдает /forecast/daily: на столько дат кешируется "город не найден"
+FORECAST_WINDOW_DAYS = 16
+
+weather_cache = TieredCache(
+    cache,
+    alias="default",
+    max_size=settings.LOCAL_CACHE_MAX_SIZE,
+    timeout=settings.LOCAL_CACHE_TIMEOUT,
+    channel=settings.LOCAL_CACHE_INVALIDATION_CHANNEL,
+)
+
+single_flight = SingleFlight(
+    weather_cache,
+    lock_timeout=settings.SINGLE_FLIGHT_LOCK_TIMEOUT,
+    wait_timeout=settings.SINGLE_FLIGHT_WAIT_TIMEOUT,
+    poll_interval=settings.SINGLE_FLIGHT_POLL_INTERVAL,
+    refresh_workers=settings.BACKGROUND_REFRESH_WORKERS,
+)
+
+city_popularity = CityPopularity(
+    alias="default",
+    key=settings.CITY_POPULARITY_KEY,
+    flush_interval=settings.CITY_POPULARITY_FLUSH_INTERVAL,
+)
+
+override_index = OverrideIndex(alias="default", key=settings.OVERRIDE_INDEX_KEY)
+
+observation_store = ObservationStore(
+    enabled=settings.OBSERVATION_STORE,
+    batch_size=settings.OBSERVATION_BATCH_SIZE,
+    flush_interval=settings.OBSERVATION_FLUSH_INTERVAL,
+    queue_size=settings.OBSERVATION_QUEUE_SIZE,
+    current_max_age=settings.OBSERVATION_CURRENT_MAX_AGE,
+    forecast_max_age=settings.OBSERVATION_FORECAST_MAX_AGE,
+)
+
+live_updates = LiveUpdates(
+    enabled=settings.LIVE_UPDATES,
+    alias="default",
+    channel_prefix=settings.LIVE_CHANNEL_PREFIX,
+    stream_key=settings.LIVE_STREAM_KEY,
+    stream_maxlen=settings.LIVE_STREAM_MAXLEN,
+    queue_size=settings.LIVE_QUEUE_SIZE,
+)
+
+
+def _in_background(loader):
+    """
+    Оборачивает загрузчик для фонового потока: закрывает соединения с БД после выполнения.
+    """
+
+    def run():
+        try:
+            return loader()
+        finally:
+            close_old_connections()
+
+    return run
+
+
+def index_overrides(pairs: list) -> None:
+    """
+    Добавляет пары (город, дата в формате YYYY-MM-DD) в индекс переопределений.
+
+    Вызывается внутри transaction.atomic() до записи переопределений в БД: индекс
+    остается надмножеством таблицы. После фиксации транзакции пары добавляются
+    повторно — на случай, если rebuild_override_index заменил индекс, прочитав БД
+    до фиксации.
+    """
+    override_index.add(pairs)
+    transaction.on_commit(partial(override_index.add, pairs), robust=True)
+
+
+def _override_data(override: ForecastOverride) -> dict:
+    return {
+        "min_temperature": override.min_temperature,
+        "max_temperature": override.max_temperature,
+    }
 
 
 class WeatherService:
@@ -20,22 +121,68 @@ class WeatherService:
     - Получения текущей погоды
     - Получения прогноза на конкретную дату
     - Переопределения прогноза
+
+    Для асинхронных представлений есть версии методов чтения с префиксом "a".
+    Текущую погоду сразу по нескольким городам возвращает get_current_weather_batch(),
+    прогноз на диапазон дат — get_forecast_range().
+
+    Ответы API сохраняются в хранилище наблюдений (observation_store). Если записи
+    нет в кеше, а API недоступен, отдается последний сохраненный ответ.
+
+    Обновления текущей погоды в городах рассылаются подписчикам потока
+    astream_current_weather() через live_updates.
     """
 
-    def __init__(self, city: str):
+    def __init__(self, city: str | None = None, lat: float | None = None, lon: float | None = None):
         """
         Инициализация сервиса.
 
         Args:
-            city (str): Название города на английском языке
+            city (str | None): Название города на английском языке в произвольной записи
+            lat (float | None): Широта (вместе с lon, если город не указан)
+            lon (float | None): Долгота (вместе с lat, если город не указан)
+
+        Название нормализуется и разрешается по справочнику городов, координаты
+        привязываются к ячейке geohash длины GEOHASH_PRECISION. self.city —
+        канонический ключ места (ключи кеша, переопределения, популярность),
+        self.location — параметры места для запросов к Weatherbit.
+
+        Ключ ячейки ("geo:<geohash>") в city не принимается: ячейку дают только координаты
+        (для ключей из внутренних списков есть from_key).
         """
-        self.city = city.lower()
+        if city is None:
+            self.location = snap_to_cell(lat, lon, settings.GEOHASH_PRECISION)
+        else:
+            self.location = city_index.resolve(city)
+        self.city = self.location.key
+
+    @classmethod
+    def from_query(cls, data: dict):
+        """
+        Создает сервис по провалидированным query-параметрам: city или пара lat/lon.
+        """
+        return cls(city=data.get("city"), lat=data.get("lat"), lon=data.get("lon"))
+
+    @classmethod
+    def from_key(cls, key: str):
+        """
+        Создает сервис по каноническому ключу места из внутренних списков (популярные места,
+        переопределения). Ключ ячейки geohash восстанавливается в координаты ее центра,
+        остальные ключи разрешаются как города. Для данных пользователя не используется.
+        """
+        cell = cell_from_key(key)
+        if cell is None:
+            return cls(city=key)
+        return cls(lat=cell.lat, lon=cell.lon)
 
     def get_current_weather(self):
         """
         Получает текущую погоду в городе.
 
         Сначала проверяет кеш, если данных нет - запрашивает из API.
+        Устаревшая (после мягкого срока жизни) запись отдается сразу, а ее
+        обновление запускается в фоне. Одновременные промахи кеша объединяются:
+        к API обращается только один запрос.
 
         Returns:
             dict: {
@@ -44,18 +191,272 @@ class WeatherService:
             }
 
         Raises:
-            ValueError: Если город не найден или произошла ошибка при обращении к API
+            NotFoundError: Если город не найден (результат кешируется на NEGATIVE_CACHE_TIMEOUT)
+            ValueError: Если произошла ошибка при обращении к API
         """
-        cache_key = f"current_weather:{self.city}"
-        cached = cache.get(cache_key)
-        if cached:
+        return entry_value(self.get_current_weather_entry())
+
+    def get_current_weather_entry(self) -> dict:
+        """
+        Получает запись кеша текущей погоды целиком (значение, мягкий срок жизни, ETag).
+
+        Используется представлениями для заголовков ETag и Cache-Control; негативная
+        запись возвращается как есть, значение из нее достает entry_value().
+        """
+        city_popularity.record(self.city)
+        cache_key = self._current_weather_cache_key()
+        entry = read_entry(weather_cache.get(cache_key))
+        if entry:
+            if is_stale(entry):
+                single_flight.refresh(cache_key, _in_background(self._load_current_weather))
             logger.info(f"[WeatherService] Ответ по {self.city}: из кеша")
-            return cached
+            record_lookup("current", "cache", target=self.location.target)
+            return entry
+
+        record_lookup("current", "api", target=self.location.target)
+        return self._fetch_current_weather()
+
+    @classmethod
+    def get_current_weather_batch(cls, cities: list[str]):
+        """
+        Получает текущую погоду по списку городов.
+
+        Кеш читается одним запросом get_many, промахи запрашиваются из API
+        параллельно (не более WEATHER_BATCH_CONCURRENCY запросов одновременно).
+        Ошибка по одному городу не влияет на остальные.
+
+        Args:
+            cities (list[str]): Названия городов на английском языке
+
+        Returns:
+            tuple[dict, dict]: (
+                {город: {"temperature": float, "local_time": str}},  # Успешные ответы
+                {город: str}                                         # Ошибки по городам
+            )
+        """
+        services = {city: cls(city) for city in cities}
+        for service in services.values():
+            city_popularity.record(service.city)
+        cached = weather_cache.get_many([service._current_weather_cache_key() for service in services.values()])
+        results, errors, misses = cls._split_current_weather_batch(services, cached, asynchronous=False)
+        if misses:
+            with ThreadPoolExecutor(max_workers=min(WEATHER_BATCH_CONCURRENCY, len(misses))) as executor:
+                futures = {
+                    city: executor.submit(_in_background(service._fetch_current_weather))
+                    for city, service in misses.items()
+                }
+                for city, future in futures.items():
+                    try:
+                        results[city] = entry_value(future.result())
+                    except ValueError as e:
+                        errors[city] = str(e)
+
+        logger.info(f"[WeatherService] Пакетный запрос: {len(services)} городов, промахов кеша: {len(misses)}")
+        record_lookup("current", "cache", len(services) - len(misses))
+        record_lookup("current", "api", len(misses))
+        return results, errors
+
+    @classmethod
+    async def aget_current_weather_batch(cls, cities: list[str]):
+        """
+        Асинхронная версия get_current_weather_batch.
+        """
+        services = {city: cls(city) for city in cities}
+        for service in services.values():
+            city_popularity.record(service.city)
+        cached = await weather_cache.aget_many([service._current_weather_cache_key() for service in services.values()])
+        results, errors, misses = cls._split_current_weather_batch(services, cached, asynchronous=True)
+        semaphore = asyncio.Semaphore(WEATHER_BATCH_CONCURRENCY)
+
+        async def fetch(city, service):
+            async with semaphore:
+                try:
+                    results[city] = entry_value(await service._afetch_current_weather())
+                except ValueError as e:
+                    errors[city] = str(e)
+
+        await asyncio.gather(*(fetch(city, service) for city, service in misses.items()))
+        logger.info(f"[WeatherService] Пакетный запрос: {len(services)} городов, промахов кеша: {len(misses)}")
+        record_lookup("current", "cache", len(services) - len(misses))
+        record_lookup("current", "api", len(misses))
+        return results, errors
+
+    @classmethod
+    async def astream_current_weather(cls, cities: list[str], last_event_id: str | None = None):
+        """
+        Поток обновлений текущей погоды по списку городов (для SSE).
+
+        Без last_event_id сначала отдается текущая погода во всех городах (как в пакетном
+        запросе), с last_event_id — последние обновления, опубликованные после этого события.
+        Дальше события отдаются по мере публикации. Раз в LIVE_REFRESH_INTERVAL секунд
+        проверяется свежесть кеша городов потока: устаревшая запись обновляется в фоне
+        через single-flight, и новое значение получают все подписчики города.
+
+        Args:
+            cities (list[str]): Названия городов на английском языке
+            last_event_id (str | None): ID последнего полученного клиентом события
+
+        Yields:
+            dict | None: {"id": str | None, "city": str, "data": dict} — текущая погода
+            (id None у ответов без события в потоке), {"city": str, "error": str} — ошибка
+            по городу, None — пора отправить heartbeat
+        """
+        names = {}
+        for city in cities:
+            names.setdefault(cls(city).city, city)
+        subscription = live_updates.subscribe(names)
+        try:
+            cursor = last_event_id if parse_event_id(last_event_id) else None
+            if cursor is None:
+                cursor = await sync_to_async(live_updates.last_event_id, thread_sensitive=False)()
+                pending = [*await cls._acurrent_weather_snapshot(list(names.values()))]
+            else:
+                pending = [RESYNC]
+
+            now = time.monotonic()
+            heartbeat_at = now + settings.LIVE_HEARTBEAT_INTERVAL
+            while True:
+                for item in pending:
+                    if item is not RESYNC:
+                        yield item
+                        continue
+                    events, gap = await sync_to_async(live_updates.replay, thread_sensitive=False)(names, cursor)
+                    if gap:
+                        # Часть событий удалена из потока Redis — отдаем текущее состояние целиком
+                        for event in await cls._acurrent_weather_snapshot(list(names.values())):
+                            yield event
+                    for event in events:
+                        if parse_event_id(event["id"]) > parse_event_id(cursor):
+                            cursor = event["id"]
+                            yield {"id": event["id"], "city": names[event["city"]], "data": event["data"]}
+                pending = []
+
+                try:
+                    item = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=max(0.0, heartbeat_at - time.monotonic())
+                    )
+                except asyncio.TimeoutError:
+                    heartbeat_at = time.monotonic() + settings.LIVE_HEARTBEAT_INTERVAL
+                    claimed = live_updates.claim_refresh(names, settings.LIVE_REFRESH_INTERVAL)
+                    if claimed:
+                        await cls.aget_current_weather_batch([names[city] for city in claimed])
+                    yield None
+                    continue
+                if item is RESYNC:
+                    pending = [RESYNC]
+                elif parse_event_id(item["id"]) > parse_event_id(cursor):
+                    cursor = item["id"]
+                    yield {"id": item["id"], "city": names[item["city"]], "data": item["data"]}
+        finally:
+            live_updates.unsubscribe(subscription)
+
+    @classmethod
+    async def _acurrent_weather_snapshot(cls, cities: list[str]) -> list[dict]:
+        results, errors = await cls.aget_current_weather_batch(cities)
+        events = [{"id": None, "city": city, "data": data} for city, data in results.items()]
+        return events + [{"city": city, "error": error} for city, error in errors.items()]
 
-        data = fetch_current_weather(self.city)
-        cache.set(cache_key, data, timeout=CURRENT_WEATHER_CACHE_TIMEOUT)
+    @staticmethod
+    def _split_current_weather_batch(services: dict, cached: dict, asynchronous: bool):
+        """
+        Разделяет города пакетного запроса на найденные в кеше, закешированные ошибки и промахи.
+
+        Для устаревших записей планируется фоновое обновление.
+
+        Returns:
+            tuple[dict, dict, dict]: (
+                {город: данные из кеша},
+                {город: ошибка из негативной записи кеша},
+                {город: WeatherService для промахов}
+            )
+        """
+        results, errors, misses = {}, {}, {}
+        for city, service in services.items():
+            cache_key = service._current_weather_cache_key()
+            entry = read_entry(cached.get(cache_key))
+            if entry is None:
+                misses[city] = service
+                continue
+            if is_stale(entry):
+                if asynchronous:
+                    single_flight.arefresh(cache_key, service._aload_current_weather)
+                else:
+                    single_flight.refresh(cache_key, _in_background(service._load_current_weather))
+            if "missing" in entry:
+                errors[city] = entry["missing"]
+            else:
+                results[city] = entry["value"]
+        return results, errors, misses
+
+    def _fetch_current_weather(self) -> dict:
+        """
+        Загружает текущую погоду через single-flight, а если API недоступен —
+        берет последний сохраненный ответ из хранилища наблюдений.
+
+        Raises:
+            NotFoundError: Если город не найден
+            ValueError: Если API недоступен и сохраненного ответа не старше OBSERVATION_CURRENT_MAX_AGE нет
+        """
+        try:
+            return single_flight.fetch(self._current_weather_cache_key(), self._load_current_weather)
+        except NotFoundError:
+            raise
+        except ValueError as e:
+            return self._stored_entry("current", observation_store.current(self.city), e)
+
+    async def _afetch_current_weather(self) -> dict:
+        """
+        Асинхронная версия _fetch_current_weather.
+        """
+        try:
+            return await single_flight.afetch(self._current_weather_cache_key(), self._aload_current_weather)
+        except NotFoundError:
+            raise
+        except ValueError as e:
+            return self._stored_entry("current", await observation_store.acurrent(self.city), e)
+
+    def _stored_entry(self, kind: str, data: dict | None, error: ValueError) -> dict:
+        """
+        Формирует ответ из хранилища наблюдений вместо недоступного API.
+
+        Запись не кешируется и отдается с нулевым сроком свежести (Cache-Control: max-age=0),
+        чтобы следующий запрос снова обратился к API.
+
+        Raises:
+            ValueError: Исходная ошибка API, если сохраненного ответа нет
+        """
+        if data is None:
+            raise error
+        logger.warning(f"[WeatherService] Ответ по {self.city}: из хранилища наблюдений (API: {error})")
+        record_lookup(kind, "store", target=self.location.target)
+        return make_entry(data, 0)
+
+    def _load_current_weather(self):
+        """
+        Запрашивает текущую погоду из API и сохраняет ее в кеш.
+
+        Если город не найден, на NEGATIVE_CACHE_TIMEOUT сохраняется негативная запись.
+
+        Returns:
+            dict: Запись кеша (см. api.caching.entries.make_entry)
+
+        Raises:
+            NotFoundError: Если город не найден
+            ValueError: Если произошла ошибка при обращении к API
+        """
+        try:
+            data = weather_providers.fetch_current_weather(self.location.query)
+        except NotFoundError as e:
+            self._cache_missing({self._current_weather_cache_key(): str(e)})
+            raise
+        observation_store.record_current(self.city, data)
+        entry = make_entry(data, CURRENT_WEATHER_CACHE_TIMEOUT)
+        weather_cache.set(self._current_weather_cache_key(), entry, timeout=CURRENT_WEATHER_CACHE_HARD_TIMEOUT)
+        # Подписаться можно только на города; событие публикуется после записи в кеш
+        if self.location.target == "city":
+            live_updates.publish(self.city, data)
         logger.info(f"[WeatherService] Ответ по {self.city}: с API")
-        return data
+        return entry
 
     def get_forecast_for_date(self, date):
         """
@@ -64,7 +465,7 @@ class WeatherService:
         Проверяет данные в следующем порядке:
         1. Кеш
         2. Переопределенный прогноз из БД
-        3. Внешний API
+        3. Внешний API (одновременные промахи по городу объединяются в один запрос)
 
         Args:
             date (date): Дата прогноза
@@ -76,34 +477,502 @@ class WeatherService:
             }
 
         Raises:
-            ValueError: Если прогноз не найден или произошла ошибка при обращении к API
+            NotFoundError: Если город или прогноз на дату не найден (результат кешируется на NEGATIVE_CACHE_TIMEOUT)
+            ValueError: Если произошла ошибка при обращении к API
         """
-        cache_key = f"forecast:{self.city}:{date.isoformat()}"
-        cached = cache.get(cache_key)
-        if cached:
+        return entry_value(self.get_forecast_entry(date))
+
+    def get_forecast_entry(self, date) -> dict:
+        """
+        Получает запись кеша прогноза на дату целиком (см. get_current_weather_entry).
+        """
+        city_popularity.record(self.city)
+        day = date.isoformat()
+        cache_key = self._forecast_cache_key(day)
+        entry = read_entry(weather_cache.get(cache_key))
+        if entry:
+            if is_stale(entry):
+                single_flight.refresh(
+                    cache_key,
+                    _in_background(self._load_forecast_window),
+                    lock_key=self._forecast_lock_key(),
+                )
             logger.info(f"[WeatherService] Ответ по {self.city}: из кеша")
-            return cached
+            record_lookup("forecast", "cache", target=self.location.target)
+            return entry
 
-        override = ForecastOverride.objects.filter(city=self.city, date=date).first()
+        override = None
+        if self._override_candidates([day]):
+            override = ForecastOverride.objects.filter(city=self.city, date=date).first()
         if override:
-            data = {
-                "min_temperature": override.min_temperature,
-                "max_temperature": override.max_temperature,
-            }
-            cache.set(cache_key, data, timeout=FORECAST_WEATHER_CACHE_TIMEOUT)
+            data = _override_data(override)
+            entry = make_entry(data, FORECAST_WEATHER_CACHE_TIMEOUT)
+            weather_cache.set(cache_key, entry, timeout=FORECAST_WEATHER_CACHE_HARD_TIMEOUT)
             logger.info(f"[WeatherService] Ответ по {self.city}: из БД")
-            return data
+            record_lookup("forecast", "db", target=self.location.target)
+            return entry
+
+        record_lookup("forecast", "api", target=self.location.target)
+
+        def load():
+            entry = self._load_forecast_window().get(day)
+            if entry is None:
+                entry = self._cache_missing({cache_key: "Прогноз на указанную дату не найден."})[cache_key]
+            return entry
+
+        try:
+            return single_flight.fetch(cache_key, load, lock_key=self._forecast_lock_key())
+        except NotFoundError:
+            raise
+        except ValueError as e:
+            return self._stored_entry("forecast", observation_store.forecast(self.city, [day]).get(day), e)
+
+    def get_forecast_range(self, date_from, date_to):
+        """
+        Получает прогноз погоды на каждый день диапазона.
+
+        Кеш читается одним запросом get_many. Для промахов выполняется один
+        запрос переопределенных прогнозов из БД и не более одного запроса к API,
+        который заполняет кеш на все доступные дни.
+
+        Args:
+            date_from (date): Первая дата диапазона
+            date_to (date): Последняя дата диапазона (включительно)
+
+        Returns:
+            list[dict]: [
+                {
+                    "date": str,               # Дата в формате YYYY-MM-DD
+                    "min_temperature": float,  # Минимальная температура
+                    "max_temperature": float   # Максимальная температура
+                },
+                ...
+            ]
+
+        Raises:
+            NotFoundError: Если город или прогноз на одну из дат не найден
+            ValueError: Если произошла ошибка при обращении к API
+        """
+        city_popularity.record(self.city)
+        days = [(date_from + timedelta(days=offset)).isoformat() for offset in range((date_to - date_from).days + 1)]
+        cached = weather_cache.get_many([self._forecast_cache_key(day) for day in days])
+
+        forecast, missing, stale = {}, [], False
+        for day in days:
+            entry = read_entry(cached.get(self._forecast_cache_key(day)))
+            if entry:
+                forecast[day] = entry_value(entry)
+                stale = stale or is_stale(entry)
+            else:
+                missing.append(day)
+
+        if stale:
+            single_flight.refresh(
+                self._forecast_cache_key(days[0]),
+                _in_background(self._load_forecast_window),
+                lock_key=self._forecast_lock_key(),
+            )
+
+        record_lookup("forecast", "cache", len(days) - len(missing), target=self.location.target)
+        if missing:
+            forecast.update(self._load_forecast_range(missing))
+            logger.info(f"[WeatherService] Прогноз по {self.city} на {len(days)} дн.: промахов кеша {len(missing)}")
+        else:
+            logger.info(f"[WeatherService] Прогноз по {self.city} на {len(days)} дн.: из кеша")
+
+        if len(forecast) < len(days):
+            raise NotFoundError("Прогноз на указанную дату не найден.")
+        return [{"date": day, **forecast[day]} for day in days]
+
+    def _load_forecast_range(self, missing: list[str]) -> dict:
+        """
+        Загружает прогноз на даты, которых нет в кеше.
+
+        Переопределения города на эти даты и окно прогноза читаются одним запросом
+        по индексу (city, date), если индекс переопределений допускает их наличие.
+        Если переопределения покрывают все даты, к API обращения нет.
+
+        Args:
+            missing (list[str]): Даты в формате YYYY-MM-DD
+
+        Returns:
+            dict: {дата в формате YYYY-MM-DD: прогноз} для найденных дат
+        """
+        window = [day.isoformat() for day in self._forecast_window_days()]
+        candidates = self._override_candidates(sorted({*missing, *window}))
+        overrides = list(ForecastOverride.objects.filter(city=self.city, date__in=candidates)) if candidates else []
+        override_data = {override.date.isoformat(): _override_data(override) for override in overrides}
+        if all(day in override_data for day in missing):
+            weather_cache.set_many(
+                {
+                    self._forecast_cache_key(day): make_entry(override_data[day], FORECAST_WEATHER_CACHE_TIMEOUT)
+                    for day in missing
+                },
+                timeout=FORECAST_WEATHER_CACHE_HARD_TIMEOUT,
+            )
+            record_lookup("forecast", "db", len(missing), target=self.location.target)
+            return {day: override_data[day] for day in missing}
+
+        record_lookup("forecast", "api", len(missing), target=self.location.target)
+
+        entries = {}
+
+        def load():
+            entries.update(self._load_forecast_window(overrides))
+            return entries.get(missing[0])
 
-        forecast_data = fetch_forecast(self.city, date.strftime("%Y-%m-%d"))
-        cache.set(cache_key, forecast_data, timeout=FORECAST_WEATHER_CACHE_TIMEOUT)
+        try:
+            single_flight.fetch(self._forecast_cache_key(missing[0]), load, lock_key=self._forecast_lock_key())
+        except NotFoundError:
+            raise
+        except ValueError as e:
+            return self._stored_forecast_range(missing, override_data, e)
+        if not entries:
+            # Окно прогноза загрузил лидер в другом запросе — читаем его результат из кеша
+            cached = weather_cache.get_many([self._forecast_cache_key(day) for day in missing])
+            entries = {day: read_entry(cached.get(self._forecast_cache_key(day))) for day in missing}
+
+        forecast = {day: entry_value(entries[day]) for day in missing if entries.get(day)}
+        forecast.update({day: override_data[day] for day in missing if day not in forecast and day in override_data})
+        return forecast
+
+    def _stored_forecast_range(self, missing: list[str], override_data: dict, error: ValueError) -> dict:
+        """
+        Прогноз на даты диапазона из хранилища наблюдений, если API недоступен.
+
+        Переопределенные прогнозы имеют приоритет над сохраненными ответами.
+
+        Raises:
+            ValueError: Исходная ошибка API, если сохраненных ответов нет хотя бы на одну дату
+        """
+        stored = observation_store.forecast(self.city, [day for day in missing if day not in override_data])
+        stored.update({day: override_data[day] for day in missing if day in override_data})
+        if len(stored) < len(missing):
+            raise error
+        logger.warning(f"[WeatherService] Прогноз по {self.city} на {len(missing)} дн.: из хранилища наблюдений")
+        record_lookup("forecast", "store", len(missing), target=self.location.target)
+        return stored
+
+    def _load_forecast_window(self, overrides=None):
+        """
+        Запрашивает из API прогноз на все доступные дни и сохраняет его в кеш.
+
+        Один запрос к API заполняет кеш для каждой даты из ответа, поэтому
+        последующие запросы прогноза по этому городу обслуживаются из кеша.
+        Переопределенные прогнозы из БД имеют приоритет над данными API.
+
+        Args:
+            overrides: Уже загруженные переопределения города, покрывающие окно прогноза
+                (если не переданы, читаются из БД по датам окна)
+
+        Returns:
+            dict: {дата в формате YYYY-MM-DD: запись кеша с прогнозом на эту дату}
+
+        Если город не найден, на NEGATIVE_CACHE_TIMEOUT сохраняются негативные записи
+        для всех дат окна, кроме дат с переопределениями.
+
+        Raises:
+            NotFoundError: Если город не найден
+            ValueError: Если произошла ошибка при обращении к API
+        """
+        try:
+            forecast_window = weather_providers.fetch_forecast_window(self.location.query)
+        except NotFoundError as e:
+            days = self._forecast_window_days()
+            candidates = self._override_candidates([day.isoformat() for day in days])
+            overridden = set()
+            if candidates:
+                overridden = set(
+                    ForecastOverride.objects.filter(city=self.city, date__in=candidates).values_list("date", flat=True)
+                )
+            self._cache_missing(
+                {self._forecast_cache_key(day.isoformat()): str(e) for day in days if day not in overridden}
+            )
+            raise
+        observation_store.record_forecast(self.city, forecast_window)
+        if overrides is None:
+            candidates = self._override_candidates(list(forecast_window))
+            overrides = ForecastOverride.objects.filter(city=self.city, date__in=candidates) if candidates else []
+        entries = self._forecast_window_entries(forecast_window, overrides)
+        weather_cache.set_many(
+            {self._forecast_cache_key(day): entry for day, entry in entries.items()},
+            timeout=FORECAST_WEATHER_CACHE_HARD_TIMEOUT,
+        )
+        logger.info(f"[WeatherService] Прогноз по {self.city} на {len(entries)} дн.: с API")
+        return entries
+
+    def prefetch_due(self, lead_time: float) -> dict:
+        """
+        Проверяет, какие данные города пора обновить заранее.
+
+        Данные считаются требующими обновления, если записи нет в кеше или до
+        истечения ее мягкого срока жизни осталось меньше lead_time секунд.
+        Окно прогноза записывается целиком, поэтому проверяется запись на сегодня.
+
+        Args:
+            lead_time (float): За сколько секунд до истечения мягкого срока обновлять запись
+
+        Returns:
+            dict: {"current": bool, "forecast": bool}
+        """
+        current_key = self._current_weather_cache_key()
+        forecast_key = self._forecast_cache_key(date_type.today().isoformat())
+        cached = weather_cache.get_many([current_key, forecast_key])
+        refresh_after = time.time() + lead_time
+        due = {}
+        for kind, cache_key in (("current", current_key), ("forecast", forecast_key)):
+            entry = read_entry(cached.get(cache_key))
+            # Негативные записи не обновляются заранее: город повторно проверяется только после их истечения
+            due[kind] = entry is None or ("missing" not in entry and entry["fresh_until"] <= refresh_after)
+        return due
+
+    def prefetch_current_weather(self) -> bool:
+        """
+        Заранее обновляет кеш текущей погоды, если его не обновляет другой запрос.
+
+        Returns:
+            bool: True, если выполнен запрос к API
+
+        Raises:
+            ValueError: Если город не найден или произошла ошибка при обращении к API
+        """
+        return single_flight.refresh_now(self._current_weather_cache_key(), self._load_current_weather)
+
+    def prefetch_forecast(self) -> bool:
+        """
+        Заранее обновляет кеш прогноза на все доступные дни, если его не обновляет другой запрос.
+
+        Returns:
+            bool: True, если выполнен запрос к API
+
+        Raises:
+            ValueError: Если город не найден или произошла ошибка при обращении к API
+        """
+        return single_flight.refresh_now(
+            self._forecast_cache_key(date_type.today().isoformat()),
+            self._load_forecast_window,
+            lock_key=self._forecast_lock_key(),
+        )
+
+    async def aget_current_weather(self):
+        """
+        Асинхронная версия get_current_weather: асинхронный кеш и HTTP-клиент httpx.
+        """
+        return entry_value(await self.aget_current_weather_entry())
+
+    async def aget_current_weather_entry(self) -> dict:
+        """
+        Асинхронная версия get_current_weather_entry.
+        """
+        city_popularity.record(self.city)
+        cache_key = self._current_weather_cache_key()
+        entry = read_entry(await weather_cache.aget(cache_key))
+        if entry:
+            if is_stale(entry):
+                single_flight.arefresh(cache_key, self._aload_current_weather)
+            logger.info(f"[WeatherService] Ответ по {self.city}: из кеша")
+            record_lookup("current", "cache", target=self.location.target)
+            return entry
+
+        record_lookup("current", "api", target=self.location.target)
+        return await self._afetch_current_weather()
+
+    async def _aload_current_weather(self):
+        """
+        Асинхронная версия _load_current_weather.
+        """
+        try:
+            data = await weather_providers.afetch_current_weather(self.location.query)
+        except NotFoundError as e:
+            await self._acache_missing({self._current_weather_cache_key(): str(e)})
+            raise
+        observation_store.record_current(self.city, data)
+        entry = make_entry(data, CURRENT_WEATHER_CACHE_TIMEOUT)
+        await weather_cache.aset(self._current_weather_cache_key(), entry, timeout=CURRENT_WEATHER_CACHE_HARD_TIMEOUT)
+        if self.location.target == "city":
+            await live_updates.apublish(self.city, data)
         logger.info(f"[WeatherService] Ответ по {self.city}: с API")
-        return forecast_data
+        return entry
+
+    async def aget_forecast_for_date(self, date):
+        """
+        Асинхронная версия get_forecast_for_date: асинхронные кеш, ORM и HTTP-клиент httpx.
+        """
+        return entry_value(await self.aget_forecast_entry(date))
+
+    async def aget_forecast_entry(self, date) -> dict:
+        """
+        Асинхронная версия get_forecast_entry.
+        """
+        city_popularity.record(self.city)
+        day = date.isoformat()
+        cache_key = self._forecast_cache_key(day)
+        entry = read_entry(await weather_cache.aget(cache_key))
+        if entry:
+            if is_stale(entry):
+                single_flight.arefresh(cache_key, self._aload_forecast_window, lock_key=self._forecast_lock_key())
+            logger.info(f"[WeatherService] Ответ по {self.city}: из кеша")
+            record_lookup("forecast", "cache", target=self.location.target)
+            return entry
+
+        override = None
+        if await sync_to_async(self._override_candidates, thread_sensitive=False)([day]):
+            override = await ForecastOverride.objects.filter(city=self.city, date=date).afirst()
+        if override:
+            data = _override_data(override)
+            entry = make_entry(data, FORECAST_WEATHER_CACHE_TIMEOUT)
+            await weather_cache.aset(cache_key, entry, timeout=FORECAST_WEATHER_CACHE_HARD_TIMEOUT)
+            logger.info(f"[WeatherService] Ответ по {self.city}: из БД")
+            record_lookup("forecast", "db", target=self.location.target)
+            return entry
+
+        record_lookup("forecast", "api", target=self.location.target)
+
+        async def load():
+            entry = (await self._aload_forecast_window()).get(day)
+            if entry is None:
+                entry = (await self._acache_missing({cache_key: "Прогноз на указанную дату не найден."}))[cache_key]
+            return entry
+
+        try:
+            return await single_flight.afetch(cache_key, load, lock_key=self._forecast_lock_key())
+        except NotFoundError:
+            raise
+        except ValueError as e:
+            stored = await observation_store.aforecast(self.city, [day])
+            return self._stored_entry("forecast", stored.get(day), e)
+
+    async def _aload_forecast_window(self):
+        """
+        Асинхронная версия _load_forecast_window.
+        """
+        try:
+            forecast_window = await weather_providers.afetch_forecast_window(self.location.query)
+        except NotFoundError as e:
+            days = self._forecast_window_days()
+            candidates = await sync_to_async(self._override_candidates, thread_sensitive=False)(
+                [day.isoformat() for day in days]
+            )
+            overridden = set()
+            if candidates:
+                overridden = {
+                    day
+                    async for day in ForecastOverride.objects.filter(city=self.city, date__in=candidates).values_list(
+                        "date", flat=True
+                    )
+                }
+            await self._acache_missing(
+                {self._forecast_cache_key(day.isoformat()): str(e) for day in days if day not in overridden}
+            )
+            raise
+        observation_store.record_forecast(self.city, forecast_window)
+        candidates = await sync_to_async(self._override_candidates, thread_sensitive=False)(list(forecast_window))
+        overrides = []
+        if candidates:
+            overrides = [
+                override async for override in ForecastOverride.objects.filter(city=self.city, date__in=candidates)
+            ]
+        entries = self._forecast_window_entries(forecast_window, overrides)
+        await weather_cache.aset_many(
+            {self._forecast_cache_key(day): entry for day, entry in entries.items()},
+            timeout=FORECAST_WEATHER_CACHE_HARD_TIMEOUT,
+        )
+        logger.info(f"[WeatherService] Прогноз по {self.city} на {len(entries)} дн.: с API")
+        return entries
+
+    def _override_candidates(self, days: list[str]) -> list[str]:
+        """
+        Отбирает по индексу переопределений даты, на которые у города может быть переопределение.
+
+        Пустой результат означает, что запрос в БД не нужен. Если индекс не построен
+        или недоступен, возвращаются все даты.
+
+        Args:
+            days (list[str]): Даты в формате YYYY-MM-DD
+        """
+        overridden = override_index.overridden(self.city, days)
+        if overridden is None:
+            return list(days)
+        return [day for day in days if day in overridden]
+
+    @staticmethod
+    def _forecast_window_entries(forecast_window: dict, overrides) -> dict:
+        """
+        Формирует записи кеша для окна прогноза, подставляя переопределенные прогнозы из БД.
+
+        Args:
+            forecast_window (dict): {дата в формате YYYY-MM-DD: прогноз из API}
+            overrides: Переопределения прогноза для дат из окна
+
+        Returns:
+            dict: {дата в формате YYYY-MM-DD: запись кеша}
+        """
+        for override in overrides:
+            forecast_window[override.date.isoformat()] = _override_data(override)
+        return {day: make_entry(data, FORECAST_WEATHER_CACHE_TIMEOUT) for day, data in forecast_window.items()}
+
+    @staticmethod
+    def _forecast_window_days() -> list:
+        """
+        Возвращает даты, которые покрывает ответ /forecast/daily, начиная с сегодняшней.
+        """
+        today = date_type.today()
+        return [today + timedelta(days=offset) for offset in range(FORECAST_WINDOW_DAYS)]
+
+    @staticmethod
+    def _cache_missing(messages: dict) -> dict:
+        """
+        Сохраняет негативные записи кеша на NEGATIVE_CACHE_TIMEOUT.
+
+        Args:
+            messages (dict): {ключ кеша: текст ошибки}
+
+        Returns:
+            dict: {ключ кеша: негативная запись}
+        """
+        entries = {key: make_missing_entry(message, NEGATIVE_CACHE_TIMEOUT) for key, message in messages.items()}
+        weather_cache.set_many(entries, timeout=NEGATIVE_CACHE_TIMEOUT)
+        logger.info(f"[WeatherService] Негативный кеш: {len(entries)} ключей")
+        return entries
+
+    @staticmethod
+    async def _acache_missing(messages: dict) -> dict:
+        """
+        Асинхронная версия _cache_missing.
+        """
+        entries = {key: make_missing_entry(message, NEGATIVE_CACHE_TIMEOUT) for key, message in messages.items()}
+        await weather_cache.aset_many(entries, timeout=NEGATIVE_CACHE_TIMEOUT)
+        logger.info(f"[WeatherService] Негативный кеш: {len(entries)} ключей")
+        return entries
+
+    def _current_weather_cache_key(self) -> str:
+        """
+        Формирует ключ кеша текущей погоды.
+        """
+        return f"current_weather:{self.city}"
+
+    def _forecast_cache_key(self, day: str) -> str:
+        """
+        Формирует ключ кеша прогноза.
+
+        Args:
+            day (str): Дата в формате YYYY-MM-DD
+        """
+        return f"forecast:{self.city}:{day}"
+
+    def _forecast_lock_key(self) -> str:
+        """
+        Формирует ключ блокировки запроса прогноза: один запрос к API заполняет все даты города.
+        """
+        return f"forecast:{self.city}"
 
     def update_forecast_override(self, validated_data):
         """
         Обновляет или создает переопределение прогноза погоды.
 
-        После обновления данных очищает кеш для данного прогноза.
+        Пара (город, дата) добавляется в индекс переопределений в той же транзакции
+        (см. index_overrides). После обновления данных очищает кеш для данного прогноза.
+        Переопределение сохраняется под каноническим ключом города сервиса (self.city).
 
         Args:
             validated_data (dict): Валидированные данные прогноза
@@ -117,17 +986,60 @@ class WeatherService:
         Returns:
             ForecastOverride: Объект переопределения прогноза
         """
-        city = validated_data["city"].lower()
         date = validated_data["date"]
 
-        override, _ = ForecastOverride.objects.update_or_create(
-            city=city,
-            date=date,
-            defaults={
-                "min_temperature": validated_data["min_temperature"],
-                "max_temperature": validated_data["max_temperature"],
-            },
-        )
-        cache_key = f"forecast:{self.city}:{date.isoformat()}"
-        cache.delete(cache_key)
+        with transaction.atomic():
+            index_overrides([(self.city, date.isoformat())])
+            override, _ = ForecastOverride.objects.update_or_create(
+                city=self.city,
+                date=date,
+                defaults={
+                    "min_temperature": validated_data["min_temperature"],
+                    "max_temperature": validated_data["max_temperature"],
+                },
+            )
+        weather_cache.delete(self._forecast_cache_key(date.isoformat()))
         return override
+
+    @classmethod
+    def bulk_update_forecast_overrides(cls, rows: list[dict]) -> int:
+        """
+        Обновляет или создает пачку переопределений прогноза одним запросом.
+
+        Использует bulk_create с обновлением при конфликте по уникальной паре (city, date)
+        и добавляет пары в индекс переопределений, затем одним delete_many очищает кеш затронутых прогнозов.
+
+        Args:
+            rows (list[dict]): Валидированные данные прогнозов (см. update_forecast_override);
+                пара (city, date) не должна повторяться внутри пачки
+
+        Returns:
+            int: Количество записанных переопределений
+        """
+        overrides = [
+            ForecastOverride(
+                city=row["city"],
+                date=row["date"],
+                min_temperature=row["min_temperature"],
+                max_temperature=row["max_temperature"],
+            )
+            for row in rows
+        ]
+        if not overrides:
+            return 0
+        # bulk_create не вызывает save(): ключ города разрешается явно
+        for override in overrides:
+            override.resolve_city()
+
+        with transaction.atomic():
+            index_overrides([(override.city, override.date.isoformat()) for override in overrides])
+            ForecastOverride.objects.bulk_create(
+                overrides,
+                update_conflicts=True,
+                unique_fields=["city", "date"],
+                update_fields=["min_temperature", "max_temperature"],
+            )
+        weather_cache.delete_many(
+            [cls.from_key(override.city)._forecast_cache_key(override.date.isoformat()) for override in overrides]
+        )
+        return len(overrides)
@@ -0,0 +1,38 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from rest_framework.views import APIView
+
+from project import settings_api
+
+API_SETTINGS = settings_api.REST_FRAMEWORK
+
+
+@override_settings(MIDDLEWARE=settings_api.MIDDLEWARE, REST_FRAMEWORK=API_SETTINGS)
+class ApiProfileRendererTests(TestCase):
+    """
+    Ответы в профиле project.settings_api (FastJSONRenderer на orjson).
+
+    Классы DRF читаются в атрибуты APIView при импорте, поэтому рендерер профиля
+    подставляется в APIView на время теста.
+    """
+
+    def setUp(self):
+        patcher = mock.patch.multiple(
+            APIView,
+            renderer_classes=[import_string(path) for path in API_SETTINGS["DEFAULT_RENDERER_CLASSES"]],
+            content_negotiation_class=import_string(API_SETTINGS["DEFAULT_CONTENT_NEGOTIATION_CLASS"]),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batch_validation_error_with_index_keys(self):
+        # Ошибки ListField индексированы номерами элементов (ключи int)
+        response = self.client.post(
+            reverse("current-weather-batch"), {"cities": ["Moscow", "geo:u"]}, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("1", response.json()["cities"])
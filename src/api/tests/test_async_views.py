@@ -0,0 +1,46 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from prometheus_client import REGISTRY
+
+from api import services
+from api.services import weather_cache
+from api.views import AsyncCurrentWeatherBatchView, AsyncCurrentWeatherView
+
+CURRENT_WEATHER = {"temperature": 12.5, "local_time": "10:00"}
+
+
+def serialize_count() -> float:
+    return REGISTRY.get_sample_value("weather_phase_duration_seconds_count", {"phase": "serialize"}) or 0.0
+
+
+class AsyncViewSerializePhaseTests(TestCase):
+    """
+    Асинхронные представления учитывают построение JSON-ответа в фазе serialize, как рендереры DRF.
+    """
+
+    def setUp(self):
+        cache.clear()
+        weather_cache.local.clear()
+        self.factory = RequestFactory()
+
+    async def test_current_weather_observes_serialize(self):
+        before = serialize_count()
+        with mock.patch.object(
+            services.weather_providers, "afetch_current_weather", return_value=CURRENT_WEATHER
+        ) as afetch_current_weather:
+            response = await AsyncCurrentWeatherView.as_view()(self.factory.get("/", {"city": "Moscow"}))
+
+        self.assertEqual(response.status_code, 200)
+        afetch_current_weather.assert_awaited_once()
+        self.assertEqual(serialize_count(), before + 1)
+
+    async def test_batch_validation_error_observes_serialize(self):
+        before = serialize_count()
+        request = self.factory.post("/", {"cities": []}, content_type="application/json")
+
+        response = await AsyncCurrentWeatherBatchView.as_view()(request)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(serialize_count(), before + 1)
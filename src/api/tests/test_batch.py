@@ -0,0 +1,70 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from api import services
+from api.caching.entries import make_entry
+from api.services import WeatherService, weather_cache
+from api.views import AsyncCurrentWeatherBatchView
+from api.weather_provider.exceptions import NotFoundError
+
+CACHED = {"temperature": 1.0, "local_time": "10:00"}
+FETCHED = {"temperature": 15.0, "local_time": "09:00"}
+
+
+def current_weather(location: dict) -> dict:
+    if location["city"].casefold() == "atlantis":
+        raise NotFoundError("Город не найден.")
+    return FETCHED
+
+
+class CurrentWeatherBatchTests(TestCase):
+    """
+    Пакетный запрос читает кеш одним запросом, запрашивает из API только промахи,
+    а ошибки возвращает по каждому городу отдельно.
+    """
+
+    body = {"cities": ["Moscow", "Paris", "Atlantis"]}
+    expected = {"results": {"Moscow": CACHED, "Paris": FETCHED}, "errors": {"Atlantis": "Город не найден."}}
+
+    def setUp(self):
+        cache.clear()
+        weather_cache.local.clear()
+        moscow = WeatherService("Moscow")
+        weather_cache.set(moscow._current_weather_cache_key(), make_entry(CACHED, 300))
+
+    def test_batch_fetches_only_misses(self):
+        with mock.patch.object(
+            services.weather_providers, "fetch_current_weather", side_effect=current_weather
+        ) as fetch_current_weather:
+            response = self.client.post(reverse("current-weather-batch"), self.body, content_type="application/json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), self.expected)
+        self.assertEqual(
+            sorted(call.args[0]["city"].casefold() for call in fetch_current_weather.call_args_list),
+            ["atlantis", "paris"],
+        )
+
+    def test_batch_error_is_cached_per_city(self):
+        with mock.patch.object(
+            services.weather_providers, "fetch_current_weather", side_effect=current_weather
+        ) as fetch_current_weather:
+            WeatherService.get_current_weather_batch(self.body["cities"])
+            results, errors = WeatherService.get_current_weather_batch(self.body["cities"])
+
+        self.assertEqual((results, errors), (self.expected["results"], self.expected["errors"]))
+        self.assertEqual(fetch_current_weather.call_count, 2)
+
+    async def test_async_batch_fetches_only_misses(self):
+        request = RequestFactory().post("/", self.body, content_type="application/json")
+        with mock.patch.object(
+            services.weather_providers, "afetch_current_weather", side_effect=current_weather
+        ) as afetch_current_weather:
+            response = await AsyncCurrentWeatherBatchView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertJSONEqual(response.content, self.expected)
+        self.assertEqual(afetch_current_weather.await_count, 2)
@@ -0,0 +1,51 @@
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.client import FakePayload
+from django.urls import reverse
+
+from api.models import ForecastOverride
+from api.services import weather_cache
+
+DAY = date.today() + timedelta(days=1)
+CSV_BODY = f"city,date,min_temperature,max_temperature\nMoscow,{DAY:%d.%m.%Y},12.5,20.1\nParis,{DAY:%d.%m.%Y},15,25\n"
+
+
+class ForecastOverrideBulkViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        weather_cache.local.clear()
+        self.url = reverse("forecast-override-bulk")
+
+    def test_content_type_parameters_are_ignored(self):
+        response = self.client.post(self.url, CSV_BODY.encode(), content_type="text/csv; charset=utf-8")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["imported"], 2)
+
+    def test_unsupported_content_type(self):
+        response = self.client.post(self.url, CSV_BODY.encode(), content_type="application/json; charset=utf-8")
+
+        self.assertEqual(response.status_code, 415)
+
+    async def test_body_without_content_length(self):
+        # Chunked-загрузка: ASGI-сервер передает тело без заголовка Content-Length
+        body = f'{{"city": "Moscow", "date": "{DAY:%d.%m.%Y}", "min_temperature": 12.5, "max_temperature": 20.1}}\n'
+        response = await self.async_client.request(
+            method="POST",
+            path=self.url,
+            query_string="",
+            headers=[(b"host", b"testserver"), (b"content-type", b"application/x-ndjson")],
+            _body_file=FakePayload(body.encode()),
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["imported"], 1)
+        override = await ForecastOverride.objects.aget()
+        self.assertEqual((override.city, override.date), ("moscow", DAY))
+
+    def test_empty_body(self):
+        response = self.client.generic("POST", self.url, CONTENT_TYPE="text/csv")
+
+        self.assertEqual(response.status_code, 400)
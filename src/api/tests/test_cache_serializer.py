@@ -0,0 +1,60 @@
+import pickle
+from datetime import date
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from api.caching.entries import make_entry
+from api.caching.serializers import FORMAT_MSGPACK, FORMAT_MSGPACK_ZLIB, FORMAT_PICKLE, VersionedSerializer
+
+ENTRY = make_entry({"temperature": 12.5, "local_time": "10:00"}, 300)
+
+
+class VersionedSerializerTests(SimpleTestCase):
+    """
+    Значения кеша пишутся в msgpack с байтом версии формата, а читаются в любом известном формате.
+    """
+
+    def setUp(self):
+        self.serializer = VersionedSerializer({})
+
+    def test_entry_round_trip_in_msgpack(self):
+        packed = self.serializer.dumps(ENTRY)
+
+        self.assertEqual(packed[0], FORMAT_MSGPACK)
+        self.assertEqual(self.serializer.loads(packed), ENTRY)
+
+    def test_large_value_is_compressed(self):
+        window = {f"2024-01-{day:02}": {"min_temperature": 1.0, "max_temperature": 5.0} for day in range(1, 32)}
+        value = make_entry(window, 300)
+
+        packed = self.serializer.dumps(value)
+
+        self.assertEqual(packed[0], FORMAT_MSGPACK_ZLIB)
+        self.assertEqual(self.serializer.loads(packed), value)
+
+    def test_int_keys_round_trip(self):
+        self.assertEqual(self.serializer.loads(self.serializer.dumps({1: "a"})), {1: "a"})
+
+    def test_unsupported_value_falls_back_to_pickle(self):
+        packed = self.serializer.dumps({"date": date(2024, 1, 1)})
+
+        self.assertEqual(packed[0], FORMAT_PICKLE)
+        self.assertEqual(self.serializer.loads(packed), {"date": date(2024, 1, 1)})
+
+    def test_reads_values_of_default_pickle_serializer(self):
+        self.assertEqual(self.serializer.loads(pickle.dumps(ENTRY, pickle.HIGHEST_PROTOCOL)), ENTRY)
+
+    def test_pickle_format_is_readable_by_msgpack_serializer(self):
+        packed = VersionedSerializer({"VALUE_FORMAT": "pickle"}).dumps(ENTRY)
+
+        self.assertEqual(packed[0], FORMAT_PICKLE)
+        self.assertEqual(self.serializer.loads(packed), ENTRY)
+
+    def test_unknown_version_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.serializer.loads(b"\x7f")
+
+    def test_unknown_value_format_is_improperly_configured(self):
+        with self.assertRaises(ImproperlyConfigured):
+            VersionedSerializer({"VALUE_FORMAT": "json"})
@@ -0,0 +1,30 @@
+from unittest import mock
+
+from django.test import TransactionTestCase
+
+from api import cities
+from api.cities import CityIndex
+from api.models import City, CityAlias
+
+
+class CityIndexLoadTests(TransactionTestCase):
+    """
+    Справочник загружается при запуске приложения (CityIndex.load), и первое обращение
+    из асинхронного кода не ждет БД в цикле событий.
+
+    TransactionTestCase: справочник читается в отдельном потоке и должен видеть записи теста.
+    """
+
+    def setUp(self):
+        city = City.objects.create(name="New York", country="US")
+        CityAlias.objects.create(alias="NYC", city=city)
+        self.index = CityIndex(refresh_interval=0)
+        self.index.load()
+
+    def test_load_reads_database(self):
+        self.assertEqual(self.index.resolve("nyc").key, "new york")
+
+    async def test_resolve_in_event_loop_after_load(self):
+        with mock.patch.object(cities.threading, "Thread") as thread:
+            self.assertEqual(self.index.resolve("NYC").name, "New York")
+        thread.assert_not_called()
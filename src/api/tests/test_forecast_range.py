@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from api import services
+from api.models import ForecastOverride
+from api.services import index_overrides, override_index, weather_cache
+
+OVERRIDE = {"min_temperature": 20.0, "max_temperature": 25.0}
+
+
+def forecast_day(offset: int) -> dict:
+    return {"min_temperature": float(offset), "max_temperature": float(offset + 5)}
+
+
+class ForecastRangeTests(TestCase):
+    """
+    GET /api/weather/forecast/range: прогноз на диапазон дат одним запросом к API.
+    """
+
+    def setUp(self):
+        cache.clear()
+        weather_cache.local.clear()
+        override_index.rebuild([])
+        self.days = [date.today() + timedelta(days=offset) for offset in range(1, 4)]
+        window = {day.isoformat(): forecast_day(offset) for offset, day in enumerate(self.days, start=1)}
+        patcher = mock.patch.object(services.weather_providers, "fetch_forecast_window", return_value=window)
+        self.fetch_forecast_window = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, date_from: date, date_to: date, date_format: str = "%d.%m.%Y"):
+        return self.client.get(
+            reverse("forecast-weather-range"),
+            {"city": "Moscow", "from": date_from.strftime(date_format), "to": date_to.strftime(date_format)},
+        )
+
+    def test_range_returns_each_day_in_order(self):
+        response = self.get(self.days[0], self.days[-1])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["city"], "Moscow")
+        self.assertEqual(
+            response.json()["forecast"],
+            [{"date": day.isoformat(), **forecast_day(offset)} for offset, day in enumerate(self.days, start=1)],
+        )
+        self.fetch_forecast_window.assert_called_once()
+
+    def test_repeated_range_is_served_from_cache(self):
+        self.get(self.days[0], self.days[-1])
+        weather_cache.local.clear()
+
+        response = self.get(self.days[1], self.days[-1])
+
+        self.assertEqual([item["date"] for item in response.json()["forecast"]], [d.isoformat() for d in self.days[1:]])
+        self.fetch_forecast_window.assert_called_once()
+
+    def test_iso_dates_are_accepted(self):
+        response = self.get(self.days[0], self.days[1], date_format="%Y-%m-%d")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["forecast"]), 2)
+
+    def test_reversed_range_is_rejected(self):
+        response = self.get(self.days[-1], self.days[0])
+
+        self.assertEqual(response.status_code, 400)
+        self.fetch_forecast_window.assert_not_called()
+
+    def test_override_replaces_day_in_range(self):
+        index_overrides([("moscow", self.days[1].isoformat())])
+        ForecastOverride.objects.create(city="moscow", date=self.days[1], **OVERRIDE)
+
+        forecast = self.get(self.days[0], self.days[-1]).json()["forecast"]
+
+        self.assertEqual(forecast[1], {"date": self.days[1].isoformat(), **OVERRIDE})
+        self.assertEqual(forecast[0], {"date": self.days[0].isoformat(), **forecast_day(1)})
+
+    def test_day_missing_from_provider_is_not_found(self):
+        self.fetch_forecast_window.return_value = {self.days[0].isoformat(): forecast_day(1)}
+
+        response = self.get(self.days[0], self.days[-1])
+
+        self.assertEqual(response.status_code, 404)
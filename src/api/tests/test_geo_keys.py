@@ -0,0 +1,56 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from api import services
+from api.geo import snap_to_cell
+from api.services import WeatherService
+from project import settings
+
+CELL = snap_to_cell(55.7558, 37.6173, settings.GEOHASH_PRECISION)
+
+
+class GeoKeyInCityTests(TestCase):
+    """
+    Ключ ячейки geohash ("geo:<geohash>") принимается только из координат, но не из названия города.
+    """
+
+    def test_current_weather_rejects_cell_key_as_city(self):
+        with mock.patch.object(services.weather_providers, "fetch_current_weather") as fetch_current_weather:
+            response = self.client.get(reverse("current-weather"), {"city": CELL.key})
+
+        self.assertEqual(response.status_code, 400)
+        fetch_current_weather.assert_not_called()
+
+    def test_batch_rejects_cell_key_as_city(self):
+        response = self.client.post(
+            reverse("current-weather-batch"), {"cities": ["Moscow", CELL.key.upper()]}, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_override_rejects_cell_key_as_city(self):
+        day = (date.today() + timedelta(days=1)).strftime("%d.%m.%Y")
+        response = self.client.post(
+            reverse("forecast-weather"),
+            {"city": CELL.key, "date": day, "min_temperature": 1, "max_temperature": 2},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_service_resolves_cell_key_as_city_name(self):
+        service = WeatherService(CELL.key)
+
+        self.assertEqual(service.location.target, "city")
+
+    def test_from_key_restores_cell(self):
+        service = WeatherService.from_key(CELL.key)
+
+        self.assertEqual(service.location, CELL)
+        self.assertEqual(service.city, CELL.key)
+
+    def test_from_key_resolves_city(self):
+        self.assertEqual(WeatherService.from_key("moscow").location.target, "city")
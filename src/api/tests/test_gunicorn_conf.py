@@ -0,0 +1,58 @@
+import importlib.util
+import os
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+from django.utils.module_loading import import_string
+
+from project import settings
+
+
+def load_gunicorn_conf():
+    spec = importlib.util.spec_from_file_location("gunicorn_conf", settings.BASE_DIR / "gunicorn.conf.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class WorkerClassTests(SimpleTestCase):
+    def test_uvicorn_worker_class_is_importable(self):
+        with mock.patch.dict(os.environ, {"GUNICORN_WORKER_CLASS": "uvicorn"}):
+            conf = load_gunicorn_conf()
+
+        self.assertEqual(conf.wsgi_app, "project.asgi:application")
+        self.assertEqual(import_string(conf.worker_class).__name__, "UvicornWorker")
+
+
+class PreloadDatabasePoolTests(TransactionTestCase):
+    """
+    При preload_app пул соединений PostgreSQL, открытый в мастере (справочник городов),
+    закрывается до fork, а воркер не пользуется унаследованным пулом.
+    """
+
+    def setUp(self):
+        self.conf = load_gunicorn_conf()
+        self.server = SimpleNamespace(cfg=SimpleNamespace(preload_app=True))
+        if connection.pool is None:
+            self.skipTest("Пул соединений отключен (DB_POOL=False)")
+
+    def test_pre_fork_closes_master_pool(self):
+        connection.ensure_connection()
+        self.assertIn(connection.alias, connection._connection_pools)
+
+        self.conf.pre_fork(self.server, worker=None)
+
+        self.assertNotIn(connection.alias, connection._connection_pools)
+        self.assertIsNone(connection.connection)
+
+    def test_post_fork_drops_inherited_pool_without_closing_it(self):
+        inherited = connection.pool
+        self.addCleanup(inherited.close)
+
+        with mock.patch.object(inherited, "close") as close:
+            self.conf.post_fork(self.server, worker=None)
+
+        close.assert_not_called()
+        self.assertIsNot(connection.pool, inherited)
@@ -0,0 +1,70 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from api import services
+from api.services import override_index, weather_cache
+
+CURRENT_WEATHER = {"temperature": 12.5, "local_time": "10:00"}
+
+
+class ConditionalGetTests(TestCase):
+    """
+    Ответы о погоде содержат ETag и Cache-Control, а запрос с совпадающим If-None-Match получает 304.
+    """
+
+    def setUp(self):
+        cache.clear()
+        weather_cache.local.clear()
+        override_index.rebuild([])
+        patcher = mock.patch.object(services.weather_providers, "fetch_current_weather", return_value=CURRENT_WEATHER)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = reverse("current-weather")
+
+    def get(self, if_none_match: str | None = None):
+        headers = {"If-None-Match": if_none_match} if if_none_match else {}
+        return self.client.get(self.url, {"city": "Moscow"}, headers=headers)
+
+    def test_response_has_cache_headers(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["ETag"])
+        self.assertRegex(response["Cache-Control"], r"^public, max-age=\d+$")
+
+    def test_matching_etag_returns_not_modified(self):
+        etag = self.get()["ETag"]
+
+        response = self.get(if_none_match=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+        self.assertIn("Cache-Control", response)
+
+    def test_weak_etag_matches(self):
+        etag = self.get()["ETag"]
+
+        self.assertEqual(self.get(if_none_match=f"W/{etag}").status_code, 304)
+
+    def test_other_etag_returns_full_response(self):
+        self.get()
+
+        response = self.get(if_none_match='"stale"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), CURRENT_WEATHER)
+
+    def test_forecast_matching_etag_returns_not_modified(self):
+        day = date.today() + timedelta(days=1)
+        window = {day.isoformat(): {"min_temperature": 1.0, "max_temperature": 5.0}}
+        params = {"city": "Moscow", "date": day.strftime("%d.%m.%Y")}
+        with mock.patch.object(services.weather_providers, "fetch_forecast_window", return_value=window):
+            etag = self.client.get(reverse("forecast-weather"), params)["ETag"]
+            response = self.client.get(reverse("forecast-weather"), params, headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 304)
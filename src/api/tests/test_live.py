@@ -0,0 +1,84 @@
+import asyncio
+import json
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django_redis import get_redis_connection
+
+from api import services
+from api.services import live_updates
+from project import settings
+
+
+async def next_event(stream) -> dict:
+    """
+    Читает из ответа SSE следующее событие, пропуская retry и heartbeat.
+    """
+    while True:
+        chunk = (await asyncio.wait_for(anext(stream), timeout=5)).decode()
+        if chunk.startswith(("retry:", ":")):
+            continue
+        fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+        return {"id": fields.get("id"), "event": fields["event"], "data": json.loads(fields["data"])}
+
+
+class CurrentWeatherStreamResumeTests(TestCase):
+    """
+    Клиент, переподключившийся с Last-Event-ID, получает пропущенные обновления из потока Redis
+    вместо текущего состояния, а затем — новые события.
+    """
+
+    def setUp(self):
+        get_redis_connection("default").delete(settings.LIVE_STREAM_KEY)
+        self.url = reverse("current-weather-stream") + "?city=Moscow&city=Paris"
+        self.moscow_seen = live_updates.publish("moscow", {"temperature": 1.0, "local_time": "10:00"})
+        self.paris_missed = live_updates.publish("paris", {"temperature": 15.0, "local_time": "09:00"})
+        self.moscow_missed = live_updates.publish("moscow", {"temperature": 2.0, "local_time": "10:05"})
+
+    async def stream(self, last_event_id: str):
+        response = await self.async_client.get(self.url, headers={"Last-Event-ID": last_event_id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        return response.streaming_content
+
+    async def test_resume_replays_missed_events(self):
+        with mock.patch.object(services.weather_providers, "afetch_current_weather") as afetch_current_weather:
+            stream = await self.stream(self.moscow_seen)
+            try:
+                events = [await next_event(stream), await next_event(stream)]
+            finally:
+                await stream.aclose()
+
+        # По каждому городу — только последнее пропущенное событие, в порядке публикации
+        self.assertEqual(
+            events,
+            [
+                {
+                    "id": self.paris_missed,
+                    "event": "current",
+                    "data": {"city": "Paris", "temperature": 15.0, "local_time": "09:00"},
+                },
+                {
+                    "id": self.moscow_missed,
+                    "event": "current",
+                    "data": {"city": "Moscow", "temperature": 2.0, "local_time": "10:05"},
+                },
+            ],
+        )
+        # Текущее состояние при возобновлении не запрашивается
+        afetch_current_weather.assert_not_called()
+
+    async def test_resume_from_latest_event_waits_for_new_events(self):
+        stream = await self.stream(self.moscow_missed)
+        try:
+            pending = asyncio.ensure_future(next_event(stream))
+            # Слушатель pub/sub подписывается на каналы в течение POLL_INTERVAL
+            await asyncio.sleep(1)
+            published = await live_updates.apublish("paris", {"temperature": 16.0, "local_time": "09:30"})
+            event = await pending
+        finally:
+            await stream.aclose()
+
+        self.assertEqual(event["id"], published)
+        self.assertEqual(event["data"], {"city": "Paris", "temperature": 16.0, "local_time": "09:30"})
@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from api import services
+from api.services import override_index, weather_cache
+from api.weather_provider.exceptions import NotFoundError, UpstreamUnavailableError
+
+
+def query_date(offset: int) -> str:
+    return (date.today() + timedelta(days=offset)).strftime("%d.%m.%Y")
+
+
+class NegativeCacheTests(TestCase):
+    """
+    Ответ "город не найден" кешируется на NEGATIVE_CACHE_TIMEOUT, а временные сбои — нет.
+    """
+
+    def setUp(self):
+        cache.clear()
+        weather_cache.local.clear()
+        override_index.rebuild([])
+
+    def test_current_weather_not_found_is_cached(self):
+        with mock.patch.object(
+            services.weather_providers, "fetch_current_weather", side_effect=NotFoundError("Город не найден.")
+        ) as fetch_current_weather:
+            first = self.client.get(reverse("current-weather"), {"city": "Atlantis"})
+            second = self.client.get(reverse("current-weather"), {"city": "Atlantis"})
+
+        self.assertEqual((first.status_code, second.status_code), (404, 404))
+        self.assertEqual(second.json(), {"error": "Город не найден."})
+        fetch_current_weather.assert_called_once()
+
+    def test_forecast_not_found_is_cached_for_whole_window(self):
+        with mock.patch.object(
+            services.weather_providers, "fetch_forecast_window", side_effect=NotFoundError("Город не найден.")
+        ) as fetch_forecast_window:
+            first = self.client.get(reverse("forecast-weather"), {"city": "Atlantis", "date": query_date(1)})
+            # Негативная запись создана на все даты окна прогноза
+            other_day = self.client.get(reverse("forecast-weather"), {"city": "Atlantis", "date": query_date(2)})
+
+        self.assertEqual((first.status_code, other_day.status_code), (404, 404))
+        fetch_forecast_window.assert_called_once()
+
+    def test_upstream_error_is_not_cached(self):
+        with mock.patch.object(
+            services.weather_providers,
+            "fetch_current_weather",
+            side_effect=[
+                UpstreamUnavailableError("Внешний API временно недоступен."),
+                {"temperature": 1.0, "local_time": "10:00"},
+            ],
+        ) as fetch_current_weather:
+            with self.assertLogs("utils.decorators", "ERROR"):
+                first = self.client.get(reverse("current-weather"), {"city": "Moscow"})
+            second = self.client.get(reverse("current-weather"), {"city": "Moscow"})
+
+        self.assertEqual((first.status_code, second.status_code), (503, 200))
+        self.assertEqual(fetch_current_weather.call_count, 2)
@@ -0,0 +1,30 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from api import observations
+from api.observations import ObservationStore
+
+
+class StopWriter(BaseException):
+    pass
+
+
+class ObservationWriterTests(SimpleTestCase):
+    def setUp(self):
+        self.store = ObservationStore(
+            enabled=True, batch_size=10, flush_interval=0, queue_size=10, current_max_age=60, forecast_max_age=60
+        )
+
+    def test_writer_survives_flush_error(self):
+        # Третий sleep останавливает цикл после двух записей
+        with (
+            mock.patch.object(observations.time, "sleep", side_effect=[None, None, StopWriter]),
+            mock.patch.object(observations, "close_old_connections"),
+            mock.patch.object(self.store, "flush", side_effect=[RuntimeError("сбой"), 0]) as flush,
+            self.assertLogs(observations.logger, "ERROR"),
+        ):
+            with self.assertRaises(StopWriter):
+                self.store._write_forever()
+
+        self.assertEqual(flush.call_count, 2)
@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django_redis import get_redis_connection
+
+from api import services
+from api.caching import overrides
+from api.models import ForecastOverride
+from api.services import WeatherService, override_index, weather_cache
+
+API_FORECAST = {"min_temperature": 1.0, "max_temperature": 5.0}
+OVERRIDE = {"min_temperature": 20.0, "max_temperature": 25.0}
+
+
+class OverrideIndexTests(TestCase):
+    """
+    Индекс наличия переопределений: промах кеша прогноза не обращается к БД, пока для даты
+    нет переопределения, а запись переопределения сразу попадает в индекс.
+    """
+
+    def setUp(self):
+        cache.clear()
+        weather_cache.local.clear()
+        override_index.rebuild([])
+        self.day = date.today() + timedelta(days=1)
+        window = {self.day.isoformat(): dict(API_FORECAST)}
+        patcher = mock.patch.object(services.weather_providers, "fetch_forecast_window", return_value=window)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def forecast(self) -> dict:
+        weather_cache.local.clear()
+        return WeatherService("Moscow").get_forecast_for_date(self.day)
+
+    def test_forecast_miss_skips_database(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.forecast(), API_FORECAST)
+
+    def test_saved_override_is_indexed_and_served(self):
+        self.forecast()
+
+        response = self.client.post(
+            reverse("forecast-weather"),
+            {"city": "Moscow", "date": self.day.strftime("%d.%m.%Y"), **OVERRIDE},
+            content_type="application/json",
+        )
+
+        self.assertLess(response.status_code, 300)
+        self.assertEqual(override_index.overridden("moscow", [self.day.isoformat()]), {self.day.isoformat()})
+        self.assertEqual(self.forecast(), OVERRIDE)
+
+    def test_missing_index_falls_back_to_database(self):
+        # Переопределение записано в обход индекса, а индекс вытеснен из Redis
+        ForecastOverride.objects.create(city="moscow", date=self.day, **OVERRIDE)
+        get_redis_connection("default").delete(override_index.key)
+
+        self.assertIsNone(override_index.overridden("moscow", [self.day.isoformat()]))
+        self.assertEqual(self.forecast(), OVERRIDE)
+
+    def test_rebuild_replaces_index(self):
+        override_index.add([("moscow", self.day.isoformat())])
+
+        override_index.rebuild([("paris", self.day.isoformat())])
+
+        self.assertEqual(override_index.overridden("moscow", [self.day.isoformat()]), set())
+        self.assertEqual(override_index.overridden("paris", [self.day.isoformat()]), {self.day.isoformat()})
+
+    def test_redis_error_falls_back_to_database(self):
+        with mock.patch.object(overrides, "get_redis_connection", side_effect=ConnectionError("Redis недоступен")):
+            with self.assertLogs(overrides.logger, "WARNING"):
+                self.assertIsNone(override_index.overridden("moscow", [self.day.isoformat()]))
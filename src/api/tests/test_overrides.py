@@ -0,0 +1,59 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.admin.sites import site
+from django.core.cache import cache
+from django.test import TestCase
+
+from api import services
+from api.cities import city_index
+from api.models import City, CityAlias, ForecastOverride
+from api.services import WeatherService, override_index, weather_cache
+
+API_FORECAST = {"min_temperature": 1.0, "max_temperature": 5.0}
+OVERRIDE = {"min_temperature": 20.0, "max_temperature": 25.0}
+
+
+class OverrideCityAliasTests(TestCase):
+    """
+    Переопределение, сохраненное под псевдонимом города, хранится под каноническим ключом
+    и находится при запросе прогноза по названию города.
+    """
+
+    def setUp(self):
+        cache.clear()
+        weather_cache.local.clear()
+        city = City.objects.create(name="New York", country="US")
+        CityAlias.objects.create(alias="NYC", city=city)
+        city_index.reload()
+        self.addCleanup(self._reset_city_index)
+        # Индекс построен: БД опрашивается только по парам из индекса
+        override_index.rebuild([])
+        self.day = date.today()
+
+    def _reset_city_index(self):
+        City.objects.all().delete()
+        city_index.reload()
+
+    def assert_override_served(self):
+        window = {self.day.isoformat(): dict(API_FORECAST)}
+        with mock.patch.object(services.weather_providers, "fetch_forecast_window", return_value=window):
+            self.assertEqual(WeatherService("New York").get_forecast_for_date(self.day), OVERRIDE)
+
+    def test_save_resolves_alias(self):
+        override = ForecastOverride.objects.create(city="NYC", date=self.day, **OVERRIDE)
+
+        self.assertEqual(override.city, "new york")
+
+    def test_admin_override_under_alias_is_found(self):
+        override = ForecastOverride(city="nyc", date=self.day, **OVERRIDE)
+        site._registry[ForecastOverride].save_model(None, override, None, False)
+
+        self.assertEqual(override.city, "new york")
+        self.assert_override_served()
+
+    def test_bulk_override_under_alias_is_found(self):
+        WeatherService.bulk_update_forecast_overrides([{"city": "NYC", "date": self.day, **OVERRIDE}])
+
+        self.assertEqual(ForecastOverride.objects.get().city, "new york")
+        self.assert_override_served()
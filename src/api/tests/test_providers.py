@@ -0,0 +1,85 @@
+import time
+
+from django.test import SimpleTestCase
+
+from api.weather_provider.base import WeatherProvider
+from api.weather_provider.fake import FakeProvider
+from api.weather_provider.registry import ProviderRouter
+
+LOCATION = {"city": "Moscow"}
+SLOW = 0.5
+HEDGE_DELAY = 0.05
+
+
+class WeatherProviderTests(SimpleTestCase):
+    def test_provider_must_implement_fetch_methods(self):
+        class CurrentOnlyProvider(WeatherProvider):
+            def fetch_current_weather(self, location: dict) -> dict:
+                return {}
+
+        with self.assertRaises(TypeError):
+            CurrentOnlyProvider("current-only")
+
+
+class ProviderRouterHedgingTests(SimpleTestCase):
+    """
+    Запрос дублируется резервному поставщику, если основной не ответил за hedge-задержку
+    или ответил ошибкой; сервис получает первый успешный ответ.
+    """
+
+    def router(self, primary: FakeProvider, secondary: FakeProvider) -> ProviderRouter:
+        # Перцентиль не рассчитывается: hedge-задержка всегда default_delay
+        return ProviderRouter(primary, secondary, min_samples=1000, default_delay=HEDGE_DELAY, workers=4)
+
+    def wins(self, router: ProviderRouter, provider: FakeProvider) -> int:
+        return router.stats()[provider.name]["current"]["wins"]
+
+    def requests(self, router: ProviderRouter, provider: FakeProvider) -> int:
+        return router.stats()[provider.name]["current"]["requests"]
+
+    def test_hedge_fires_after_delay_and_secondary_wins(self):
+        primary, secondary = FakeProvider("primary", latency=SLOW), FakeProvider("secondary", latency=0)
+        router = self.router(primary, secondary)
+
+        started = time.monotonic()
+        result = router.fetch_current_weather(LOCATION)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(result["temperature"], secondary.fetch_current_weather(LOCATION)["temperature"])
+        self.assertGreaterEqual(elapsed, HEDGE_DELAY)
+        self.assertLess(elapsed, SLOW)
+        self.assertEqual(self.wins(router, secondary), 1)
+        self.assertEqual(self.wins(router, primary), 0)
+
+    def test_fast_primary_is_not_hedged(self):
+        primary, secondary = FakeProvider("primary", latency=0), FakeProvider("secondary", latency=0)
+        router = self.router(primary, secondary)
+
+        router.fetch_current_weather(LOCATION)
+
+        self.assertEqual(self.wins(router, primary), 1)
+        self.assertEqual(self.requests(router, secondary), 0)
+
+    def test_primary_error_hedges_immediately(self):
+        primary = FakeProvider("primary", latency=0, error_rate=1)
+        secondary = FakeProvider("secondary", latency=0)
+        router = ProviderRouter(primary, secondary, min_samples=1000, default_delay=SLOW, workers=4)
+
+        started = time.monotonic()
+        router.fetch_current_weather(LOCATION)
+
+        self.assertLess(time.monotonic() - started, SLOW)
+        self.assertEqual(self.wins(router, secondary), 1)
+
+    async def test_async_hedge_fires_after_delay_and_secondary_wins(self):
+        primary, secondary = FakeProvider("primary", latency=SLOW), FakeProvider("secondary", latency=0)
+        router = self.router(primary, secondary)
+
+        started = time.monotonic()
+        await router.afetch_current_weather(LOCATION)
+        elapsed = time.monotonic() - started
+
+        self.assertGreaterEqual(elapsed, HEDGE_DELAY)
+        self.assertLess(elapsed, SLOW)
+        self.assertEqual(self.wins(router, secondary), 1)
+        self.assertEqual(self.wins(router, primary), 0)
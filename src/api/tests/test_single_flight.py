@@ -0,0 +1,62 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from api import services
+from api.caching.entries import make_entry
+from api.services import WeatherService, single_flight, weather_cache
+
+# Значение текущей погоды в формате до записей с мягким сроком жизни
+OLD_FORMAT_VALUE = {"temperature": -3.0, "local_time": "10:00"}
+FRESH_VALUE = {"temperature": 21.5, "local_time": "12:00"}
+
+
+class OldFormatCacheValueTests(TestCase):
+    """
+    Значение кеша в старом формате считается промахом: его загружают заново, а не отдают как запись.
+    """
+
+    def setUp(self):
+        cache.clear()
+        weather_cache.local.clear()
+        self.service = WeatherService("Moscow")
+        self.cache_key = self.service._current_weather_cache_key()
+        cache.set(self.cache_key, OLD_FORMAT_VALUE)
+
+    def test_current_weather_refetches_old_format_value(self):
+        with mock.patch.object(
+            services.weather_providers, "fetch_current_weather", return_value=FRESH_VALUE
+        ) as fetch_current_weather:
+            self.assertEqual(self.service.get_current_weather(), FRESH_VALUE)
+        fetch_current_weather.assert_called_once()
+
+    async def test_async_current_weather_refetches_old_format_value(self):
+        with mock.patch.object(
+            services.weather_providers, "afetch_current_weather", return_value=FRESH_VALUE
+        ) as afetch_current_weather:
+            self.assertEqual(await self.service.aget_current_weather(), FRESH_VALUE)
+        afetch_current_weather.assert_awaited_once()
+
+    def test_leader_ignores_old_format_value(self):
+        entry = make_entry(FRESH_VALUE, 300)
+        self.assertEqual(single_flight.fetch(self.cache_key, lambda: entry), entry)
+
+    def test_follower_waits_for_entry_instead_of_old_format_value(self):
+        entry = make_entry(FRESH_VALUE, 300)
+        lock = single_flight._lock(self.cache_key)
+        self.assertTrue(lock.acquire(blocking=False))
+
+        def leader():
+            time.sleep(0.2)
+            weather_cache.set(self.cache_key, entry)
+            lock.release()
+
+        thread = threading.Thread(target=leader)
+        thread.start()
+        try:
+            self.assertEqual(single_flight.fetch(self.cache_key, mock.Mock()), entry)
+        finally:
+            thread.join()
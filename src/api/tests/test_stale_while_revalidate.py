@@ -0,0 +1,54 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from api import services
+from api.caching.entries import is_stale, make_entry, make_missing_entry, read_entry
+from api.services import WeatherService, weather_cache
+
+STALE_VALUE = {"temperature": -3.0, "local_time": "10:00"}
+FRESH_VALUE = {"temperature": 21.5, "local_time": "12:00"}
+
+
+class StaleWhileRevalidateTests(TestCase):
+    """
+    Запись после мягкого срока жизни отдается сразу, а обновляется в фоне.
+    """
+
+    def setUp(self):
+        cache.clear()
+        weather_cache.local.clear()
+        self.service = WeatherService("Moscow")
+        self.cache_key = self.service._current_weather_cache_key()
+
+    def wait_for_value(self, value, timeout: float = 2.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            entry = read_entry(cache.get(self.cache_key))
+            if entry and entry["value"] == value:
+                return entry
+            time.sleep(0.01)
+        self.fail("Запись кеша не обновилась в фоне")
+
+    def test_stale_entry_is_served_and_refreshed_in_background(self):
+        weather_cache.set(self.cache_key, make_entry(STALE_VALUE, -1))
+        with mock.patch.object(
+            services.weather_providers, "fetch_current_weather", return_value=FRESH_VALUE
+        ) as fetch_current_weather:
+            self.assertEqual(self.service.get_current_weather(), STALE_VALUE)
+            entry = self.wait_for_value(FRESH_VALUE)
+
+        fetch_current_weather.assert_called_once()
+        self.assertFalse(is_stale(entry))
+
+    def test_fresh_entry_is_not_refreshed(self):
+        weather_cache.set(self.cache_key, make_entry(FRESH_VALUE, 300))
+        with mock.patch.object(services.weather_providers, "fetch_current_weather") as fetch_current_weather:
+            self.assertEqual(self.service.get_current_weather(), FRESH_VALUE)
+
+        fetch_current_weather.assert_not_called()
+
+    def test_negative_entry_never_becomes_stale(self):
+        self.assertFalse(is_stale(make_missing_entry("Город не найден.", -1)))
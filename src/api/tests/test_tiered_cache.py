@@ -0,0 +1,51 @@
+import asyncio
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from api.caching.tiered import TieredCache
+
+REDIS_LATENCY = 0.2
+
+
+def slow(value):
+    def call(*args, **kwargs):
+        time.sleep(REDIS_LATENCY)
+        return value
+
+    return call
+
+
+class TieredCacheAsyncTests(SimpleTestCase):
+    """
+    Асинхронные запросы к Redis из разных корутин выполняются параллельно, а не по одному
+    в общем синхронном потоке.
+    """
+
+    def setUp(self):
+        self.remote = mock.Mock()
+        self.cache = TieredCache(self.remote, alias="default", max_size=0, timeout=1, channel="test")
+
+    async def gather(self, calls):
+        started = time.monotonic()
+        results = await asyncio.gather(*calls)
+        return results, time.monotonic() - started
+
+    async def test_aget_runs_concurrently(self):
+        self.remote.get.side_effect = slow({"temperature": 1.0})
+
+        results, elapsed = await self.gather(self.cache.aget(f"key-{i}") for i in range(5))
+
+        self.assertEqual(results, [{"temperature": 1.0}] * 5)
+        self.assertLess(elapsed, REDIS_LATENCY * 3)
+
+    async def test_aget_many_and_aset_run_concurrently(self):
+        self.remote.get_many.side_effect = slow({})
+        self.remote.set.side_effect = slow(None)
+
+        calls = [self.cache.aget_many([f"key-{i}"]) for i in range(3)]
+        calls += [self.cache.aset(f"key-{i}", i) for i in range(3)]
+        _, elapsed = await self.gather(calls)
+
+        self.assertLess(elapsed, REDIS_LATENCY * 3)
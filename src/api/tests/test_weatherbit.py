@@ -0,0 +1,151 @@
+import asyncio
+import json
+from unittest import mock
+
+import httpx
+import requests
+from django.test import SimpleTestCase
+
+from api.weather_provider import weatherbit
+from api.weather_provider.exceptions import NotFoundError, UpstreamUnavailableError
+from api.weather_provider.guard import CircuitBreaker
+
+CURRENT_WEATHER = {"data": [{"temp": 12.5, "ob_time": "2024-01-01 10:00"}]}
+
+
+def sync_response(status: int) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(CURRENT_WEATHER).encode()
+    return response
+
+
+class RetryBudgetTests(SimpleTestCase):
+    """
+    Каждая попытка запроса к Weatherbit, включая повторы, списывается с бюджета запросов.
+
+    WEATHERBIT_MAX_RETRIES=2 и WEATHERBIT_RETRY_BACKOFF=0 задает project.settings_test.
+    """
+
+    def setUp(self):
+        patcher = mock.patch.object(weatherbit.budget, "acquire")
+        self.acquire = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_session_does_not_retry_statuses(self):
+        adapter = weatherbit._create_session().get_adapter("https://api.weatherbit.io")
+        self.assertEqual(adapter.max_retries.total, 0)
+
+    def test_sync_retry_charges_budget(self):
+        session = mock.Mock()
+        session.get.side_effect = [sync_response(503), sync_response(429), sync_response(200)]
+        with mock.patch.object(weatherbit, "get_session", return_value=session):
+            result = weatherbit.fetch_current_weather({"city": "Moscow"})
+
+        self.assertEqual(result, {"temperature": 12.5, "local_time": "10:00"})
+        self.assertEqual(session.get.call_count, 3)
+        self.assertEqual(self.acquire.call_count, 3)
+
+    def test_sync_connection_error_retry_charges_budget(self):
+        session = mock.Mock()
+        session.get.side_effect = requests.ConnectionError()
+        with mock.patch.object(weatherbit, "get_session", return_value=session):
+            with self.assertRaises(UpstreamUnavailableError):
+                weatherbit.fetch_current_weather({"city": "Moscow"})
+
+        self.assertEqual(session.get.call_count, 3)
+        self.assertEqual(self.acquire.call_count, 3)
+
+    def test_sync_exhausted_budget_stops_retries(self):
+        session = mock.Mock()
+        session.get.return_value = sync_response(503)
+        self.acquire.side_effect = [None, UpstreamUnavailableError("Бюджет запросов исчерпан.")]
+        with mock.patch.object(weatherbit, "get_session", return_value=session):
+            with self.assertRaises(UpstreamUnavailableError):
+                weatherbit.fetch_current_weather({"city": "Moscow"})
+
+        self.assertEqual(session.get.call_count, 1)
+
+    async def test_async_retry_charges_budget(self):
+        statuses = iter([503, 429, 200])
+        transport = httpx.MockTransport(lambda request: httpx.Response(next(statuses), json=CURRENT_WEATHER))
+        async with httpx.AsyncClient(transport=transport) as client:
+            with mock.patch.object(weatherbit, "get_async_client", return_value=client):
+                result = await weatherbit.afetch_current_weather({"city": "Moscow"})
+
+        self.assertEqual(result, {"temperature": 12.5, "local_time": "10:00"})
+        self.assertEqual(self.acquire.call_count, 3)
+
+
+class CircuitBreakerAccountingTests(SimpleTestCase):
+    """
+    Предохранитель учитывает только ответы Weatherbit: отказ бюджета и отмена запроса
+    снимают разрешение без учета результата.
+    """
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(
+            "/current", failure_rate=0.5, min_requests=1, window=60, open_timeout=60, half_open_probes=1
+        )
+        patcher = mock.patch.dict(weatherbit.breakers, {"/current": self.breaker})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(weatherbit.budget, "acquire")
+        self.acquire = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_budget_rejection_on_retry_is_not_a_failure(self):
+        session = mock.Mock()
+        session.get.return_value = sync_response(503)
+        self.acquire.side_effect = [None, UpstreamUnavailableError("Превышен лимит запросов к внешнему API.")]
+        with mock.patch.object(weatherbit, "get_session", return_value=session):
+            with self.assertRaises(UpstreamUnavailableError):
+                weatherbit.fetch_current_weather({"city": "Moscow"})
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertFalse(self.breaker._results)
+
+    async def test_async_budget_rejection_on_retry_is_not_a_failure(self):
+        self.acquire.side_effect = [None, UpstreamUnavailableError("Превышен лимит запросов к внешнему API.")]
+        transport = httpx.MockTransport(lambda request: httpx.Response(503))
+        async with httpx.AsyncClient(transport=transport) as client:
+            with mock.patch.object(weatherbit, "get_async_client", return_value=client):
+                with self.assertRaises(UpstreamUnavailableError):
+                    await weatherbit.afetch_current_weather({"city": "Moscow"})
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertFalse(self.breaker._results)
+
+    async def test_cancelled_probe_releases_slot(self):
+        self.breaker._set_state(CircuitBreaker.HALF_OPEN)
+        started = asyncio.Event()
+
+        async def hang(*args, **kwargs):
+            started.set()
+            await asyncio.sleep(60)
+
+        client = mock.Mock(get=hang)
+        with mock.patch.object(weatherbit, "get_async_client", return_value=client):
+            task = asyncio.ensure_future(weatherbit.afetch_current_weather({"city": "Moscow"}))
+            await started.wait()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual(self.breaker._probes_in_flight, 0)
+        # Следующий пробный запрос пропускается
+        self.breaker.before_request()
+
+
+class StatusTests(SimpleTestCase):
+    def test_no_content_is_not_found(self):
+        with self.assertRaises(NotFoundError):
+            weatherbit._check_status(sync_response(204))
+
+    def test_bad_request_is_not_cacheable_not_found(self):
+        # 400 — ошибка запроса (ключ, параметры), а не отсутствие города: ее нельзя кешировать
+        with self.assertRaises(ValueError) as raised:
+            weatherbit._check_status(sync_response(400))
+
+        self.assertNotIsInstance(raised.exception, NotFoundError)
@@ -1,8 +1,37 @@
 from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
 
-from .views import CurrentWeatherView, ForecastWeatherView
+from project import settings
+
+from .views import (
+    AsyncCurrentWeatherBatchView,
+    AsyncCurrentWeatherView,
+    AsyncForecastWeatherView,
+    CitySearchView,
+    CurrentWeatherBatchView,
+    CurrentWeatherStreamView,
+    CurrentWeatherView,
+    ForecastOverrideBulkView,
+    ForecastRangeWeatherView,
+    ForecastWeatherView,
+)
+
+if settings.WEATHER_API_ASYNC:
+    current_weather_view = AsyncCurrentWeatherView.as_view()
+    # DRF отключает CSRF для APIView, асинхронные POST-представления ведут себя так же
+    current_weather_batch_view = csrf_exempt(AsyncCurrentWeatherBatchView.as_view())
+    forecast_weather_view = csrf_exempt(AsyncForecastWeatherView.as_view())
+else:
+    current_weather_view = CurrentWeatherView.as_view()
+    current_weather_batch_view = CurrentWeatherBatchView.as_view()
+    forecast_weather_view = ForecastWeatherView.as_view()
 
 urlpatterns = [
-    path("weather/current", CurrentWeatherView.as_view(), name="current-weather"),
-    path("weather/forecast", ForecastWeatherView.as_view(), name="forecast-weather"),
+    path("weather/current", current_weather_view, name="current-weather"),
+    path("weather/current/batch", current_weather_batch_view, name="current-weather-batch"),
+    path("weather/current/stream", CurrentWeatherStreamView.as_view(), name="current-weather-stream"),
+    path("weather/forecast", forecast_weather_view, name="forecast-weather"),
+    path("weather/forecast/bulk", ForecastOverrideBulkView.as_view(), name="forecast-override-bulk"),
+    path("weather/forecast/range", ForecastRangeWeatherView.as_view(), name="forecast-weather-range"),
+    path("cities/search", CitySearchView.as_view(), name="city-search"),
 ]
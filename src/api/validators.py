@@ -3,6 +3,9 @@ from datetime import date, timedelta
 
 from rest_framework import serializers
 
+from api.geo import GEO_KEY_PREFIX
+from api.normalization import normalize_city_name
+
 logger = logging.getLogger(__name__)
 
 
@@ -44,3 +47,63 @@ def validate_temperatures(min_temp: float | None, max_temp: float | None) -> Non
     if min_temp is not None and max_temp is not None and min_temp > max_temp:
         logger.error(f"Некорректные значения температуры: min={min_temp}, max={max_temp}")
         raise serializers.ValidationError("Минимальная температура не может быть выше максимальной.")
+
+
+def validate_forecast_range(date_from: date, date_to: date) -> None:
+    """
+    Проверяет, что начало диапазона дат прогноза не позже его конца.
+    Каждая из дат отдельно проверяется validate_forecast_date.
+
+    Args:
+        date_from (date): Первая дата диапазона
+        date_to (date): Последняя дата диапазона
+
+    Raises:
+        serializers.ValidationError: Если первая дата позже последней
+    """
+    if date_from > date_to:
+        logger.warning(f"Некорректный диапазон дат прогноза: {date_from} > {date_to}")
+        raise serializers.ValidationError("Дата начала диапазона не может быть позже даты окончания.")
+
+
+def validate_city_name(value: str) -> str:
+    """
+    Проверяет, что название города не имеет вид ключа ячейки geohash ("geo:<geohash>").
+
+    Такие ключи зарезервированы за запросами по координатам: город с таким названием
+    делил бы с ячейкой записи кеша и переопределения.
+
+    Args:
+        value (str): Название города
+
+    Returns:
+        str: Название города, если проверка прошла успешно
+
+    Raises:
+        serializers.ValidationError: Если название совпадает по виду с ключом ячейки
+    """
+    if normalize_city_name(value).startswith(GEO_KEY_PREFIX):
+        logger.warning(f"Название города в виде ключа ячейки: {value}")
+        raise serializers.ValidationError("Некорректное название города. Для координат используйте lat и lon.")
+    return value
+
+
+def validate_location(city: str | None, lat: float | None, lon: float | None) -> None:
+    """
+    Проверяет, что место запроса задано ровно одним способом: названием города или парой координат.
+
+    Args:
+        city (str | None): Название города
+        lat (float | None): Широта
+        lon (float | None): Долгота
+
+    Raises:
+        serializers.ValidationError: Если не указано ни одно, указаны оба или только одна из координат
+    """
+    has_coordinates = lat is not None or lon is not None
+    if city and has_coordinates:
+        logger.warning(f"Указаны и город, и координаты: city={city}, lat={lat}, lon={lon}")
+        raise serializers.ValidationError("Укажите либо city, либо lat и lon.")
+    if not city and (lat is None or lon is None):
+        logger.warning(f"Не указано место запроса: city={city}, lat={lat}, lon={lon}")
+        raise serializers.ValidationError("Укажите city или обе координаты lat и lon.")
@@ -1,21 +1,48 @@
+import json
 import logging
+from itertools import chain
 
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.http import parse_header_parameters
+from django.views import View
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from api.caching.entries import entry_value
+from api.cities import city_index
+from api.importers import CONTENT_TYPE_FORMATS, import_forecast_overrides, read_rows
 from api.services import WeatherService
+from project import settings
 from utils.decorators import external_api_error_handler
+from utils.http_cache import cache_headers, not_modified
+from utils.metrics import LIVE_EVENTS, observe_phase
+from utils.sse import HEARTBEAT, sse_event, sse_retry
 
 from .serializers import (
+    CitySearchSerializer,
+    CurrentWeatherBatchSerializer,
     CurrentWeatherGetSerializer,
+    CurrentWeatherStreamSerializer,
     ForecastGetSerializer,
     ForecastOverrideSerializer,
+    ForecastRangeGetSerializer,
 )
 
 logger = logging.getLogger(__name__)
 
 
+def _json_response(data, **kwargs) -> JsonResponse:
+    """
+    JsonResponse для асинхронных представлений с замером сериализации (фаза serialize),
+    как у рендереров DRF в синхронных.
+    """
+    with observe_phase("serialize"):
+        return JsonResponse(data, **kwargs)
+
+
 class CurrentWeatherView(APIView):
     """
     Представление для получения текущей погоды в городе.
@@ -30,6 +57,7 @@ class CurrentWeatherView(APIView):
 
         Query-параметры:
             city (str): Название города на английском языке
+            lat (float), lon (float): Координаты вместо city (привязываются к ячейке geohash)
 
         Returns:
             Response: JSON с текущей температурой и локальным временем
@@ -39,8 +67,10 @@ class CurrentWeatherView(APIView):
             }
 
         Status codes:
-            200: Успешный ответ
+            200: Успешный ответ (с заголовками ETag и Cache-Control: max-age по остатку срока жизни в кеше)
+            304: Данные не изменились (If-None-Match совпал с ETag)
             400: Ошибка валидации параметров
+            404: Город или прогноз на дату не найден
             503: Ошибка внешнего API
         """
         serializer = CurrentWeatherGetSerializer(data=request.query_params)
@@ -48,11 +78,52 @@ class CurrentWeatherView(APIView):
             logger.warning(f"CurrentWeatherView: Ошибка валидации параметров: {serializer.errors}")
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        city = serializer.validated_data["city"]
-        service = WeatherService(city)
-        data = service.get_current_weather()
+        service = WeatherService.from_query(serializer.validated_data)
+        entry = service.get_current_weather_entry()
+        data = entry_value(entry)
+
+        headers = cache_headers(entry)
+        response = not_modified(request, headers)
+        if response:
+            return response
+        return Response(data, status=status.HTTP_200_OK, headers=headers)
 
-        return Response(data, status=status.HTTP_200_OK)
+
+class CurrentWeatherBatchView(APIView):
+    """
+    Представление для получения текущей погоды сразу по нескольким городам.
+
+    Ошибки возвращаются отдельно по каждому городу и не превращают весь ответ в 503.
+    """
+
+    def post(self, request):
+        """
+        POST /api/weather/current/batch
+
+        Body (JSON):
+            {
+                "cities": [str, ...]  # Названия городов на английском языке
+            }
+
+        Returns:
+            Response: JSON с результатами и ошибками по городам
+            {
+                "results": {город: {"temperature": float, "local_time": str}},
+                "errors": {город: str}
+            }
+
+        Status codes:
+            200: Успешный ответ (в том числе при ошибках по отдельным городам)
+            400: Ошибка валидации данных
+        """
+        serializer = CurrentWeatherBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            logger.warning(f"CurrentWeatherBatchView: Ошибка валидации: {serializer.errors}")
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        results, errors = WeatherService.get_current_weather_batch(serializer.validated_data["cities"])
+
+        return Response({"results": results, "errors": errors}, status=status.HTTP_200_OK)
 
 
 class ForecastWeatherView(APIView):
@@ -71,6 +142,7 @@ class ForecastWeatherView(APIView):
 
         Query-параметры:
             city (str): Название города на английском языке
+            lat (float), lon (float): Координаты вместо city (привязываются к ячейке geohash)
             date (str): Дата в формате dd.MM.yyyy
 
         Returns:
@@ -81,8 +153,10 @@ class ForecastWeatherView(APIView):
             }
 
         Status codes:
-            200: Успешный ответ
+            200: Успешный ответ (с заголовками ETag и Cache-Control: max-age по остатку срока жизни в кеше)
+            304: Данные не изменились (If-None-Match совпал с ETag)
             400: Ошибка валидации параметров
+            404: Город или прогноз на дату не найден
             503: Ошибка внешнего API
         """
         serializer = ForecastGetSerializer(data=request.query_params)
@@ -90,13 +164,17 @@ class ForecastWeatherView(APIView):
             logger.warning(f"ForecastWeatherView GET: Ошибка валидации: {serializer.errors}")
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        city = serializer.validated_data["city"]
         date = serializer.validated_data["date"]
 
-        service = WeatherService(city)
-        data = service.get_forecast_for_date(date)
+        service = WeatherService.from_query(serializer.validated_data)
+        entry = service.get_forecast_entry(date)
+        data = entry_value(entry)
 
-        return Response(data, status=status.HTTP_200_OK)
+        headers = cache_headers(entry)
+        response = not_modified(request, headers)
+        if response:
+            return response
+        return Response(data, status=status.HTTP_200_OK, headers=headers)
 
     @external_api_error_handler
     def post(self, request):
@@ -133,3 +211,297 @@ class ForecastWeatherView(APIView):
 
         logger.info(f"ForecastWeatherView POST: Обновлен прогноз для '{city}' на '{override.date}', кеш очищен.")
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ForecastOverrideBulkView(APIView):
+    """
+    Представление для массовой загрузки переопределений прогноза.
+
+    Тело запроса читается потоково и записывается пачками.
+    """
+
+    def post(self, request):
+        """
+        POST /api/weather/forecast/bulk
+
+        Body (text/csv):
+            city,date,min_temperature,max_temperature
+            Moscow,20.06.2025,12.5,20.1
+
+        Body (application/x-ndjson):
+            {"city": "Moscow", "date": "20.06.2025", "min_temperature": 12.5, "max_temperature": 20.1}
+
+        Каждая строка проверяется по тем же правилам, что и в POST /api/weather/forecast.
+
+        Returns:
+            Response: JSON с итогами загрузки
+            {
+                "imported": int,      # Записано переопределений
+                "batches": int,       # Выполнено пачек
+                "error_count": int,   # Строк с ошибками
+                "errors": list[dict]  # Ошибки по номерам строк
+            }
+
+        Status codes:
+            200: Загрузка выполнена (в том числе при ошибках в отдельных строках)
+            400: Пустое тело запроса
+            415: Неподдерживаемый Content-Type
+        """
+        # Параметры Content-Type (например, charset) на формат не влияют
+        media_type, _ = parse_header_parameters(request.content_type)
+        import_format = CONTENT_TYPE_FORMATS.get(media_type)
+        if import_format is None:
+            return Response(
+                {"error": f"Поддерживаются Content-Type: {', '.join(CONTENT_TYPE_FORMATS)}."},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+
+        # request.stream в DRF равен None без Content-Length (chunked-загрузка),
+        # поэтому тело читается из HttpRequest Django: под ASGI он читает его и без длины
+        lines = iter(request._request)
+        first_line = next(lines, None)
+        if first_line is None:
+            return Response({"error": "Тело запроса пустое."}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = import_forecast_overrides(read_rows(chain([first_line], lines), import_format))
+
+        logger.info(f"ForecastOverrideBulkView POST: записано {result['imported']} переопределений, кеш очищен.")
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class ForecastRangeWeatherView(APIView):
+    """
+    Представление для получения прогноза погоды на диапазон дат одним запросом.
+    """
+
+    @external_api_error_handler
+    def get(self, request):
+        """
+        GET /api/weather/forecast/range
+
+        Query-параметры:
+            city (str): Название города на английском языке
+            lat (float), lon (float): Координаты вместо city (привязываются к ячейке geohash)
+            from (str): Первая дата диапазона в формате dd.MM.yyyy
+            to (str): Последняя дата диапазона в формате dd.MM.yyyy
+
+        Returns:
+            Response: JSON с прогнозом на каждый день диапазона
+            {
+                "city": str,               # Или "lat" и "lon" — как в запросе
+                "forecast": [
+                    {
+                        "date": str,               # Дата в формате YYYY-MM-DD
+                        "min_temperature": float,  # Минимальная температура
+                        "max_temperature": float   # Максимальная температура
+                    },
+                    ...
+                ]
+            }
+
+        Status codes:
+            200: Успешный ответ
+            400: Ошибка валидации параметров
+            404: Город или прогноз на дату не найден
+            503: Ошибка внешнего API
+        """
+        serializer = ForecastRangeGetSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            logger.warning(f"ForecastRangeWeatherView GET: Ошибка валидации: {serializer.errors}")
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        location = {
+            name: serializer.validated_data[name]
+            for name in ("city", "lat", "lon")
+            if name in serializer.validated_data
+        }
+        service = WeatherService.from_query(location)
+        forecast = service.get_forecast_range(serializer.validated_data["from"], serializer.validated_data["to"])
+
+        return Response({**location, "forecast": forecast}, status=status.HTTP_200_OK)
+
+
+class CitySearchView(APIView):
+    """
+    Представление для поиска городов по началу названия в локальном справочнике.
+    """
+
+    def get(self, request):
+        """
+        GET /api/cities/search
+
+        Query-параметры:
+            q (str): Начало названия или псевдонима города в произвольной записи
+            limit (int): Максимум городов в ответе (по умолчанию 10)
+
+        Returns:
+            Response: JSON со списком найденных городов
+            [
+                {
+                    "key": str,      # Канонический ключ города
+                    "name": str,     # Название города
+                    "country": str   # Код страны ISO 3166-1 alpha-2 (может быть пустым)
+                },
+                ...
+            ]
+
+        Status codes:
+            200: Успешный ответ
+            400: Ошибка валидации параметров
+        """
+        serializer = CitySearchSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            logger.warning(f"CitySearchView: Ошибка валидации параметров: {serializer.errors}")
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        cities = city_index.search(serializer.validated_data["q"], serializer.validated_data["limit"])
+        return Response([city._asdict() for city in cities], status=status.HTTP_200_OK)
+
+
+class AsyncCurrentWeatherView(View):
+    """
+    Асинхронная версия CurrentWeatherView для ASGI (включается настройкой WEATHER_API_ASYNC).
+
+    Не блокирует поток на время запроса к внешнему API.
+    """
+
+    @external_api_error_handler
+    async def get(self, request):
+        """
+        GET /api/weather/current
+
+        Параметры и ответы совпадают с CurrentWeatherView.get.
+        """
+        serializer = CurrentWeatherGetSerializer(data=request.GET)
+        if not serializer.is_valid():
+            logger.warning(f"AsyncCurrentWeatherView: Ошибка валидации параметров: {serializer.errors}")
+            return _json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        service = WeatherService.from_query(serializer.validated_data)
+        entry = await service.aget_current_weather_entry()
+        data = entry_value(entry)
+
+        headers = cache_headers(entry)
+        response = not_modified(request, headers)
+        if response:
+            return response
+        return _json_response(data, status=status.HTTP_200_OK, headers=headers)
+
+
+class AsyncCurrentWeatherBatchView(View):
+    """
+    Асинхронная версия CurrentWeatherBatchView для ASGI (включается настройкой WEATHER_API_ASYNC).
+    """
+
+    async def post(self, request):
+        """
+        POST /api/weather/current/batch
+
+        Тело запроса и ответы совпадают с CurrentWeatherBatchView.post.
+        """
+        try:
+            payload = json.loads(request.body)
+        except ValueError:
+            return _json_response({"error": "Некорректный JSON."}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = CurrentWeatherBatchSerializer(data=payload)
+        if not serializer.is_valid():
+            logger.warning(f"AsyncCurrentWeatherBatchView: Ошибка валидации: {serializer.errors}")
+            return _json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        results, errors = await WeatherService.aget_current_weather_batch(serializer.validated_data["cities"])
+
+        return _json_response({"results": results, "errors": errors}, status=status.HTTP_200_OK)
+
+
+class AsyncForecastWeatherView(View):
+    """
+    Асинхронная версия ForecastWeatherView для ASGI (включается настройкой WEATHER_API_ASYNC).
+
+    GET выполняется асинхронно, POST передается синхронному ForecastWeatherView.
+    """
+
+    @external_api_error_handler
+    async def get(self, request):
+        """
+        GET /api/weather/forecast
+
+        Параметры и ответы совпадают с ForecastWeatherView.get.
+        """
+        serializer = ForecastGetSerializer(data=request.GET)
+        if not serializer.is_valid():
+            logger.warning(f"AsyncForecastWeatherView GET: Ошибка валидации: {serializer.errors}")
+            return _json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        date = serializer.validated_data["date"]
+
+        service = WeatherService.from_query(serializer.validated_data)
+        entry = await service.aget_forecast_entry(date)
+        data = entry_value(entry)
+
+        headers = cache_headers(entry)
+        response = not_modified(request, headers)
+        if response:
+            return response
+        return _json_response(data, status=status.HTTP_200_OK, headers=headers)
+
+    async def post(self, request):
+        """
+        POST /api/weather/forecast
+
+        Переопределение прогноза — редкая операция записи, поэтому выполняется синхронным DRF-представлением.
+        """
+        return await sync_to_async(ForecastWeatherView.as_view())(request)
+
+
+class CurrentWeatherStreamView(View):
+    """
+    Поток обновлений текущей погоды по городам в формате Server-Sent Events.
+
+    Заменяет периодический опрос GET /api/weather/current одним долгим соединением.
+    Работает только в ASGI (uvicorn): в WSGI соединение занимало бы поток воркера.
+    """
+
+    async def get(self, request):
+        """
+        GET /api/weather/current/stream?city=Moscow&city=Amsterdam
+
+        Заголовок Last-Event-ID (или параметр last_event_id) — ID последнего полученного
+        события: после переподключения клиент получит пропущенные обновления.
+
+        Returns:
+            200: text/event-stream с событиями:
+                current — {"city": str, "temperature": float, "local_time": str}, с ID события
+                    (текущее состояние при подключении отдается без ID);
+                error — {"city": str, "error": str}, если погоду по городу получить не удалось
+            400: Ошибка валидации параметров
+            501: Сервис запущен не в ASGI
+        """
+        if not isinstance(request, ASGIRequest):
+            return _json_response(
+                {"error": "Поток обновлений доступен только в ASGI-режиме."}, status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        serializer = CurrentWeatherStreamSerializer(data={"city": request.GET.getlist("city")})
+        if not serializer.is_valid():
+            logger.warning(f"CurrentWeatherStreamView: Ошибка валидации параметров: {serializer.errors}")
+            return _json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+        events = WeatherService.astream_current_weather(serializer.validated_data["city"], last_event_id)
+        response = StreamingHttpResponse(self._format(events), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # nginx не буферизует ответ, события уходят клиенту сразу
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    @staticmethod
+    async def _format(events):
+        yield sse_retry(settings.LIVE_RETRY)
+        async for event in events:
+            if event is None:
+                yield HEARTBEAT
+            elif "error" in event:
+                yield sse_event(event, event="error")
+            else:
+                LIVE_EVENTS.labels("sent").inc()
+                yield sse_event({"city": event["city"], **event["data"]}, event="current", event_id=event["id"])
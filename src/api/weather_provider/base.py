@@ -0,0 +1,46 @@
+from abc import ABC, abstractmethod
+
+from asgiref.sync import sync_to_async
+
+
+class WeatherProvider(ABC):
+    """
+    Поставщик погодных данных.
+
+    Место передается в общем для всех поставщиков виде: {"city": название,
+    "country": код страны (необязательно)} или {"lat": широта, "lon": долгота}.
+    Ответы приводятся к одному виду:
+    - текущая погода: {"temperature": float, "local_time": "HH:MM"};
+    - прогноз: {дата в формате YYYY-MM-DD: {"min_temperature": float, "max_temperature": float}}.
+
+    Ошибки: NotFoundError — места нет (можно кешировать), UpstreamUnavailableError —
+    временный сбой, ValueError — прочие ошибки поставщика.
+
+    Поставщик обязан реализовать синхронные методы. Асинхронные по умолчанию выполняют
+    синхронные в пуле потоков; поставщики с асинхронным HTTP-клиентом их переопределяют.
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name (str): Имя поставщика из WEATHER_PROVIDERS (метки метрик, логи)
+        """
+        self.name = name
+
+    @abstractmethod
+    def fetch_current_weather(self, location: dict) -> dict:
+        """
+        Возвращает текущую погоду в месте location.
+        """
+
+    async def afetch_current_weather(self, location: dict) -> dict:
+        return await sync_to_async(self.fetch_current_weather, thread_sensitive=False)(location)
+
+    @abstractmethod
+    def fetch_forecast_window(self, location: dict) -> dict[str, dict]:
+        """
+        Возвращает прогноз на все дни, которые отдает поставщик, в месте location.
+        """
+
+    async def afetch_forecast_window(self, location: dict) -> dict[str, dict]:
+        return await sync_to_async(self.fetch_forecast_window, thread_sensitive=False)(location)
@@ -0,0 +1,16 @@
+class UpstreamUnavailableError(ValueError):
+    """
+    Внешний API временно недоступен: сбой соединения, 429/5xx, открыт предохранитель
+    или исчерпан бюджет запросов.
+
+    Наследуется от ValueError, поэтому обрабатывается external_api_error_handler как 503.
+    """
+
+
+class NotFoundError(ValueError):
+    """
+    Внешний API ответил, что города нет или прогноза на дату нет.
+
+    В отличие от UpstreamUnavailableError, результат не зависит от состояния API,
+    поэтому его можно кешировать (негативное кеширование).
+    """
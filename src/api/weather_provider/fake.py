@@ -0,0 +1,92 @@
+import asyncio
+import random
+import time
+import zlib
+from datetime import date, datetime, timedelta, timezone
+
+from api.weather_provider.base import WeatherProvider
+from api.weather_provider.exceptions import NotFoundError, UpstreamUnavailableError
+
+FORECAST_DAYS = 16
+
+
+class FakeProvider(WeatherProvider):
+    """
+    Локальный поставщик без сети для разработки, нагрузочных тестов и проверки дублирования запросов.
+
+    Данные детерминированы по месту. Задержка каждого ответа — latency ± jitter секунд,
+    а с вероятностью slow_rate — slow_latency (искусственный хвост задержек). С вероятностью
+    error_rate запрос завершается UpstreamUnavailableError. Города из not_found не найдены.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 1.0,
+        error_rate: float = 0.0,
+        not_found: tuple = (),
+        seed: int | None = None,
+    ):
+        super().__init__(name)
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.not_found = {city.casefold() for city in not_found}
+        self._random = random.Random(seed)
+
+    def fetch_current_weather(self, location: dict) -> dict:
+        delay, failed = self._draw()
+        time.sleep(delay)
+        return self._current_weather(location, failed)
+
+    async def afetch_current_weather(self, location: dict) -> dict:
+        delay, failed = self._draw()
+        await asyncio.sleep(delay)
+        return self._current_weather(location, failed)
+
+    def fetch_forecast_window(self, location: dict) -> dict[str, dict]:
+        delay, failed = self._draw()
+        time.sleep(delay)
+        return self._forecast_window(location, failed)
+
+    async def afetch_forecast_window(self, location: dict) -> dict[str, dict]:
+        delay, failed = self._draw()
+        await asyncio.sleep(delay)
+        return self._forecast_window(location, failed)
+
+    def _draw(self) -> tuple[float, bool]:
+        if self._random.random() < self.slow_rate:
+            delay = self.slow_latency
+        else:
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        return max(0.0, delay), self._random.random() < self.error_rate
+
+    def _base_temperature(self, location: dict, failed: bool) -> float:
+        if failed:
+            raise UpstreamUnavailableError(f"Поставщик {self.name} временно недоступен.")
+        if str(location.get("city", "")).casefold() in self.not_found:
+            raise NotFoundError("Город не найден.")
+        key = "|".join(f"{name}={location[name]}" for name in sorted(location))
+        return zlib.crc32(key.encode()) % 400 / 10 - 10
+
+    def _current_weather(self, location: dict, failed: bool) -> dict:
+        return {
+            "temperature": self._base_temperature(location, failed),
+            "local_time": datetime.now(timezone.utc).strftime("%H:%M"),
+        }
+
+    def _forecast_window(self, location: dict, failed: bool) -> dict[str, dict]:
+        base = self._base_temperature(location, failed)
+        today = date.today()
+        return {
+            (today + timedelta(days=offset)).isoformat(): {
+                "min_temperature": round(base - 5 + offset % 3, 1),
+                "max_temperature": round(base + 5 + offset % 3, 1),
+            }
+            for offset in range(FORECAST_DAYS)
+        }
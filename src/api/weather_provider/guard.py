@@ -0,0 +1,242 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from django_redis import get_redis_connection
+
+from api.weather_provider.exceptions import UpstreamUnavailableError
+from utils.metrics import CIRCUIT_STATE, UPSTREAM_BUDGET_REMAINING, UPSTREAM_REJECTED
+
+logger = logging.getLogger(__name__)
+
+# Атомарно пополняет корзину токенов по времени сервера Redis и списывает токен и единицу дневной квоты.
+# Возвращает {разрешено, сколько ждать токена (с), осталось токенов, осталось дневной квоты}.
+BUDGET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local daily_quota = tonumber(ARGV[3])
+local daily_used = tonumber(redis.call('GET', KEYS[2]) or '0')
+local daily_left = -1
+if daily_quota > 0 then
+    daily_left = daily_quota - daily_used
+    if daily_left <= 0 then
+        return {0, '-1', '0', '0'}
+    end
+end
+
+local tokens = burst
+if rate > 0 then
+    local now = redis.call('TIME')
+    now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    if state[1] then
+        tokens = math.min(burst, tonumber(state[1]) + math.max(0, now - tonumber(state[2])) * rate)
+    end
+    if tokens < 1 then
+        return {0, tostring((1 - tokens) / rate), tostring(tokens), tostring(daily_left)}
+    end
+    tokens = tokens - 1
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+end
+
+if daily_quota > 0 then
+    redis.call('INCR', KEYS[2])
+    redis.call('EXPIRE', KEYS[2], 90000)
+    daily_left = daily_left - 1
+end
+return {1, '0', tostring(tokens), tostring(daily_left)}
+"""
+
+
+class UpstreamBudget:
+    """
+    Общий для всех рабочих процессов бюджет запросов к внешнему API в Redis.
+
+    Ограничивает частоту запросов корзиной токенов (per_second с запасом burst)
+    и общее число запросов за сутки UTC (daily_quota). Если токена нет, запрос
+    ждет его не дольше max_wait секунд; при исчерпании дневной квоты отклоняется сразу.
+    При недоступности Redis запросы пропускаются, чтобы бюджет не стал точкой отказа.
+    """
+
+    def __init__(self, alias: str, key: str, per_second: float, burst: int, daily_quota: int, max_wait: float):
+        """
+        Args:
+            alias (str): Алиас кеша в CACHES для подключения к Redis
+            key (str): Префикс ключей бюджета в Redis
+            per_second (float): Запросов в секунду на все процессы (0 — без ограничения)
+            burst (int): Емкость корзины токенов
+            daily_quota (int): Запросов в сутки UTC (0 — без ограничения)
+            max_wait (float): Максимальное ожидание токена в секундах
+        """
+        self.alias = alias
+        self.key = key
+        self.per_second = per_second
+        self.burst = max(1, burst)
+        self.daily_quota = daily_quota
+        self.max_wait = max_wait
+        self._script = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.per_second > 0 or self.daily_quota > 0
+
+    def try_acquire(self) -> float:
+        """
+        Пытается списать один запрос из бюджета.
+
+        Returns:
+            float: 0, если запрос разрешен, иначе время ожидания токена в секундах
+
+        Raises:
+            UpstreamUnavailableError: Если исчерпана дневная квота
+        """
+        if not self.enabled:
+            return 0.0
+        try:
+            if self._script is None:
+                self._script = get_redis_connection(self.alias).register_script(BUDGET_SCRIPT)
+            day = datetime.now(timezone.utc).date().isoformat()
+            allowed, wait, tokens, daily_left = self._script(
+                keys=[f"{self.key}:bucket", f"{self.key}:day:{day}"],
+                args=[self.per_second, self.burst, self.daily_quota],
+            )
+        except Exception as e:
+            logger.warning(f"[UpstreamBudget] Бюджет запросов недоступен, запрос пропущен без проверки: {e}")
+            return 0.0
+
+        UPSTREAM_BUDGET_REMAINING.labels("second").set(float(tokens))
+        UPSTREAM_BUDGET_REMAINING.labels("day").set(float(daily_left))
+        if float(wait) < 0:
+            UPSTREAM_REJECTED.labels("quota_exhausted").inc()
+            raise UpstreamUnavailableError("Исчерпана дневная квота запросов к внешнему API.")
+        return 0.0 if int(allowed) else float(wait)
+
+    def acquire(self) -> None:
+        """
+        Списывает один запрос из бюджета, при необходимости дожидаясь токена.
+
+        Raises:
+            UpstreamUnavailableError: Если дневная квота исчерпана или токен не появился за max_wait секунд
+        """
+        deadline = time.monotonic() + self.max_wait
+        while (wait := self.try_acquire()) > 0:
+            if time.monotonic() + wait > deadline:
+                UPSTREAM_REJECTED.labels("rate_limited").inc()
+                raise UpstreamUnavailableError("Превышен лимит запросов к внешнему API.")
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Предохранитель для запросов к внешнему API в пределах процесса.
+
+    closed — запросы проходят, результаты копятся в скользящем окне window секунд.
+    Если в окне не меньше min_requests запросов и доля ошибок не меньше failure_rate,
+    предохранитель переходит в open: запросы сразу отклоняются open_timeout секунд.
+    Затем half_open: пропускается не больше half_open_probes пробных запросов
+    одновременно; после half_open_probes успешных подряд — снова closed,
+    при любой ошибке — снова open.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float,
+        min_requests: int,
+        window: float,
+        open_timeout: float,
+        half_open_probes: int,
+    ):
+        """
+        Args:
+            name (str): Имя предохранителя (эндпоинт) для логов и метрик
+            failure_rate (float): Доля ошибок, при которой предохранитель размыкается
+            min_requests (int): Минимум запросов в окне для оценки доли ошибок
+            window (float): Длительность скользящего окна в секундах
+            open_timeout (float): Время в состоянии open до пробных запросов в секундах
+            half_open_probes (int): Число успешных пробных запросов для замыкания
+        """
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.open_timeout = open_timeout
+        self.half_open_probes = max(1, half_open_probes)
+        self.state = self.CLOSED
+        self._results = deque()
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.labels(name).set(0)
+
+    def before_request(self) -> None:
+        """
+        Проверяет, можно ли выполнить запрос.
+
+        Raises:
+            UpstreamUnavailableError: Если предохранитель разомкнут
+        """
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.open_timeout:
+                self._set_state(self.HALF_OPEN)
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return
+        UPSTREAM_REJECTED.labels("circuit_open").inc()
+        raise UpstreamUnavailableError("Внешний API временно недоступен.")
+
+    def record(self, success: bool) -> None:
+        """
+        Учитывает результат запроса, разрешенного before_request().
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if not success:
+                    self._open(now)
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._set_state(self.CLOSED)
+                return
+            if self.state == self.OPEN:
+                return
+
+            self._results.append((now, success))
+            while self._results and self._results[0][0] < now - self.window:
+                self._results.popleft()
+            failures = sum(1 for _, ok in self._results if not ok)
+            if len(self._results) >= self.min_requests and failures / len(self._results) >= self.failure_rate:
+                self._open(now)
+
+    def cancel(self) -> None:
+        """
+        Снимает разрешение before_request(), если запрос так и не был выполнен.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _open(self, now: float) -> None:
+        self._opened_at = now
+        self._set_state(self.OPEN)
+        logger.warning(f"[CircuitBreaker] {self.name}: предохранитель разомкнут на {self.open_timeout} с")
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        self._results.clear()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        CIRCUIT_STATE.labels(self.name).set(self.STATE_VALUES[state])
+        if state == self.CLOSED:
+            logger.info(f"[CircuitBreaker] {self.name}: предохранитель замкнут")
@@ -0,0 +1,292 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from api.weather_provider.base import WeatherProvider
+from api.weather_provider.exceptions import NotFoundError
+from project import settings
+from utils.latency import LatencyTracker
+from utils.metrics import PROVIDER_HEDGES, PROVIDER_REQUESTS, PROVIDER_SECONDS, PROVIDER_WINS
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ("current", "forecast")
+
+
+def create_provider(name: str) -> WeatherProvider:
+    """
+    Создает поставщика по описанию из settings.WEATHER_PROVIDERS:
+    {"BACKEND": путь к классу, "OPTIONS": аргументы конструктора}.
+
+    Raises:
+        ImproperlyConfigured: Если поставщик не описан в WEATHER_PROVIDERS
+    """
+    try:
+        config = settings.WEATHER_PROVIDERS[name]
+    except KeyError:
+        raise ImproperlyConfigured(f"Поставщик погоды {name!r} не описан в WEATHER_PROVIDERS")
+    return import_string(config["BACKEND"])(name, **config.get("OPTIONS", {}))
+
+
+class ProviderRouter:
+    """
+    Точка обращения сервиса к поставщикам погоды с дублированием медленных запросов (hedged requests).
+
+    Запрос уходит основному поставщику. Если за hedge-задержку он не ответил
+    или ответил ошибкой, тот же запрос уходит резервному, и сервис получает первый
+    ответ из двух. Ответом считаются данные и NotFoundError; если ошибкой
+    завершились оба запроса, поднимается ошибка основного поставщика.
+
+    Hedge-задержка — наблюдаемый перцентиль percentile задержки основного поставщика
+    за последние latency_window ответов (не меньше min_delay); пока ответов меньше
+    min_samples, используется default_delay. Так дублируется около (100 - percentile)%
+    запросов, а хвост задержек срезается до задержки резервного поставщика.
+
+    Проигравший запрос не отменяется: его задержка нужна для честного перцентиля,
+    а ответ Weatherbit уже оплачен бюджетом запросов.
+
+    Без резервного поставщика запрос выполняется в потоке вызывающего кода, как прямой вызов.
+    """
+
+    def __init__(
+        self,
+        primary: WeatherProvider,
+        secondary: WeatherProvider | None = None,
+        percentile: float = 95,
+        min_samples: int = 20,
+        default_delay: float = 1.0,
+        min_delay: float = 0.05,
+        workers: int = 32,
+        latency_window: int = 1000,
+    ):
+        """
+        Args:
+            primary (WeatherProvider): Основной поставщик
+            secondary (WeatherProvider | None): Резервный поставщик для дублирования (None — без дублирования)
+            percentile (float): Перцентиль задержки основного поставщика для hedge-задержки
+            min_samples (int): Минимум ответов основного поставщика для расчета перцентиля
+            default_delay (float): Hedge-задержка в секундах, пока ответов меньше min_samples
+            min_delay (float): Нижняя граница hedge-задержки в секундах
+            workers (int): Потоки процесса для синхронных запросов с дублированием
+            latency_window (int): Количество последних ответов для расчета перцентиля
+        """
+        self.primary = primary
+        self.secondary = secondary
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.workers = workers
+        self.latency = LatencyTracker("providers", window=latency_window, log_every=0)
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        # Ссылки на незавершенные асинхронные запросы-проигравшие (иначе задачу может собрать GC)
+        self._background = set()
+
+    def fetch_current_weather(self, location: dict) -> dict:
+        return self._fetch("current", location)
+
+    async def afetch_current_weather(self, location: dict) -> dict:
+        return await self._afetch("current", location)
+
+    def fetch_forecast_window(self, location: dict) -> dict[str, dict]:
+        return self._fetch("forecast", location)
+
+    async def afetch_forecast_window(self, location: dict) -> dict[str, dict]:
+        return await self._afetch("forecast", location)
+
+    def hedge_delay(self, operation: str) -> float:
+        """
+        Возвращает текущую hedge-задержку основного поставщика в секундах.
+        """
+        endpoint = self._endpoint(self.primary, operation)
+        if self.latency.count(endpoint) < self.min_samples:
+            return self.default_delay
+        return max(self.min_delay, self.latency.percentile(endpoint, self.percentile))
+
+    def stats(self) -> dict:
+        """
+        Статистика поставщиков в текущем процессе: запросы, доля ошибок, доля побед
+        и перцентили задержки по операциям.
+
+        Returns:
+            dict: {поставщик: {операция: {...}}}
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        stats = {}
+        for provider in filter(None, (self.primary, self.secondary)):
+            for operation in OPERATIONS:
+                endpoint = self._endpoint(provider, operation)
+                requests = counts.get((endpoint, "requests"), 0)
+                errors = counts.get((endpoint, "errors"), 0)
+                wins = counts.get((endpoint, "wins"), 0)
+                served = counts.get((operation, "served"), 0)
+                p50, p95 = (self.latency.percentile(endpoint, q) for q in (50, 95))
+                stats.setdefault(provider.name, {})[operation] = {
+                    "requests": requests,
+                    "errors": errors,
+                    "error_rate": round(errors / requests, 4) if requests else 0.0,
+                    "wins": wins,
+                    "win_rate": round(wins / served, 4) if served else 0.0,
+                    "p50": p50,
+                    "p95": p95,
+                }
+        return stats
+
+    def _fetch(self, operation: str, location: dict):
+        if self.secondary is None:
+            try:
+                result = self._invoke(self.primary, operation, location)
+            except NotFoundError:
+                self._served(self.primary, operation, hedged=False)
+                raise
+            self._served(self.primary, operation, hedged=False)
+            return result
+        executor = self._get_executor()
+        primary = executor.submit(self._invoke, self.primary, operation, location)
+        done, _ = wait([primary], timeout=self.hedge_delay(operation))
+        if done and self._answered(primary):
+            return self._win(self.primary, operation, primary, hedged=False)
+
+        PROVIDER_HEDGES.labels(operation).inc()
+        secondary = executor.submit(self._invoke, self.secondary, operation, location)
+        providers = {primary: self.primary, secondary: self.secondary}
+        pending = set(providers)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # Если оба ответили одновременно, предпочтение основному поставщику
+            for future in sorted(done, key=lambda future: future is not primary):
+                if self._answered(future):
+                    return self._win(providers[future], operation, future, hedged=True)
+        logger.warning(f"[ProviderRouter] {operation}: ошибка у {self.primary.name} и {self.secondary.name}")
+        raise primary.exception()
+
+    async def _afetch(self, operation: str, location: dict):
+        if self.secondary is None:
+            try:
+                result = await self._ainvoke(self.primary, operation, location)
+            except NotFoundError:
+                self._served(self.primary, operation, hedged=False)
+                raise
+            self._served(self.primary, operation, hedged=False)
+            return result
+        primary = asyncio.ensure_future(self._ainvoke(self.primary, operation, location))
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay(operation))
+        if done and self._answered(primary):
+            return self._win(self.primary, operation, primary, hedged=False)
+
+        PROVIDER_HEDGES.labels(operation).inc()
+        secondary = asyncio.ensure_future(self._ainvoke(self.secondary, operation, location))
+        providers = {primary: self.primary, secondary: self.secondary}
+        pending = set(providers)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=FIRST_COMPLETED)
+                for task in sorted(done, key=lambda task: task is not primary):
+                    if self._answered(task):
+                        return self._win(providers[task], operation, task, hedged=True)
+        finally:
+            for task in pending:
+                self._background.add(task)
+                task.add_done_callback(self._forget)
+        logger.warning(f"[ProviderRouter] {operation}: ошибка у {self.primary.name} и {self.secondary.name}")
+        raise primary.exception()
+
+    def _invoke(self, provider: WeatherProvider, operation: str, location: dict):
+        started = time.perf_counter()
+        try:
+            result = getattr(provider, f"fetch_{self._method(operation)}")(location)
+        except Exception as e:
+            self._observe(provider, operation, e, time.perf_counter() - started)
+            raise
+        self._observe(provider, operation, None, time.perf_counter() - started)
+        return result
+
+    async def _ainvoke(self, provider: WeatherProvider, operation: str, location: dict):
+        started = time.perf_counter()
+        try:
+            result = await getattr(provider, f"afetch_{self._method(operation)}")(location)
+        except Exception as e:
+            self._observe(provider, operation, e, time.perf_counter() - started)
+            raise
+        self._observe(provider, operation, None, time.perf_counter() - started)
+        return result
+
+    def _observe(self, provider: WeatherProvider, operation: str, error: Exception | None, seconds: float) -> None:
+        if error is None:
+            result = "ok"
+        elif isinstance(error, NotFoundError):
+            result = "not_found"
+        else:
+            result = "error"
+        endpoint = self._endpoint(provider, operation)
+        PROVIDER_REQUESTS.labels(provider.name, operation, result).inc()
+        PROVIDER_SECONDS.labels(provider.name, operation).observe(seconds)
+        with self._lock:
+            self._counts[(endpoint, "requests")] += 1
+            if result == "error":
+                self._counts[(endpoint, "errors")] += 1
+        # Быстрые ошибки (например, от разомкнутого предохранителя) занизили бы hedge-задержку
+        if result != "error":
+            self.latency.observe(endpoint, seconds)
+
+    def _win(self, provider: WeatherProvider, operation: str, future, hedged: bool):
+        self._served(provider, operation, hedged)
+        return future.result()
+
+    def _served(self, provider: WeatherProvider, operation: str, hedged: bool) -> None:
+        PROVIDER_WINS.labels(provider.name, operation, str(hedged).lower()).inc()
+        with self._lock:
+            self._counts[(self._endpoint(provider, operation), "wins")] += 1
+            self._counts[(operation, "served")] += 1
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Потоки родителя не переживают fork — после него пул создается заново
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._lock:
+                if self._executor is None or self._executor_pid != pid:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="provider")
+                    self._executor_pid = pid
+        return self._executor
+
+    def _forget(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled():
+            # Ошибка проигравшего уже учтена в метриках; извлекаем ее, чтобы asyncio не писал в лог
+            task.exception()
+
+    @staticmethod
+    def _answered(future) -> bool:
+        error = future.exception()
+        return error is None or isinstance(error, NotFoundError)
+
+    @staticmethod
+    def _endpoint(provider: WeatherProvider, operation: str) -> str:
+        return f"{provider.name}/{operation}"
+
+    @staticmethod
+    def _method(operation: str) -> str:
+        return "current_weather" if operation == "current" else "forecast_window"
+
+
+weather_providers = ProviderRouter(
+    primary=create_provider(settings.WEATHER_PROVIDER),
+    secondary=create_provider(settings.WEATHER_PROVIDER_HEDGE) if settings.WEATHER_PROVIDER_HEDGE else None,
+    percentile=settings.WEATHER_PROVIDER_HEDGE_PERCENTILE,
+    min_samples=settings.WEATHER_PROVIDER_HEDGE_MIN_SAMPLES,
+    default_delay=settings.WEATHER_PROVIDER_HEDGE_DEFAULT_DELAY,
+    min_delay=settings.WEATHER_PROVIDER_HEDGE_MIN_DELAY,
+    workers=settings.WEATHER_PROVIDER_HEDGE_WORKERS,
+    latency_window=settings.WEATHER_PROVIDER_LATENCY_WINDOW,
+)
@@ -1,35 +1,292 @@
+import asyncio
+import os
+import threading
+import time
+
+import httpx
 import requests
+from asgiref.sync import sync_to_async
+from requests.adapters import HTTPAdapter
 
+from api.weather_provider.base import WeatherProvider
+from api.weather_provider.exceptions import NotFoundError, UpstreamUnavailableError
+from api.weather_provider.guard import CircuitBreaker, UpstreamBudget
 from project import settings
+from utils.latency import LatencyTracker
+from utils.metrics import record_upstream
 
 API_KEY = settings.WEATHERBIT_API_KEY
 BASE_URL = settings.WEATHERBIT_URL
+TIMEOUT = (settings.WEATHERBIT_CONNECT_TIMEOUT, settings.WEATHERBIT_READ_TIMEOUT)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Weatherbit отвечает 204 без тела, если город не найден. 400 сюда не входит: так API отвечает
+# и на неверный ключ или параметры, а "не найдено" кешируется (отрицательное кеширование)
+NOT_FOUND_STATUSES = (204, 404)
+
+latency = LatencyTracker(
+    "Weatherbit",
+    window=settings.WEATHERBIT_LATENCY_WINDOW,
+    log_every=settings.WEATHERBIT_LATENCY_LOG_EVERY,
+)
+
+budget = UpstreamBudget(
+    alias="default",
+    key=settings.WEATHERBIT_BUDGET_KEY,
+    per_second=settings.WEATHERBIT_RATE_LIMIT_PER_SECOND,
+    burst=settings.WEATHERBIT_RATE_LIMIT_BURST,
+    daily_quota=settings.WEATHERBIT_DAILY_QUOTA,
+    max_wait=settings.WEATHERBIT_BUDGET_MAX_WAIT,
+)
+
+breakers = {
+    endpoint: CircuitBreaker(
+        endpoint,
+        failure_rate=settings.CIRCUIT_BREAKER_FAILURE_RATE,
+        min_requests=settings.CIRCUIT_BREAKER_MIN_REQUESTS,
+        window=settings.CIRCUIT_BREAKER_WINDOW,
+        open_timeout=settings.CIRCUIT_BREAKER_OPEN_TIMEOUT,
+        half_open_probes=settings.CIRCUIT_BREAKER_HALF_OPEN_PROBES,
+    )
+    for endpoint in ("/current", "/forecast/daily")
+}
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+_async_client = None
+_async_client_loop = None
+
+
+def get_session() -> requests.Session:
+    """
+    Возвращает общую для процесса HTTP-сессию с пулом keep-alive соединений.
+
+    Сессия создается заново после fork, чтобы рабочие процессы не делили сокеты родителя.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = _create_session()
+                _session_pid = pid
+    return _session
+
+
+def _create_session() -> requests.Session:
+    # Повторы выполняет _get: каждая попытка должна списываться с бюджета запросов
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.WEATHERBIT_POOL_SIZE,
+        max_retries=0,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _get(endpoint: str, params: dict) -> requests.Response:
+    """
+    Выполняет GET-запрос к Weatherbit через общую сессию с таймаутами и повторами.
+
+    Запрос проходит через предохранитель эндпоинта. При 429, 5xx и ошибках соединения
+    он повторяется с экспоненциальной задержкой; каждая попытка списывается с общего
+    бюджета запросов. Retry-After не учитывается: у 429 он может быть равен часам
+    до сброса квоты. Предохранитель учитывает только итог обращения к API: отказ
+    бюджета и прерывание запроса (в том числе отмена корутины) не считаются ошибкой.
+
+    :param endpoint: Путь эндпоинта (например, /current)
+    :param params: Query-параметры запроса
+    :return: Ответ внешнего API
+    :raises UpstreamUnavailableError: Если соединение не удалось, истек таймаут,
+        предохранитель разомкнут или исчерпан бюджет запросов
+    """
+    breaker = breakers[endpoint]
+    breaker.before_request()
+    session = get_session()
+    # Результат для предохранителя: None — ответа API нет (отказ бюджета, прерывание)
+    success = None
+    try:
+        for attempt in range(settings.WEATHERBIT_MAX_RETRIES + 1):
+            if attempt:
+                time.sleep(settings.WEATHERBIT_RETRY_BACKOFF * 2 ** (attempt - 1))
+            budget.acquire()
+            started = time.perf_counter()
+            status = "error"
+            try:
+                response = session.get(f"{BASE_URL}{endpoint}", params=params, timeout=TIMEOUT)
+                status = response.status_code
+            except requests.RequestException:
+                if attempt == settings.WEATHERBIT_MAX_RETRIES:
+                    success = False
+                    raise UpstreamUnavailableError("Внешний API недоступен или не ответил вовремя.")
+                continue
+            finally:
+                elapsed = time.perf_counter() - started
+                latency.observe(endpoint, elapsed)
+                record_upstream(endpoint, status, elapsed)
+            if response.status_code not in RETRY_STATUSES:
+                break
+        success = response.status_code not in RETRY_STATUSES
+    finally:
+        _settle(breaker, success)
+    return response
 
 
-def fetch_current_weather(city: str) -> dict:
+def _settle(breaker: CircuitBreaker, success: bool | None) -> None:
     """
-    Получает текущую погоду по указанному городу с использованием внешнего API Weatherbit.
+    Передает предохранителю итог запроса или снимает его разрешение, если ответа API нет.
 
-    :param city: Название города (строка)
+    Отказ бюджета — локальное ограничение, а не сбой API, поэтому он не размыкает предохранитель.
+    Прерванный пробный запрос (half_open) освобождает свой слот, иначе предохранитель
+    перестал бы пропускать пробные запросы.
+    """
+    if success is None:
+        breaker.cancel()
+    else:
+        breaker.record(success)
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Возвращает общий для event loop асинхронный HTTP-клиент с пулом соединений.
+
+    Соединения httpx привязаны к event loop, поэтому при смене цикла
+    (например, при запуске асинхронного кода из синхронного) создается новый клиент.
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.WEATHERBIT_READ_TIMEOUT, connect=settings.WEATHERBIT_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.WEATHERBIT_ASYNC_POOL_SIZE,
+                max_keepalive_connections=settings.WEATHERBIT_ASYNC_POOL_SIZE,
+            ),
+        )
+        _async_client_loop = loop
+    return _async_client
+
+
+async def _aget(endpoint: str, params: dict) -> httpx.Response:
+    """
+    Асинхронный аналог _get: повторяет запрос с экспоненциальной задержкой при 429, 5xx и ошибках соединения.
+
+    :param endpoint: Путь эндпоинта (например, /current)
+    :param params: Query-параметры запроса
+    :return: Ответ внешнего API
+    :raises UpstreamUnavailableError: Если соединение не удалось, истек таймаут,
+        предохранитель разомкнут или исчерпан бюджет запросов
+    """
+    breaker = breakers[endpoint]
+    breaker.before_request()
+    client = get_async_client()
+    # Результат для предохранителя: None — ответа API нет (отказ бюджета, прерывание)
+    success = None
+    try:
+        for attempt in range(settings.WEATHERBIT_MAX_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(settings.WEATHERBIT_RETRY_BACKOFF * 2 ** (attempt - 1))
+            await sync_to_async(budget.acquire, thread_sensitive=False)()
+            started = time.perf_counter()
+            status = "error"
+            try:
+                response = await client.get(f"{BASE_URL}{endpoint}", params=params)
+                status = response.status_code
+            except httpx.HTTPError:
+                if attempt == settings.WEATHERBIT_MAX_RETRIES:
+                    success = False
+                    raise UpstreamUnavailableError("Внешний API недоступен или не ответил вовремя.")
+                continue
+            finally:
+                elapsed = time.perf_counter() - started
+                latency.observe(endpoint, elapsed)
+                record_upstream(endpoint, status, elapsed)
+            if response.status_code not in RETRY_STATUSES:
+                break
+        success = response.status_code not in RETRY_STATUSES
+    finally:
+        _settle(breaker, success)
+    return response
+
+
+def fetch_current_weather(location: dict) -> dict:
+    """
+    Получает текущую погоду по указанному месту (город или координаты) с использованием внешнего API Weatherbit.
+
+    :param location: Параметры места: {"city": название, "country": код страны (необязательно)}
+        или {"lat": широта, "lon": долгота}
     :return: Словарь с температурой и локальным временем
     :raises ValueError: Если город не найден или API вернул ошибку/невалидные данные
     """
-    url = f"{BASE_URL}/current"
-    params = {
-        "city": city,
+    return _parse_current_weather(_get("/current", _params(location)))
+
+
+async def afetch_current_weather(location: dict) -> dict:
+    """
+    Асинхронная версия fetch_current_weather.
+    """
+    return _parse_current_weather(await _aget("/current", _params(location)))
+
+
+def fetch_forecast_window(location: dict) -> dict[str, dict]:
+    """
+    Получает прогноз погоды на все дни, которые отдает внешний API Weatherbit (до 16 дней).
+
+    :param location: Параметры места: {"city": название, "country": код страны (необязательно)}
+        или {"lat": широта, "lon": долгота}
+    :return: Словарь {дата в формате YYYY-MM-DD: словарь с минимальной и максимальной температурой}
+    :raises ValueError: Если город не найден или API вернул ошибку/невалидные данные
+    """
+    return _parse_forecast_window(_get("/forecast/daily", _params(location)))
+
+
+async def afetch_forecast_window(location: dict) -> dict[str, dict]:
+    """
+    Асинхронная версия fetch_forecast_window.
+    """
+    return _parse_forecast_window(await _aget("/forecast/daily", _params(location)))
+
+
+def _params(location: dict) -> dict:
+    return {
+        **location,
         "key": API_KEY,
         "units": "M",
     }
-    response = requests.get(url, params=params)
-    try:
-        response.raise_for_status()
-    except requests.HTTPError:
-        raise ValueError("Город не найден или произошла ошибка при обращении к внешнему API.")
+
+
+def _check_status(response) -> None:
+    """
+    Разделяет ошибки API на отсутствие данных (можно кешировать) и временные сбои.
+
+    :raises NotFoundError: Если город не найден
+    :raises UpstreamUnavailableError: Если API ответил 429 или 5xx
+    :raises ValueError: Если API отклонил запрос по другой причине (например, неверный ключ)
+    """
+    if response.status_code in NOT_FOUND_STATUSES:
+        raise NotFoundError("Город не найден.")
+    if response.status_code in RETRY_STATUSES or response.status_code >= 500:
+        raise UpstreamUnavailableError("Внешний API временно недоступен.")
+    if response.status_code >= 400:
+        raise ValueError("Произошла ошибка при обращении к внешнему API.")
+
+
+def _parse_current_weather(response) -> dict:
+    """
+    Разбирает ответ /current (requests или httpx).
+    """
+    _check_status(response)
 
     try:
-        data = response.json()["data"][0]
-    except (KeyError, IndexError, ValueError):
+        data = response.json()["data"]
+    except (KeyError, TypeError, ValueError):
         raise ValueError("Некорректный ответ от поставщика погоды.")
+    if not data:
+        raise NotFoundError("Город не найден.")
+    data = data[0]
 
     return {
         "temperature": data["temp"],
@@ -37,37 +294,44 @@ def fetch_current_weather(city: str) -> dict:
     }
 
 
-def fetch_forecast(city: str, date: str) -> dict:
+def _parse_forecast_window(response) -> dict[str, dict]:
     """
-    Получает прогноз погоды на указанную дату по городу с использованием внешнего API Weatherbit.
-
-    :param city: Название города (строка)
-    :param date: Дата в формате YYYY-MM-DD
-    :return: Словарь с минимальной и максимальной температурой
-    :raises ValueError: Если город или дата не найдены или API вернул ошибку/невалидные данные
+    Разбирает ответ /forecast/daily (requests или httpx).
     """
-    url = f"{BASE_URL}/forecast/daily"
-    params = {
-        "city": city,
-        "key": API_KEY,
-        "units": "M",
-    }
-    response = requests.get(url, params=params)
-    try:
-        response.raise_for_status()
-    except requests.HTTPError:
-        raise ValueError("Город не найден или произошла ошибка при обращении к внешнему API.")
+    _check_status(response)
 
     try:
         forecast_data = response.json()["data"]
-    except (KeyError, ValueError):
+    except (KeyError, TypeError, ValueError):
         raise ValueError("Некорректный ответ с прогнозом погоды.")
+    if not forecast_data:
+        raise NotFoundError("Город не найден.")
 
-    for entry in forecast_data:
-        if entry.get("datetime") == date:
-            return {
+    try:
+        return {
+            entry["datetime"]: {
                 "min_temperature": entry["min_temp"],
                 "max_temperature": entry["max_temp"],
             }
+            for entry in forecast_data
+        }
+    except (KeyError, TypeError):
+        raise ValueError("Некорректный ответ с прогнозом погоды.")
+
+
+class WeatherbitProvider(WeatherProvider):
+    """
+    Поставщик Weatherbit: функции этого модуля (сессия, предохранители, общий бюджет запросов).
+    """
+
+    def fetch_current_weather(self, location: dict) -> dict:
+        return fetch_current_weather(location)
+
+    async def afetch_current_weather(self, location: dict) -> dict:
+        return await afetch_current_weather(location)
+
+    def fetch_forecast_window(self, location: dict) -> dict[str, dict]:
+        return fetch_forecast_window(location)
 
-    raise ValueError("Прогноз на указанную дату не найден.")
+    async def afetch_forecast_window(self, location: dict) -> dict[str, dict]:
+        return await afetch_forecast_window(location)
@@ -0,0 +1,119 @@
+"""
+Конфигурация Gunicorn для продакшен-запуска.
+
+Запуск: gunicorn -c gunicorn.conf.py (из каталога src).
+
+Класс воркеров задаётся GUNICORN_WORKER_CLASS:
+    sync / gthread — WSGI-приложение project.wsgi;
+    uvicorn       — ASGI-приложение project.asgi (uvicorn_worker.UvicornWorker),
+                    имеет смысл вместе с WEATHER_API_ASYNC=True.
+"""
+
+import multiprocessing
+import os
+import shutil
+
+from environs import Env
+
+env = Env()
+
+# Адрес, на котором слушает сервер
+bind = env.str("GUNICORN_BIND", default="0.0.0.0:8000")
+
+# Класс воркеров: sync, gthread или uvicorn
+worker_class_name = env.str("GUNICORN_WORKER_CLASS", default="gthread")
+if worker_class_name not in ("sync", "gthread", "uvicorn"):
+    raise ValueError(f"Неизвестный класс воркеров Gunicorn: {worker_class_name}")
+
+if worker_class_name == "uvicorn":
+    # uvicorn.workers устарел: воркер Gunicorn вынесен в пакет uvicorn-worker
+    worker_class = "uvicorn_worker.UvicornWorker"
+    wsgi_app = "project.asgi:application"
+else:
+    worker_class = worker_class_name
+    wsgi_app = "project.wsgi:application"
+
+# Количество процессов-воркеров (по умолчанию 2 * CPU + 1)
+workers = env.int("GUNICORN_WORKERS", default=multiprocessing.cpu_count() * 2 + 1)
+
+# Количество потоков в воркере gthread (для sync и uvicorn не используется)
+threads = env.int("GUNICORN_THREADS", default=4) if worker_class_name == "gthread" else 1
+
+# Загрузка приложения в мастер-процессе до fork: воркеры стартуют быстрее и делят память
+preload_app = env.bool("GUNICORN_PRELOAD", default=True)
+
+# Перезапуск воркера после указанного числа запросов (0 — без перезапуска)
+max_requests = env.int("GUNICORN_MAX_REQUESTS", default=1000)
+
+# Случайная добавка к max_requests, чтобы воркеры не перезапускались одновременно
+max_requests_jitter = env.int("GUNICORN_MAX_REQUESTS_JITTER", default=100)
+
+# Таймаут обработки запроса воркером, секунды
+timeout = env.int("GUNICORN_TIMEOUT", default=30)
+
+# Время на завершение текущих запросов при перезапуске воркера, секунды
+graceful_timeout = env.int("GUNICORN_GRACEFUL_TIMEOUT", default=30)
+
+# Время удержания keep-alive соединения, секунды
+keepalive = env.int("GUNICORN_KEEPALIVE", default=5)
+
+# Журналы Gunicorn пишем в stdout/stderr, как и логи Django
+accesslog = "-" if env.bool("GUNICORN_ACCESS_LOG", default=False) else None
+errorlog = "-"
+loglevel = env.str("GUNICORN_LOG_LEVEL", default="info")
+
+# Каталог multiprocess-метрик Prometheus очищаем до загрузки приложения (preload_app
+# загружает его раньше хука on_starting), иначе в /metrics попадут файлы прошлых запусков
+multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if multiproc_dir:
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def pre_fork(server, worker):
+    """
+    Закрывает соединения и пул соединений PostgreSQL мастер-процесса перед fork воркера.
+
+    При preload_app приложение загружается в мастере, и project.wsgi / project.asgi читают
+    справочник городов из БД — при DB_POOL=True в мастере открывается пул соединений.
+    Его фоновые потоки не переживают fork, а сокеты соединений оказались бы общими
+    для всех процессов, поэтому пул закрывается до fork.
+    """
+    if not server.cfg.preload_app:
+        return
+
+    from django.db import connections
+
+    for alias in connections:
+        connection = connections[alias]
+        connection.close()
+        if getattr(connection, "pool", None) is not None:
+            connection.close_pool()
+
+
+def post_fork(server, worker):
+    """
+    Отбрасывает соединения с БД и пул, унаследованные от мастер-процесса при preload_app.
+
+    Пул мастера закрыт в pre_fork; если он открылся снова, воркер не закрывает его
+    (закрытие отправило бы завершение сеанса по общим с мастером сокетам), а забывает
+    и при первом запросе к БД открывает свой. HTTP-сессии, клиенты Redis и фоновые
+    потоки кеша создаются отдельно для каждого pid, поэтому их пересоздавать не нужно.
+    """
+    if not server.cfg.preload_app:
+        return
+
+    from django.db import connections
+
+    for alias in connections:
+        getattr(connections[alias], "_connection_pools", {}).pop(alias, None)
+
+
+def child_exit(server, worker):
+    """
+    Помечает завершившийся воркер в multiprocess-метриках Prometheus.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -3,6 +3,9 @@ ASGI config for project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Поток обновлений текущей погоды (GET /api/weather/current/stream, Server-Sent Events)
+обслуживается только этим приложением.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -14,3 +17,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
 
 application = get_asgi_application()
+
+# Справочник городов загружается при запуске, а не в первом запросе (модели доступны после setup)
+from api.cities import city_index  # noqa: E402
+
+city_index.load()
@@ -35,11 +35,140 @@ WEATHERBIT_API_KEY = env.str("WEATHERBIT_API_KEY")
 
 WEATHERBIT_URL = env.str("WEATHERBIT_URL")
 
+# HTTP-клиент Weatherbit: пул keep-alive соединений, таймауты (в секундах) и повторы
+WEATHERBIT_POOL_SIZE = env.int("WEATHERBIT_POOL_SIZE", default=10)
+WEATHERBIT_ASYNC_POOL_SIZE = env.int("WEATHERBIT_ASYNC_POOL_SIZE", default=100)
+WEATHERBIT_CONNECT_TIMEOUT = env.float("WEATHERBIT_CONNECT_TIMEOUT", default=3.05)
+WEATHERBIT_READ_TIMEOUT = env.float("WEATHERBIT_READ_TIMEOUT", default=5.0)
+WEATHERBIT_MAX_RETRIES = env.int("WEATHERBIT_MAX_RETRIES", default=2)
+WEATHERBIT_RETRY_BACKOFF = env.float("WEATHERBIT_RETRY_BACKOFF", default=0.3)
+WEATHERBIT_LATENCY_WINDOW = env.int("WEATHERBIT_LATENCY_WINDOW", default=1000)
+WEATHERBIT_LATENCY_LOG_EVERY = env.int("WEATHERBIT_LATENCY_LOG_EVERY", default=100)
+
+# Общий для всех процессов бюджет запросов к Weatherbit в Redis (0 — без ограничения)
+# и максимальное ожидание свободного токена в секундах
+WEATHERBIT_RATE_LIMIT_PER_SECOND = env.float("WEATHERBIT_RATE_LIMIT_PER_SECOND", default=0)
+WEATHERBIT_RATE_LIMIT_BURST = env.int("WEATHERBIT_RATE_LIMIT_BURST", default=10)
+WEATHERBIT_DAILY_QUOTA = env.int("WEATHERBIT_DAILY_QUOTA", default=0)
+WEATHERBIT_BUDGET_MAX_WAIT = env.float("WEATHERBIT_BUDGET_MAX_WAIT", default=0.5)
+WEATHERBIT_BUDGET_KEY = env.str("WEATHERBIT_BUDGET_KEY", default="weatherbit:budget")
+
+# Предохранитель Weatherbit: размыкается, когда за CIRCUIT_BREAKER_WINDOW секунд не меньше
+# CIRCUIT_BREAKER_MIN_REQUESTS запросов и доля ошибок не меньше CIRCUIT_BREAKER_FAILURE_RATE
+CIRCUIT_BREAKER_FAILURE_RATE = env.float("CIRCUIT_BREAKER_FAILURE_RATE", default=0.5)
+CIRCUIT_BREAKER_MIN_REQUESTS = env.int("CIRCUIT_BREAKER_MIN_REQUESTS", default=20)
+CIRCUIT_BREAKER_WINDOW = env.float("CIRCUIT_BREAKER_WINDOW", default=30.0)
+CIRCUIT_BREAKER_OPEN_TIMEOUT = env.float("CIRCUIT_BREAKER_OPEN_TIMEOUT", default=30.0)
+CIRCUIT_BREAKER_HALF_OPEN_PROBES = env.int("CIRCUIT_BREAKER_HALF_OPEN_PROBES", default=3)
+
+# Поставщики погоды: {имя: {"BACKEND": путь к классу, "OPTIONS": аргументы конструктора}}.
+# Локальный FakeProvider в настройки по умолчанию не входит: его описывают только в тестах и при разработке
+WEATHER_PROVIDERS = env.json(
+    "WEATHER_PROVIDERS",
+    default={
+        "weatherbit": {"BACKEND": "api.weather_provider.weatherbit.WeatherbitProvider"},
+    },
+)
+# Основной поставщик и резервный для дублирования медленных запросов (пусто — без дублирования)
+WEATHER_PROVIDER = env.str("WEATHER_PROVIDER", default="weatherbit")
+WEATHER_PROVIDER_HEDGE = env.str("WEATHER_PROVIDER_HEDGE", default="")
+# Запрос дублируется, если основной поставщик не ответил за перцентиль
+# WEATHER_PROVIDER_HEDGE_PERCENTILE своей задержки (не меньше WEATHER_PROVIDER_HEDGE_MIN_DELAY секунд);
+# пока ответов меньше WEATHER_PROVIDER_HEDGE_MIN_SAMPLES — за WEATHER_PROVIDER_HEDGE_DEFAULT_DELAY секунд
+WEATHER_PROVIDER_HEDGE_PERCENTILE = env.float("WEATHER_PROVIDER_HEDGE_PERCENTILE", default=95)
+WEATHER_PROVIDER_HEDGE_MIN_SAMPLES = env.int("WEATHER_PROVIDER_HEDGE_MIN_SAMPLES", default=20)
+WEATHER_PROVIDER_HEDGE_DEFAULT_DELAY = env.float("WEATHER_PROVIDER_HEDGE_DEFAULT_DELAY", default=1.0)
+WEATHER_PROVIDER_HEDGE_MIN_DELAY = env.float("WEATHER_PROVIDER_HEDGE_MIN_DELAY", default=0.05)
+WEATHER_PROVIDER_HEDGE_WORKERS = env.int("WEATHER_PROVIDER_HEDGE_WORKERS", default=32)
+WEATHER_PROVIDER_LATENCY_WINDOW = env.int("WEATHER_PROVIDER_LATENCY_WINDOW", default=1000)
+
 CURRENT_WEATHER_CACHE_TIMEOUT = env.int("CURRENT_WEATHER_CACHE_TIMEOUT")
 FORECAST_WEATHER_CACHE_TIMEOUT = env.int("FORECAST_WEATHER_CACHE_TIMEOUT")
+# Жесткий срок жизни записей кеша: после *_CACHE_TIMEOUT (мягкий срок) запись
+# отдается как устаревшая и обновляется в фоне, после *_CACHE_HARD_TIMEOUT удаляется
+CURRENT_WEATHER_CACHE_HARD_TIMEOUT = env.int("CURRENT_WEATHER_CACHE_HARD_TIMEOUT", default=3600)
+FORECAST_WEATHER_CACHE_HARD_TIMEOUT = env.int("FORECAST_WEATHER_CACHE_HARD_TIMEOUT", default=21600)
+BACKGROUND_REFRESH_WORKERS = env.int("BACKGROUND_REFRESH_WORKERS", default=4)
+# Время жизни негативных записей кеша ("город не найден", "нет прогноза на дату")
+NEGATIVE_CACHE_TIMEOUT = env.int("NEGATIVE_CACHE_TIMEOUT", default=300)
+
+# Single-flight: один запрос к внешнему API на ключ кеша
+SINGLE_FLIGHT_LOCK_TIMEOUT = env.int("SINGLE_FLIGHT_LOCK_TIMEOUT", default=10)
+SINGLE_FLIGHT_WAIT_TIMEOUT = env.float("SINGLE_FLIGHT_WAIT_TIMEOUT", default=5.0)
+SINGLE_FLIGHT_POLL_INTERVAL = env.float("SINGLE_FLIGHT_POLL_INTERVAL", default=0.05)
 
 REDIS_CACHE_URL = env.str("REDIS_CACHE_URL")
 
+# Локальный (в памяти процесса) уровень кеша перед Redis; LOCAL_CACHE_MAX_SIZE=0 отключает его
+LOCAL_CACHE_MAX_SIZE = env.int("LOCAL_CACHE_MAX_SIZE", default=10000)
+LOCAL_CACHE_TIMEOUT = env.float("LOCAL_CACHE_TIMEOUT", default=5.0)
+LOCAL_CACHE_INVALIDATION_CHANNEL = env.str("LOCAL_CACHE_INVALIDATION_CHANNEL", default="weather_cache:invalidate")
+
+# Асинхронные представления (ASGI) вместо синхронных DRF APIView
+WEATHER_API_ASYNC = env.bool("WEATHER_API_ASYNC", default=False)
+
+# Пакетный запрос текущей погоды: максимум городов и параллельных запросов к API
+WEATHER_BATCH_MAX_CITIES = env.int("WEATHER_BATCH_MAX_CITIES", default=500)
+WEATHER_BATCH_CONCURRENCY = env.int("WEATHER_BATCH_CONCURRENCY", default=10)
+
+# Поток обновлений текущей погоды (SSE): каналы pub/sub городов с префиксом LIVE_CHANNEL_PREFIX
+# и поток Redis LIVE_STREAM_KEY с последними LIVE_STREAM_MAXLEN событиями для возобновления по Last-Event-ID
+LIVE_UPDATES = env.bool("LIVE_UPDATES", default=True)
+LIVE_CHANNEL_PREFIX = env.str("LIVE_CHANNEL_PREFIX", default="weather:live:")
+LIVE_STREAM_KEY = env.str("LIVE_STREAM_KEY", default="weather:live_stream")
+LIVE_STREAM_MAXLEN = env.int("LIVE_STREAM_MAXLEN", default=10000)
+# Максимум городов в одном потоке и событий в очереди клиента
+LIVE_MAX_CITIES = env.int("LIVE_MAX_CITIES", default=100)
+LIVE_QUEUE_SIZE = env.int("LIVE_QUEUE_SIZE", default=1000)
+# Интервал комментариев-heartbeat и проверки свежести кеша по городам потока (секунды),
+# пауза перед переподключением клиента (миллисекунды, поле retry)
+LIVE_HEARTBEAT_INTERVAL = env.float("LIVE_HEARTBEAT_INTERVAL", default=15.0)
+LIVE_REFRESH_INTERVAL = env.float("LIVE_REFRESH_INTERVAL", default=30.0)
+LIVE_RETRY = env.int("LIVE_RETRY", default=3000)
+
+# Массовая загрузка переопределений прогноза: размер пачки и число ошибок в ответе
+OVERRIDE_IMPORT_BATCH_SIZE = env.int("OVERRIDE_IMPORT_BATCH_SIZE", default=500)
+OVERRIDE_IMPORT_MAX_ERRORS = env.int("OVERRIDE_IMPORT_MAX_ERRORS", default=100)
+
+# Справочник городов: интервал перечитывания из БД в секундах и максимум подсказок в поиске по префиксу
+CITY_INDEX_REFRESH_INTERVAL = env.float("CITY_INDEX_REFRESH_INTERVAL", default=300.0)
+CITY_SEARCH_MAX_RESULTS = env.int("CITY_SEARCH_MAX_RESULTS", default=20)
+
+# Запросы по координатам: длина geohash ячейки, к центру которой привязываются lat/lon
+# (5 — около 4.9 x 4.9 км, 6 — около 1.2 x 0.6 км); точки одной ячейки делят запись кеша
+GEOHASH_PRECISION = env.int("GEOHASH_PRECISION", default=5)
+
+# Учет частоты запросов по городам (для предзагрузки популярных городов)
+CITY_POPULARITY_KEY = env.str("CITY_POPULARITY_KEY", default="weather:city_popularity")
+CITY_POPULARITY_FLUSH_INTERVAL = env.float("CITY_POPULARITY_FLUSH_INTERVAL", default=5.0)
+
+# Индекс наличия переопределений прогноза в Redis (строится командой rebuild_override_index)
+OVERRIDE_INDEX_KEY = env.str("OVERRIDE_INDEX_KEY", default="weather:override_index")
+
+# Хранилище ответов Weatherbit в PostgreSQL (история и запасной источник, если в кеше нет записи, а API недоступен).
+# Ответы записываются фоновым потоком пачками раз в OBSERVATION_FLUSH_INTERVAL секунд
+OBSERVATION_STORE = env.bool("OBSERVATION_STORE", default=True)
+OBSERVATION_BATCH_SIZE = env.int("OBSERVATION_BATCH_SIZE", default=500)
+OBSERVATION_FLUSH_INTERVAL = env.float("OBSERVATION_FLUSH_INTERVAL", default=2.0)
+OBSERVATION_QUEUE_SIZE = env.int("OBSERVATION_QUEUE_SIZE", default=10000)
+# Максимальный возраст сохраненного ответа, который можно отдать вместо API, в секундах
+OBSERVATION_CURRENT_MAX_AGE = env.int("OBSERVATION_CURRENT_MAX_AGE", default=3 * 60 * 60)
+OBSERVATION_FORECAST_MAX_AGE = env.int("OBSERVATION_FORECAST_MAX_AGE", default=24 * 60 * 60)
+# Сколько дней хранятся секции таблицы наблюдений (команда prune_observations)
+OBSERVATION_RETENTION_DAYS = env.int("OBSERVATION_RETENTION_DAYS", default=30)
+
+# Предзагрузка (manage.py prefetch_weather): города из списка и самые запрашиваемые,
+# интервал цикла, опережение истечения и разброс запусков (в секундах),
+# параллельность и бюджет запросов к Weatherbit в минуту
+PREFETCH_CITIES = env.list("PREFETCH_CITIES", default=[])
+PREFETCH_TOP_CITIES = env.int("PREFETCH_TOP_CITIES", default=50)
+PREFETCH_INTERVAL = env.float("PREFETCH_INTERVAL", default=60.0)
+PREFETCH_LEAD_TIME = env.float("PREFETCH_LEAD_TIME", default=120.0)
+PREFETCH_JITTER = env.float("PREFETCH_JITTER", default=15.0)
+PREFETCH_CONCURRENCY = env.int("PREFETCH_CONCURRENCY", default=4)
+PREFETCH_RATE_LIMIT = env.int("PREFETCH_RATE_LIMIT", default=30)
+PREFETCH_POPULARITY_DECAY = env.float("PREFETCH_POPULARITY_DECAY", default=0.95)
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -54,6 +183,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "utils.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -63,6 +193,14 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+REST_FRAMEWORK = {
+    # JSONRenderer с замером времени сериализации для /metrics
+    "DEFAULT_RENDERER_CLASSES": [
+        "utils.renderers.TimedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
 ROOT_URLCONF = "project.urls"
 
 TEMPLATES = [
@@ -86,6 +224,16 @@ WSGI_APPLICATION = "project.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Пул соединений PostgreSQL (psycopg 3) — свой в каждом рабочем процессе: всего до
+# GUNICORN_WORKERS * DB_POOL_MAX_SIZE соединений. Ожидание свободного соединения — до DB_POOL_TIMEOUT секунд
+DB_POOL = env.bool("DB_POOL", default=True)
+DB_POOL_MIN_SIZE = env.int("DB_POOL_MIN_SIZE", default=1)
+DB_POOL_MAX_SIZE = env.int("DB_POOL_MAX_SIZE", default=4)
+DB_POOL_TIMEOUT = env.float("DB_POOL_TIMEOUT", default=5.0)
+DB_POOL_MAX_IDLE = env.float("DB_POOL_MAX_IDLE", default=300.0)
+# Без пула (DB_POOL=False) соединение переиспользуется между запросами DB_CONN_MAX_AGE секунд
+DB_CONN_MAX_AGE = env.int("DB_CONN_MAX_AGE", default=60)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -94,6 +242,20 @@ DATABASES = {
         "PASSWORD": env("POSTGRES_PASSWORD"),
         "HOST": "db",
         "PORT": 5432,
+        # Пул не совместим с постоянными соединениями Django: соединения держит пул
+        "CONN_MAX_AGE": 0 if DB_POOL else DB_CONN_MAX_AGE,
+        # Проверка соединения перед использованием (в режиме пула — при выдаче из пула)
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "pool": {
+                "min_size": DB_POOL_MIN_SIZE,
+                "max_size": DB_POOL_MAX_SIZE,
+                "timeout": DB_POOL_TIMEOUT,
+                "max_idle": DB_POOL_MAX_IDLE,
+            }
+        }
+        if DB_POOL
+        else {},
     }
 }
 
@@ -104,6 +266,10 @@ CACHES = {
         "LOCATION": env("REDIS_CACHE_URL"),
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            # Компактная сериализация значений с байтом версии (см. api.caching.serializers)
+            "SERIALIZER": "api.caching.serializers.VersionedSerializer",
+            "VALUE_FORMAT": env.str("CACHE_VALUE_FORMAT", default="msgpack"),
+            "COMPRESS_MIN_LENGTH": env.int("CACHE_COMPRESS_MIN_LENGTH", default=1024),
         },
     }
 }
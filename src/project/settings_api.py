@@ -0,0 +1,36 @@
+"""
+Профиль настроек "только API" для продакшен-запуска: DJANGO_SETTINGS_MODULE=project.settings_api.
+
+Публичному API погоды не нужны сессии, CSRF, аутентификация, сообщения и админка,
+поэтому цепочка middleware сокращена до метрик, SecurityMiddleware и CommonMiddleware,
+а DRF отдает только JSON (orjson) без разбора Accept, аутентификации и проверки прав.
+Сравнение накладных расходов с основным профилем: python -m benchmarks.overhead.
+"""
+
+from project.settings import *  # noqa: F401,F403
+from project.settings import INSTALLED_APPS
+
+# Админка требует сессий, аутентификации и сообщений — в профиле API она отключена
+INSTALLED_APPS = [
+    app
+    for app in INSTALLED_APPS
+    if app not in ("django.contrib.admin", "django.contrib.sessions", "django.contrib.messages")
+]
+
+MIDDLEWARE = [
+    "utils.middleware.MetricsMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.middleware.common.CommonMiddleware",
+]
+
+REST_FRAMEWORK = {
+    # Только JSON: без BrowsableAPIRenderer и разбора заголовка Accept
+    "DEFAULT_RENDERER_CLASSES": ["utils.renderers.FastJSONRenderer"],
+    "DEFAULT_CONTENT_NEGOTIATION_CLASS": "utils.renderers.FirstRendererNegotiation",
+    "DEFAULT_PARSER_CLASSES": ["rest_framework.parsers.JSONParser"],
+    # Публичное API без аутентификации, прав и ограничений частоты
+    "DEFAULT_AUTHENTICATION_CLASSES": [],
+    "DEFAULT_PERMISSION_CLASSES": [],
+    "DEFAULT_THROTTLE_CLASSES": [],
+    "UNAUTHENTICATED_USER": None,
+}
@@ -0,0 +1,55 @@
+"""
+Профиль настроек для тестов: python manage.py test --settings=project.settings_test (из каталога src).
+
+Redis заменен на fakeredis в памяти процесса, к Weatherbit тесты не обращаются.
+Нужен только PostgreSQL (миграции используют секционирование): адрес задается
+POSTGRES_HOST и POSTGRES_PORT, база для тестов создается и удаляется Django.
+
+Модули приложения читают настройки из project.settings при импорте, поэтому значения
+для тестов задаются переменными окружения до его загрузки.
+"""
+
+import json
+import os
+
+import fakeredis
+
+for name, value in {
+    "DJANGO_SECRET_KEY": "test-secret-key",
+    "ALLOWED_HOSTS": "*",
+    "WEATHERBIT_API_KEY": "test-key",
+    "WEATHERBIT_URL": "http://weatherbit.test",
+    "CURRENT_WEATHER_CACHE_TIMEOUT": "300",
+    "FORECAST_WEATHER_CACHE_TIMEOUT": "900",
+    "REDIS_CACHE_URL": "redis://redis.test:6379/1",
+    "POSTGRES_DB": "weather",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "",
+    # Без фоновой записи наблюдений и без задержек при недоступном API
+    "OBSERVATION_STORE": "False",
+    "WEATHERBIT_MAX_RETRIES": "2",
+    "WEATHERBIT_RETRY_BACKOFF": "0",
+    # Локальный поставщик FakeProvider доступен только в тестах и разработке
+    "WEATHER_PROVIDERS": json.dumps(
+        {
+            "weatherbit": {"BACKEND": "api.weather_provider.weatherbit.WeatherbitProvider"},
+            "fake": {"BACKEND": "api.weather_provider.fake.FakeProvider", "OPTIONS": {"latency": 0}},
+        }
+    ),
+}.items():
+    os.environ.setdefault(name, value)
+
+from project.settings import *  # noqa: E402,F401,F403
+from project.settings import CACHES, DATABASES  # noqa: E402
+
+DATABASES["default"].update(
+    HOST=os.environ.get("POSTGRES_HOST", "db"),
+    PORT=os.environ.get("POSTGRES_PORT", "5432"),
+)
+
+# Один сервер fakeredis на процесс: кеш, блокировки, pub/sub и потоки Redis
+FAKE_REDIS_SERVER = fakeredis.FakeServer()
+CACHES["default"]["OPTIONS"]["CONNECTION_POOL_KWARGS"] = {
+    "connection_class": fakeredis.FakeConnection,
+    "server": FAKE_REDIS_SERVER,
+}
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
 
 application = get_wsgi_application()
+
+# Справочник городов загружается при запуске, а не в первом запросе (модели доступны после setup)
+from api.cities import city_index  # noqa: E402
+
+city_index.load()
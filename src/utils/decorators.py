@@ -1,22 +1,46 @@
+import inspect
 import logging
 from functools import update_wrapper, wraps
 
+from django.http import JsonResponse
 from rest_framework import status
 from rest_framework.response import Response
 
+from api.weather_provider.exceptions import NotFoundError
+
 logger = logging.getLogger(__name__)
 
 
 def external_api_error_handler(func):
     """
     Оборачивает функцию для перехвата ошибок внешнего API
-    и возвращает 503 в случае ValueError.
+    и возвращает 404 в случае NotFoundError и 503 в случае остальных ValueError.
+
+    Асинхронные функции (представления без DRF) получают JsonResponse.
     """
 
+    if inspect.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except NotFoundError as e:
+                logger.info(f"Данные не найдены в {func.__name__}: {str(e)}")
+                return JsonResponse({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+            except ValueError as e:
+                logger.error(f"Внешняя ошибка API в {func.__name__}: {str(e)}", exc_info=True)
+                return JsonResponse({"error": "Ошибка внешнего API"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        return update_wrapper(async_wrapper, func)
+
     @wraps(func)
     def wrapper(*args, **kwargs):
         try:
             return func(*args, **kwargs)
+        except NotFoundError as e:
+            logger.info(f"Данные не найдены в {func.__name__}: {str(e)}")
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
         except ValueError as e:
             logger.error(f"Внешняя ошибка API в {func.__name__}: {str(e)}", exc_info=True)
             return Response({"error": "Ошибка внешнего API"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -0,0 +1,35 @@
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags
+
+from api.caching.entries import entry_etag, entry_max_age
+
+
+def cache_headers(entry: dict) -> dict:
+    """
+    Заголовки HTTP-кеширования для ответа из записи кеша.
+
+    ETag вычислен по данным записи, max-age — остаток ее мягкого срока жизни:
+    CDN и браузер держат ответ ровно столько, сколько он считается свежим в сервисе.
+    """
+    return {
+        "ETag": entry_etag(entry),
+        "Cache-Control": f"public, max-age={entry_max_age(entry)}",
+    }
+
+
+def not_modified(request, headers: dict) -> HttpResponseNotModified | None:
+    """
+    Возвращает 304 Not Modified, если ETag из If-None-Match совпадает с текущим.
+
+    Сравнение слабое (RFC 9110, 13.1.2): префикс W/ не учитывается.
+
+    Returns:
+        HttpResponseNotModified | None: Ответ 304 с заголовками кеширования или None
+    """
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return None
+    etags = {etag.removeprefix("W/") for etag in parse_etags(header)}
+    if "*" in etags or headers["ETag"] in etags:
+        return HttpResponseNotModified(headers=headers)
+    return None
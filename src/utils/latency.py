@@ -0,0 +1,68 @@
+import logging
+import threading
+from collections import defaultdict, deque
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """
+    Скользящее окно задержек по эндпоинтам с расчетом перцентилей.
+
+    Каждые log_every наблюдений по эндпоинту в лог пишутся p50/p95/p99
+    за последние window запросов.
+    """
+
+    def __init__(self, name: str, window: int = 1000, log_every: int = 100):
+        """
+        Args:
+            name (str): Имя источника задержек для логов (например, weatherbit)
+            window (int): Количество последних наблюдений, по которым считаются перцентили
+            log_every (int): Период записи перцентилей в лог (в наблюдениях); 0 — не писать
+        """
+        self.name = name
+        self.log_every = log_every
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint: str, seconds: float) -> None:
+        """
+        Добавляет наблюдение задержки.
+
+        Args:
+            endpoint (str): Эндпоинт (например, /current)
+            seconds (float): Длительность запроса в секундах
+        """
+        with self._lock:
+            self._samples[endpoint].append(seconds)
+            self._counts[endpoint] += 1
+            should_log = self.log_every and self._counts[endpoint] % self.log_every == 0
+        if should_log:
+            p50, p95, p99 = (self.percentile(endpoint, q) for q in (50, 95, 99))
+            logger.info(
+                f"[{self.name}] {endpoint}: p50={p50 * 1000:.0f}ms p95={p95 * 1000:.0f}ms "
+                f"p99={p99 * 1000:.0f}ms (последние {len(self._samples[endpoint])} запросов)"
+            )
+
+    def count(self, endpoint: str) -> int:
+        """
+        Возвращает количество наблюдений по эндпоинту в окне.
+        """
+        with self._lock:
+            return len(self._samples.get(endpoint, ()))
+
+    def percentile(self, endpoint: str, q: float) -> float | None:
+        """
+        Возвращает перцентиль задержки в секундах или None, если наблюдений нет.
+
+        Args:
+            endpoint (str): Эндпоинт
+            q (float): Перцентиль от 0 до 100
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))
+        return samples[index]
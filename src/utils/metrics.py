@@ -0,0 +1,227 @@
+import os
+import time
+from contextlib import contextmanager
+
+from django.db import connections
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+PHASES = ("cache", "db", "api", "serialize")
+
+# Границы корзин от 1 мс до 10 с: Redis и локальный кеш попадают в нижние, Weatherbit — в верхние
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_SECONDS = Histogram(
+    "weather_http_request_duration_seconds",
+    "Длительность обработки HTTP-запроса",
+    ["view", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+PHASE_SECONDS = Histogram(
+    "weather_phase_duration_seconds",
+    "Длительность обращений к кешу, БД, внешнему API и сериализации ответа",
+    ["phase"],
+    buckets=LATENCY_BUCKETS,
+)
+LOOKUPS = Counter(
+    "weather_lookups_total",
+    "Ответы сервиса по источнику данных и типу запроса (город или координаты)",
+    ["kind", "source", "target"],
+)
+UPSTREAM_REQUESTS = Counter(
+    "weatherbit_requests_total",
+    "Запросы к Weatherbit по эндпоинту и коду ответа",
+    ["endpoint", "status"],
+)
+UPSTREAM_SECONDS = Histogram(
+    "weatherbit_request_duration_seconds",
+    "Длительность запросов к Weatherbit",
+    ["endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_TIER_LOOKUPS = Counter(
+    "weather_cache_tier_lookups_total",
+    "Попадания и промахи по уровням кеша",
+    ["tier", "result"],
+)
+SINGLE_FLIGHT_EVENTS = Counter(
+    "weather_single_flight_total",
+    "Лидеры, объединенные запросы и фоновые обновления single-flight",
+    ["role"],
+)
+
+CIRCUIT_STATE = Gauge(
+    "weatherbit_circuit_state",
+    "Состояние предохранителя Weatherbit: 0 — closed, 1 — half_open, 2 — open",
+    ["endpoint"],
+    multiprocess_mode="max",
+)
+UPSTREAM_BUDGET_REMAINING = Gauge(
+    "weatherbit_budget_remaining",
+    "Остаток бюджета запросов к Weatherbit: токенов в корзине (second) и дневной квоты (day, -1 — без ограничения)",
+    ["window"],
+    multiprocess_mode="mostrecent",
+)
+UPSTREAM_REJECTED = Counter(
+    "weatherbit_rejected_total",
+    "Запросы к Weatherbit, отклоненные без обращения к API",
+    ["reason"],
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "weather_db_pool_connections",
+    "Пул соединений PostgreSQL: открыто (size), свободно (available), запросов ждут соединения (waiting)",
+    ["alias", "state"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_REQUESTS = Counter(
+    "weather_db_pool_requests_total",
+    "Запросы соединений из пула PostgreSQL: все (served), с ожиданием (queued), неудачные и по таймауту (error)",
+    ["alias", "result"],
+)
+DB_POOL_WAIT_SECONDS = Counter(
+    "weather_db_pool_wait_seconds_total",
+    "Суммарное время ожидания соединения из пула PostgreSQL",
+    ["alias"],
+)
+DB_POOL_USAGE_SECONDS = Counter(
+    "weather_db_pool_usage_seconds_total",
+    "Суммарное время, которое соединения пула PostgreSQL были выданы запросам",
+    ["alias"],
+)
+PROVIDER_REQUESTS = Counter(
+    "weather_provider_requests_total",
+    "Запросы к поставщикам погоды: ответ (ok), место не найдено (not_found), ошибка (error)",
+    ["provider", "operation", "result"],
+)
+PROVIDER_SECONDS = Histogram(
+    "weather_provider_request_duration_seconds",
+    "Длительность запросов к поставщикам погоды",
+    ["provider", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+PROVIDER_HEDGES = Counter(
+    "weather_provider_hedged_total",
+    "Запросы, продублированные резервному поставщику после задержки основного",
+    ["operation"],
+)
+PROVIDER_WINS = Counter(
+    "weather_provider_wins_total",
+    "Ответы, отданные сервису, по поставщику и наличию дублирующего запроса",
+    ["provider", "operation", "hedged"],
+)
+OBSERVATION_WRITES = Counter(
+    "weather_observation_writes_total",
+    "Ответы Weatherbit для хранилища наблюдений: записаны (written), отброшены при переполнении очереди (dropped) "
+    "или при ошибке БД (failed)",
+    ["result"],
+)
+LIVE_CONNECTIONS = Gauge(
+    "weather_live_connections",
+    "Открытые потоки обновлений текущей погоды (SSE), сумма по рабочим процессам",
+    multiprocess_mode="livesum",
+)
+LIVE_EVENTS = Counter(
+    "weather_live_events_total",
+    "События потока обновлений: опубликованы (published), не опубликованы (failed), "
+    "отправлены клиентам (sent), дочитаны из потока Redis (replayed)",
+    ["kind"],
+)
+
+_phase_histograms = {phase: PHASE_SECONDS.labels(phase) for phase in PHASES}
+
+
+@contextmanager
+def observe_phase(phase: str):
+    """
+    Замеряет длительность блока кода как фазы обработки запроса (cache, db, api, serialize).
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phase_histograms[phase].observe(time.perf_counter() - started)
+
+
+def record_lookup(kind: str, source: str, count: int = 1, target: str = "city") -> None:
+    """
+    Учитывает ответы сервиса по источнику данных.
+
+    Args:
+        kind (str): Тип данных (current, forecast)
+        source (str): Источник (cache, db, api)
+        count (int): Количество ответов
+        target (str): Тип запроса (city, coordinates)
+    """
+    if count:
+        LOOKUPS.labels(kind, source, target).inc(count)
+
+
+def record_upstream(endpoint: str, status, seconds: float) -> None:
+    """
+    Учитывает запрос к Weatherbit: код ответа (или error при сбое соединения) и длительность.
+    """
+    UPSTREAM_REQUESTS.labels(endpoint, str(status)).inc()
+    UPSTREAM_SECONDS.labels(endpoint).observe(seconds)
+    _phase_histograms["api"].observe(seconds)
+
+
+def time_database_query(execute, sql, params, many, context):
+    """
+    Обертка выполнения SQL-запросов (connection.execute_wrappers), замеряющая фазу db.
+    """
+    with observe_phase("db"):
+        return execute(sql, params, many, context)
+
+
+def instrument_connection(sender, connection, **kwargs):
+    """
+    Обработчик сигнала connection_created: подключает замер SQL-запросов к новому соединению.
+    """
+    if time_database_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_database_query)
+
+
+def record_db_pool_stats(sender, **kwargs):
+    """
+    Обработчик сигнала request_finished: переносит статистику пулов соединений PostgreSQL в метрики.
+
+    Счетчики пула (pop_stats) сбрасываются при чтении, поэтому в метрики добавляется прирост
+    с предыдущего запроса; размер пула и число свободных соединений — текущие значения.
+    """
+    for connection in connections.all(initialized_only=True):
+        pool = getattr(connection, "pool", None)
+        if pool is None:
+            continue
+        stats = pool.pop_stats()
+        alias = connection.alias
+        DB_POOL_CONNECTIONS.labels(alias, "size").set(stats.get("pool_size", 0))
+        DB_POOL_CONNECTIONS.labels(alias, "available").set(stats.get("pool_available", 0))
+        DB_POOL_CONNECTIONS.labels(alias, "waiting").set(stats.get("requests_waiting", 0))
+        DB_POOL_REQUESTS.labels(alias, "served").inc(stats.get("requests_num", 0))
+        DB_POOL_REQUESTS.labels(alias, "queued").inc(stats.get("requests_queued", 0))
+        DB_POOL_REQUESTS.labels(alias, "error").inc(stats.get("requests_errors", 0))
+        DB_POOL_WAIT_SECONDS.labels(alias).inc(stats.get("requests_wait_ms", 0) / 1000)
+        DB_POOL_USAGE_SECONDS.labels(alias).inc(stats.get("usage_ms", 0) / 1000)
+
+
+def metrics_view(request):
+    """
+    GET /metrics — метрики в текстовом формате Prometheus.
+
+    При запуске в нескольких процессах (PROMETHEUS_MULTIPROC_DIR) метрики собираются со всех рабочих процессов.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,42 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from utils.metrics import REQUEST_SECONDS
+
+
+class MetricsMiddleware:
+    """
+    Замеряет длительность обработки запросов по представлению, методу и коду ответа.
+
+    Поддерживает синхронный (WSGI) и асинхронный (ASGI) режимы.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self._observe(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._observe(request, response, started)
+        return response
+
+    @staticmethod
+    def _observe(request, response, started: float) -> None:
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        REQUEST_SECONDS.labels(view, request.method, response.status_code).observe(time.perf_counter() - started)
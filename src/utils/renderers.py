@@ -0,0 +1,42 @@
+import orjson
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import JSONRenderer
+
+from utils.metrics import observe_phase
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer с замером времени сериализации ответа (фаза serialize).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with observe_phase("serialize"):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Компактный JSON через orjson с замером времени сериализации (фаза serialize).
+
+    Типы, которых нет в orjson (Decimal, ленивые строки и т.п.), обрабатывает JSONEncoder DRF.
+    Нестроковые ключи словарей разрешены (OPT_NON_STR_KEYS): ошибки валидации ListField
+    DRF индексированы номерами элементов.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        with observe_phase("serialize"):
+            return orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FirstRendererNegotiation(DefaultContentNegotiation):
+    """
+    Выбор рендерера без разбора заголовка Accept: всегда первый рендерер представления.
+
+    В профиле project.settings_api рендерер один (JSON), поэтому разбор Accept не нужен.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
@@ -0,0 +1,29 @@
+import json
+
+# Комментарий SSE: клиент его игнорирует, а прокси не закрывают соединение как неактивное
+HEARTBEAT = ": ping\n\n"
+
+
+def sse_event(data: dict, event: str | None = None, event_id: str | None = None) -> str:
+    """
+    Форматирует событие Server-Sent Events с данными в JSON.
+
+    Args:
+        data (dict): Данные события
+        event (str | None): Тип события (поле event)
+        event_id (str | None): ID события (поле id); клиент вернет последний в заголовке Last-Event-ID
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def sse_retry(milliseconds: int) -> str:
+    """
+    Поле retry: пауза клиента перед переподключением после разрыва соединения.
+    """
+    return f"retry: {milliseconds}\n\n"